@@ -0,0 +1,95 @@
+import json
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait
+
+# Artefact levels for build_assumption outputs
+ARTEFACTS_NONE = "none"    # write nothing
+ARTEFACTS_FINAL = "final"  # final assumption JSON only
+ARTEFACTS_JSON = "json"    # JSON for every stage
+ARTEFACTS_FULL = "full"    # JSON and PNG for every stage
+ARTEFACT_LEVELS = (ARTEFACTS_NONE, ARTEFACTS_FINAL, ARTEFACTS_JSON, ARTEFACTS_FULL)
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def _get_executor():
+    """
+    One worker thread shared by all writers: artefacts never block the
+    computation, and matplotlib rendering stays on a single thread.
+    """
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="artefacts")
+        return _executor
+
+
+def write_json(lts_json, path):
+    """Write an LTS (or any JSON document) compactly."""
+    with open(path, 'w') as f:
+        json.dump(lts_json, f, separators=(',', ':'))
+
+
+class ArtefactHandle:
+    """
+    Future-like handle over the artefacts queued by one build_assumption call.
+    """
+
+    def __init__(self):
+        self._futures = []
+        self.paths = []
+
+    def submit(self, path, fn, *args):
+        self.paths.append(path)
+        self._futures.append(_get_executor().submit(fn, *args))
+
+    def done(self):
+        return all(f.done() for f in self._futures)
+
+    def wait(self, timeout=None):
+        """
+        Block until every artefact is written. Re-raises the first error
+        raised by a writer; returns the list of artefact paths.
+        """
+        finished, pending = wait(self._futures, timeout=timeout)
+        if pending:
+            raise TimeoutError(f"{len(pending)} artefacts still being written.")
+        for f in self._futures:
+            if f.exception() is not None:
+                raise f.exception()
+        return self.paths
+
+    result = wait
+
+    def add_done_callback(self, fn):
+        """Call fn(self) once every artefact has been written."""
+        remaining = [len(self._futures)]
+        lock = threading.Lock()
+
+        def _one_done(_):
+            with lock:
+                remaining[0] -= 1
+                last = remaining[0] == 0
+            if last:
+                try:
+                    fn(self)
+                except Exception:
+                    logging.exception("[Artefacts] done callback failed")
+
+        if not self._futures:
+            fn(self)
+        for f in self._futures:
+            f.add_done_callback(_one_done)
+
+
+class AssumptionResult(dict):
+    """
+    The final assumption in the JSON schema, as returned by build_assumption,
+    together with the handle of the artefacts still being written.
+    """
+
+    def __init__(self, lts_json, artefacts):
+        super().__init__(lts_json)
+        self.artefacts = artefacts
@@ -0,0 +1,58 @@
+import importlib
+import importlib.util
+import sys
+
+# Heavy optional dependencies, imported only when a feature first uses them:
+# registry name -> (module to import, feature that needs it)
+BACKENDS = {
+    "torch": ("torch", "the learned perception model"),
+    "networkx": ("networkx", "LTS rendering"),
+    # the Figure API rather than pyplot, so that rendering works off the main thread
+    "matplotlib": ("matplotlib.figure", "LTS rendering"),
+}
+
+
+def load(name):
+    """Import (once) and return the module of a registered backend."""
+    module, feature = BACKENDS[name]
+    try:
+        return importlib.import_module(module)
+    except ImportError as e:
+        raise ImportError(f"{feature} requires {name} (pip install {name})") from e
+
+
+def available(name):
+    """True if the backend is installed, without importing it."""
+    return importlib.util.find_spec(BACKENDS[name][0].split(".")[0]) is not None
+
+
+def loaded():
+    """Names of the backends imported so far."""
+    return [name for name, (module, _) in BACKENDS.items() if module in sys.modules]
+
+
+class LazyBackend:
+    """Stands in for a backend module and imports it on first attribute access."""
+
+    def __init__(self, name):
+        if name not in BACKENDS:
+            raise KeyError(f"Unknown backend: {name!r}")
+        self._name = name
+        self._module = None
+
+    def __getattr__(self, attribute):
+        if self._module is None:
+            self._module = load(self._name)
+        return getattr(self._module, attribute)
+
+    def __repr__(self):
+        state = "loaded" if self._module is not None else "not loaded"
+        return f"<lazy backend {self._name!r} ({state})>"
+
+
+def lazy(name):
+    """
+    A module-level stand-in for a backend, e.g. `nx = lazy("networkx")`:
+    the backend is imported the first time one of its attributes is used.
+    """
+    return LazyBackend(name)
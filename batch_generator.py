@@ -0,0 +1,214 @@
+# batch_generator.py
+
+import argparse
+import json
+import logging
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from artefact_writer import write_json, ARTEFACTS_FINAL
+from lts_core.action_table import ActionTable
+from lts_core.lts_binary import json_to_binary, load_binary
+from weakest_assumption_generator import AssumptionGenerator
+
+DEFAULT_MANIFEST = "batch_manifest.json"
+DEFAULT_OUTPUT_DIR = "batch_output"
+
+# Manifest keys of a job, and the AssumptionGenerator / build_assumption
+# options it may set under "options"
+JOB_KEYS = {"name", "lts", "property", "interface_alphabet", "alphabet_conditions", "options"}
+GENERATOR_OPTIONS = {
+    "max_macro_states", "artefacts", "symbolic", "guard_boundaries", "minimise", "propagate_on",
+    "validation", "metrics", "profile"
+}
+BUILD_OPTIONS = {"streaming", "conjunctive"}
+
+
+def load_manifest(path):
+    """
+    Read and check a manifest:
+
+        {"jobs": [{"name": "controller_far",
+                   "lts": "controller_lts.ltsb",
+                   "property": {...},
+                   "interface_alphabet": [...],
+                   "alphabet_conditions": [{"field": ..., "operator": ..., "value": ...}],
+                   "options": {"minimise": true, ...}}, ...]}
+
+    Only "lts" is required. The property defaults to the one stored with the
+    LTS and Σ to its interface alphabet; "alphabet_conditions" keeps only the
+    labels of Σ whose fields satisfy every condition. LTS paths are relative
+    to the manifest. Raises ValueError for an invalid manifest.
+    """
+    with open(path) as f:
+        manifest = json.load(f)
+    jobs = manifest.get("jobs") if isinstance(manifest, dict) else None
+    if not jobs:
+        raise ValueError(f"Manifest {path} has no jobs.")
+    base = os.path.dirname(os.path.abspath(path))
+    names = set()
+    for k, job in enumerate(jobs):
+        unknown = set(job) - JOB_KEYS
+        if unknown:
+            raise ValueError(f"Job {k} has unknown keys: {sorted(unknown)}")
+        if "lts" not in job:
+            raise ValueError(f"Job {k} has no 'lts'.")
+        options = set(job.get("options", {})) - GENERATOR_OPTIONS - BUILD_OPTIONS
+        if options:
+            raise ValueError(f"Job {k} has unknown options: {sorted(options)}")
+        job.setdefault("name", f"job{k}")
+        if job["name"] in names or os.sep in job["name"]:
+            raise ValueError(f"Job name {job['name']!r} is repeated or not a plain file name.")
+        names.add(job["name"])
+        job["lts"] = os.path.join(base, job["lts"])
+    return jobs
+
+
+def prepare_inputs(jobs, output_dir):
+    """
+    Convert every distinct JSON input to the binary format once, so that all
+    workers map the same file (and share its pages) instead of each parsing
+    the JSON. Binary inputs are used as they are.
+    """
+    input_dir = os.path.join(output_dir, "inputs")
+    converted = {}
+    for job in jobs:
+        path = job["lts"]
+        if path.endswith(".json"):
+            if path not in converted:
+                os.makedirs(input_dir, exist_ok=True)
+                stem = os.path.splitext(os.path.basename(path))[0]
+                converted[path] = os.path.join(input_dir, f"{len(converted)}_{stem}.ltsb")
+                json_to_binary(path, converted[path])
+            job["input"] = converted[path]
+        else:
+            job["input"] = path
+
+
+def select_alphabet(lts, conditions):
+    """The labels of lts's alphabet whose parsed fields satisfy every condition."""
+    table = ActionTable()
+    table.sync(lts.actions.names)
+    alphabet = lts.alphabet if lts.alphabet is not None else range(len(lts.actions))
+    return [
+        lts.actions[a] for a in alphabet
+        # violates() is the table's plain field comparison
+        if all(table.violates(a, c["field"], c["operator"], c["value"]) for c in conditions)
+    ]
+
+
+def _init_worker(level):
+    logging.getLogger().setLevel(level)
+
+
+def run_job(job, output_dir, cache_dir=None):
+    """Generate one job's assumption in output_dir/<name>; return its summary entry."""
+    start = time.perf_counter()
+    job_dir = os.path.join(output_dir, job["name"])
+    os.makedirs(job_dir, exist_ok=True)
+    summary = {"name": job["name"], "lts": job["lts"], "output_dir": job_dir}
+    try:
+        lts = load_binary(job["input"], copy=False)
+        property_p = job.get("property", lts.extra.get("property"))
+        if "interface_alphabet" in job:
+            sigma = job["interface_alphabet"]
+        else:
+            sigma = select_alphabet(lts, job.get("alphabet_conditions", []))
+        options = job.get("options", {})
+        generator_options = {"artefacts": ARTEFACTS_FINAL}
+        generator_options.update((key, value) for key, value in options.items() if key in GENERATOR_OPTIONS)
+        if options.get("metrics") or options.get("profile"):
+            generator_options["metrics_file"] = os.path.join(job_dir, "metrics.json")
+        generator = AssumptionGenerator(
+            lts, property_p, sigma, cache_dir=cache_dir, output_dir=job_dir, **generator_options
+        )
+        assumption = generator.build_assumption(
+            **{key: value for key, value in options.items() if key in BUILD_OPTIONS}
+        )
+        output_file = os.path.join(job_dir, f"{generator.lts_name}_assumption.json")
+        write_json(assumption, output_file)
+        assumption.artefacts.wait()
+
+        if generator.properties is not None and not options.get("conjunctive"):
+            results = assumption
+        else:
+            results = {generator.lts_name: assumption}
+        summary.update(
+            status="ok",
+            interface_alphabet_size=len(sigma),
+            assumption=output_file,
+            assumptions={
+                name: {"states": len(A["states"]), "transitions": len(A["transitions"])}
+                for name, A in results.items()
+            },
+        )
+        if assumption.metrics is not None:
+            summary["metrics"] = {
+                key: value for key, value in assumption.metrics.to_json().items() if key != "stages"
+            }
+    except Exception as e:
+        logging.exception("[Batch] Job %s failed", job["name"])
+        summary.update(status="failed", error=f"{type(e).__name__}: {e}")
+    summary["seconds"] = round(time.perf_counter() - start, 3)
+    return summary
+
+
+def run_batch(manifest_path=DEFAULT_MANIFEST, output_dir=DEFAULT_OUTPUT_DIR,
+              workers=None, cache_dir=None, worker_log_level=logging.WARNING):
+    """
+    Run every job of the manifest on a pool of worker processes (one per
+    core by default). Each job writes only to output_dir/<name>; the
+    aggregate output_dir/summary.json lists every job in manifest order.
+    """
+    jobs = load_manifest(manifest_path)
+    os.makedirs(output_dir, exist_ok=True)
+    prepare_inputs(jobs, output_dir)
+    workers = workers or os.cpu_count() or 1
+
+    start = time.perf_counter()
+    summaries = {}
+    with ProcessPoolExecutor(
+        max_workers=min(workers, len(jobs)), initializer=_init_worker, initargs=(worker_log_level,)
+    ) as pool:
+        futures = {pool.submit(run_job, job, output_dir, cache_dir): job["name"] for job in jobs}
+        for future in as_completed(futures):
+            summary = future.result()
+            summaries[futures[future]] = summary
+            logging.info(
+                "[Batch] %s: %s in %.2fs (%d/%d)",
+                summary["name"], summary["status"], summary["seconds"], len(summaries), len(jobs)
+            )
+    wall = time.perf_counter() - start
+
+    ordered = [summaries[job["name"]] for job in jobs]
+    failed = sum(1 for s in ordered if s["status"] != "ok")
+    summary = {
+        "manifest": os.path.abspath(manifest_path),
+        "workers": min(workers, len(jobs)),
+        "jobs": len(jobs),
+        "failed": failed,
+        "wall_seconds": round(wall, 3),
+        "job_seconds": round(sum(s["seconds"] for s in ordered), 3),
+        "results": ordered,
+    }
+    with open(os.path.join(output_dir, "summary.json"), 'w') as f:
+        json.dump(summary, f, indent=4)
+    logging.info(
+        "[Batch] %d jobs (%d failed) in %.2fs on %d workers; summary in %s",
+        len(jobs), failed, wall, summary["workers"], os.path.join(output_dir, "summary.json")
+    )
+    return summary
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generate assumptions for a manifest of jobs in parallel.")
+    parser.add_argument("manifest", nargs="?", default=DEFAULT_MANIFEST)
+    parser.add_argument("--output", default=DEFAULT_OUTPUT_DIR, help="directory for job outputs and summary.json")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: one per core)")
+    parser.add_argument("--cache-dir", default=None, help="stage cache shared by all jobs")
+    args = parser.parse_args()
+
+    result = run_batch(args.manifest, args.output, args.workers, args.cache_dir)
+    sys.exit(1 if result["failed"] else 0)
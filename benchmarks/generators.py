@@ -0,0 +1,149 @@
+import random
+
+from components.controller import DECISION_BOUNDARIES, MODES
+from lts_core.compact_lts import CompactLTS
+from scenarios import controller_property
+
+# Property used for the graphs with integer "a=<k>" labels
+LABEL_PROPERTY = {
+    "type": "safety",
+    "description": "Action a=0 must never happen",
+    "violation_condition": {"field": "a", "operator": "==", "value": 0.0},
+}
+
+
+def _lts(name, property_p):
+    lts = CompactLTS()
+    lts.extra["name"] = name
+    lts.extra["property"] = property_p
+    return lts
+
+
+def _finish(lts, sigma):
+    """Declare sigma as the interface alphabet; return (lts, property, sigma)."""
+    lts.set_alphabet(sigma)
+    return lts, lts.extra["property"], sigma
+
+
+def chain(transitions, labels=16, seed=0):
+    """
+    s0 -a=k-> s1 -> ... : one path, labels cycling through a=1..labels-1 and
+    the last move a=0, so the whole chain is explored before the violation.
+    """
+    lts = _lts("Chain", LABEL_PROPERTY)
+    names = [f"a={k}" for k in range(labels)]
+    ids = [lts.actions.intern(name) for name in names]
+    lts.set_initial(lts.add_state("s0"))
+    previous = 0
+    for i in range(transitions):
+        state = lts.add_state(f"s{i + 1}")
+        label = 0 if i == transitions - 1 else 1 + i % (labels - 1)
+        lts.add_transition(previous, state, ids[label])
+        previous = state
+    return _finish(lts, names)
+
+
+def random_graph(transitions, states=None, labels=32, hidden=0.05, seed=0):
+    """
+    Uniform random edges over `states` states (transitions / 4 by default);
+    a `hidden` fraction of the labels is left out of Σ and becomes τ. Large
+    hidden fractions make τ-closures span the graph, and the subset
+    construction then hits max_macro_states well before 10^4 transitions.
+    """
+    rng = random.Random(seed)
+    states = states or max(2, transitions // 4)
+    lts = _lts("RandomGraph", LABEL_PROPERTY)
+    names = [f"a={k}" for k in range(labels)]
+    ids = [lts.actions.intern(name) for name in names]
+    for s in range(states):
+        lts.add_state(f"s{s}")
+    lts.set_initial(0)
+    # a=0 is kept rare, so that most of the graph stays safe
+    for _ in range(transitions):
+        a = rng.randrange(labels) if rng.random() < 0.1 else rng.randrange(1, labels)
+        lts.add_transition(rng.randrange(states), rng.randrange(states), ids[a])
+    sigma = names[:max(1, round(labels * (1 - hidden)))]
+    return _finish(lts, sigma)
+
+
+def controller_like(transitions, seed=0):
+    """
+    Mode graph shaped like ControllerLTSBuilder output: the five controller
+    modes, a fresh label with raw two-decimal readings per transition and
+    the next mode chosen by the controller's decision regions.
+    """
+    rng = random.Random(seed)
+    lts = _lts("ControllerLike", controller_property)
+    for mode in MODES:
+        lts.add_state(mode)
+    lts.set_initial(0)
+    cuts = DECISION_BOUNDARIES["obstacle_distance"]
+    names = []
+    current = 0
+    for _ in range(transitions):
+        obstacle = rng.random() < 0.5
+        distance = 0.0 if rng.random() < 0.001 else rng.uniform(0.0, 20.0)
+        if MODES[current] == "stopped" and rng.random() < 0.9:
+            target, req_acc = current, 0.0
+        elif obstacle and distance < cuts[0]:
+            target, req_acc = 3, -8.0
+        elif obstacle and distance < cuts[1]:
+            target, req_acc = 2, -4.0
+        elif obstacle and distance < cuts[2]:
+            target, req_acc = 1, 0.0
+        else:
+            target, req_acc = 0, 1.0
+        if rng.random() < 0.01:
+            target = 4
+        label = (
+            f"obstacle_class={int(obstacle)}, obstacle_distance={distance:.2f}, "
+            f"est_vel={rng.uniform(0, 12):.2f}, est_acc={rng.uniform(-8, 2):.2f}, req_acc={req_acc:.2f}"
+        )
+        names.append(label)
+        lts.add_transition(current, target, lts.actions.intern(label))
+        current = target
+    return _finish(lts, list(dict.fromkeys(names)))
+
+
+def nondeterministic(transitions, states=None, labels=3, tau=0.1, window=4, seed=0):
+    """
+    Few labels and several targets per (state, label): successors are drawn
+    from the next `window` states, the last label is hidden as τ on a `tau`
+    fraction of the edges and a=0 is rare. Determinisation has to build
+    real macro-states; with labels=4 the subset construction already
+    exceeds the default max_macro_states at 10^4 transitions.
+    """
+    rng = random.Random(seed)
+    states = states or max(2, transitions // 4)
+    lts = _lts("Nondeterministic", LABEL_PROPERTY)
+    names = [f"a={k}" for k in range(labels)]
+    ids = [lts.actions.intern(name) for name in names]
+    for s in range(states):
+        lts.add_state(f"s{s}")
+    lts.set_initial(0)
+    for _ in range(transitions):
+        source = rng.randrange(states)
+        target = (source + rng.randrange(1, window + 1)) % states
+        if rng.random() < tau:
+            a = labels - 1
+        elif rng.random() < 0.01:
+            a = 0
+        else:
+            a = rng.randrange(1, labels - 1)
+        lts.add_transition(source, target, ids[a])
+    return _finish(lts, names[:labels - 1])
+
+
+GENERATORS = {
+    "chain": chain,
+    "random": random_graph,
+    "controller": controller_like,
+    "nondeterministic": nondeterministic,
+}
+
+
+def builder_transitions(lts):
+    """The LTS as ControllerLTSBuilder-style (from, label, to, to) tuples."""
+    states = lts.states.names
+    actions = lts.actions.names
+    return [(states[u], actions[a], states[v], states[v]) for u, v, a in zip(lts.src, lts.dst, lts.act)]
@@ -0,0 +1,275 @@
+"""
+Benchmark suite for the assumption pipeline and the exporters.
+
+Run from the repository root:
+
+    python -m benchmarks.run_benchmarks --sizes 1e3,1e4,1e5 --save bench.json
+    python -m benchmarks.run_benchmarks --baseline bench.json
+
+Every (generator, size, target) is timed separately; the best of --repeat
+runs is kept. Results are JSON, keyed so that two runs can be compared.
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import logging
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+
+from benchmarks.generators import GENERATORS, builder_transitions
+from clean_dot import write_clean_clustered_dot
+from export_dot import export_lts_to_dot
+from lts_builders.lts_utils import BaseLTSBuilder
+from lts_core.determinise import DeterminisationLimitExceeded
+from visualiser.visualise_lts import visualise_lts
+from weakest_assumption_generator import AssumptionGenerator
+
+RESULTS_VERSION = 1
+
+DEFAULT_SIZES = (1_000, 10_000, 100_000)
+DEFAULT_REPEAT = 3
+DEFAULT_THRESHOLD = 1.2  # new / baseline time above which a result is a regression
+DEFAULT_MIN_SECONDS = 0.01  # results faster than this in both runs are too noisy to judge
+
+TARGETS = ("pipeline", "export_to_json", "export_to_binary", "export_dot", "clean_dot", "visualise_lts")
+
+# Largest input each target is run on unless --no-limits is given: past
+# these sizes a target takes minutes.
+TARGET_LIMITS = {
+    "export_to_json": 1_000_000,
+    "export_to_binary": 10_000_000,
+    "export_dot": 1_000_000,
+    "clean_dot": 1_000_000,
+    "visualise_lts": 100_000,
+}
+
+
+class _SyntheticBuilder(BaseLTSBuilder):
+    """A builder holding generated transitions, to time the builder exporters."""
+
+    def __init__(self, transitions):
+        self.transitions = transitions
+
+    def get_transitions(self):
+        return self.transitions
+
+    def colour_line(self, line, **kwargs):
+        return line
+
+    def log_step(self, i, state, **kwargs):
+        pass
+
+
+def _quiet():
+    """Silence the prints of the exporters."""
+    return contextlib.redirect_stdout(io.StringIO())
+
+
+def _best(fn, repeat):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def _pipeline(lts, property_p, sigma, repeat):
+    """Per-stage seconds of build_assumption, best of repeat runs each."""
+    best = {}
+    for _ in range(repeat):
+        generator = AssumptionGenerator(
+            lts, property_p, sigma, artefacts="none", metrics=True, trace_memory=False
+        )
+        result = generator.build_assumption()
+        for record in result.metrics.stages:
+            key = f"pipeline.{record.stage}"
+            if key not in best or record.wall_seconds < best[key][0]:
+                best[key] = (record.wall_seconds, record.output_states, record.output_transitions)
+        total = result.metrics.wall_seconds
+        if "pipeline.total" not in best or total < best["pipeline.total"][0]:
+            best["pipeline.total"] = (total, None, None)
+    return best
+
+
+def run_target(target, lts, property_p, sigma, workdir, repeat):
+    """{result name: (seconds, output states, output transitions)} for one target."""
+    if target == "pipeline":
+        return _pipeline(lts, property_p, sigma, repeat)
+    lts_json = lts.to_json()
+    if target in ("export_to_json", "export_to_binary"):
+        builder = _SyntheticBuilder(builder_transitions(lts))
+        name = lts.extra["name"]
+        initial = lts.states[lts.initial]
+        if target == "export_to_json":
+            path = os.path.join(workdir, "lts.json")
+            fn = lambda: builder.export_to_json(path, name, initial, property_p)
+        else:
+            path = os.path.join(workdir, "lts.ltsb")
+            fn = lambda: builder.export_to_binary(path, name, initial, property_p)
+    elif target == "export_dot":
+        path = os.path.join(workdir, "lts.dot")
+        fn = lambda: export_lts_to_dot(lts_json, path)
+    elif target == "clean_dot":
+        path = os.path.join(workdir, "lts_clean.dot")
+        fn = lambda: write_clean_clustered_dot(lts_json, path)
+    else:
+        path = os.path.join(workdir, "lts.png")
+        fn = lambda: visualise_lts(lts_json["transitions"], save_path=path)
+    with _quiet():
+        seconds = _best(fn, repeat)
+    return {target: (seconds, None, None)}
+
+
+def run_suite(generators, sizes, targets, repeat=DEFAULT_REPEAT, limits=True, seed=0):
+    """Run every target on every generated LTS; return the results document."""
+    results = []
+    with tempfile.TemporaryDirectory() as workdir:
+        for generator_name in generators:
+            for size in sizes:
+                start = time.perf_counter()
+                lts, property_p, sigma = GENERATORS[generator_name](size, seed=seed)
+                logging.info(
+                    "[Bench] %s/%d: %d states, %d transitions (generated in %.2fs)",
+                    generator_name, size, lts.num_states, lts.num_transitions, time.perf_counter() - start
+                )
+                for target in targets:
+                    entry = {
+                        "generator": generator_name, "size": size,
+                        "states": lts.num_states, "transitions": lts.num_transitions,
+                    }
+                    if limits and size > TARGET_LIMITS.get(target, size):
+                        results.append(dict(entry, target=target, status="skipped"))
+                        continue
+                    # the largest inputs are only worth a single run
+                    runs = repeat if size < 1_000_000 else 1
+                    try:
+                        timings = run_target(target, lts, property_p, sigma, workdir, runs)
+                    except DeterminisationLimitExceeded as e:
+                        results.append(dict(entry, target=target, status="limit", error=str(e)))
+                        continue
+                    except Exception as e:
+                        # e.g. a missing optional dependency of the renderer
+                        logging.error("[Bench] %s failed on %s/%d: %s", target, generator_name, size, e)
+                        results.append(dict(entry, target=target, status="error", error=f"{type(e).__name__}: {e}"))
+                        continue
+                    for name, (seconds, out_states, out_transitions) in timings.items():
+                        record = dict(entry, target=name, status="ok", seconds=seconds, repeat=runs)
+                        if out_states is not None:
+                            record.update(output_states=out_states, output_transitions=out_transitions)
+                        results.append(record)
+                        logging.info("[Bench]   %-40s %10.4fs", name, seconds)
+    return {"version": RESULTS_VERSION, "meta": _meta(), "results": results}
+
+
+def _meta():
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        "date": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "commit": commit,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "processor": platform.processor(),
+    }
+
+
+def _key(result):
+    return result["generator"], result["size"], result["target"]
+
+
+def compare(current, baseline, threshold=DEFAULT_THRESHOLD, min_seconds=DEFAULT_MIN_SECONDS):
+    """
+    Rows (key, baseline seconds, current seconds, ratio, verdict) for every
+    result timed in both documents; verdict is "regression" above
+    threshold, "improvement" below 1 / threshold and "" otherwise, or
+    when both times are under min_seconds.
+    """
+    before = {_key(r): r["seconds"] for r in baseline["results"] if r.get("status") == "ok"}
+    rows = []
+    for result in current["results"]:
+        key = _key(result)
+        if result.get("status") != "ok" or key not in before:
+            continue
+        old, new = before[key], result["seconds"]
+        ratio = new / old if old > 0 else float("inf")
+        verdict = ""
+        if max(old, new) < min_seconds:
+            pass
+        elif ratio > threshold:
+            verdict = "regression"
+        elif ratio < 1 / threshold:
+            verdict = "improvement"
+        rows.append((key, old, new, ratio, verdict))
+    return rows
+
+
+def print_comparison(rows):
+    print(f"{'generator':<18}{'size':>10}  {'target':<38}{'baseline':>11}{'current':>11}{'ratio':>8}")
+    for (generator, size, target), old, new, ratio, verdict in rows:
+        print(f"{generator:<18}{size:>10}  {target:<38}{old:>10.4f}s{new:>10.4f}s{ratio:>8.2f}  {verdict}")
+
+
+def _sizes(text):
+    return [int(float(part)) for part in text.split(",") if part]
+
+
+def _names(text, known):
+    names = [part for part in text.split(",") if part]
+    for name in names:
+        if name not in known:
+            raise argparse.ArgumentTypeError(f"unknown name {name!r}; choose from {', '.join(known)}")
+    return names
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the assumption pipeline and exporters.")
+    parser.add_argument("--generators", type=lambda t: _names(t, GENERATORS), default=list(GENERATORS))
+    parser.add_argument("--sizes", type=_sizes, default=list(DEFAULT_SIZES),
+                        help="transition counts, e.g. 1e3,1e4,1e5,1e6,1e7")
+    parser.add_argument("--targets", type=lambda t: _names(t, TARGETS), default=list(TARGETS))
+    parser.add_argument("--repeat", type=int, default=DEFAULT_REPEAT)
+    parser.add_argument("--no-limits", action="store_true", help="run every target at every size")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--save", help="write the results to this JSON file")
+    parser.add_argument("--baseline", help="compare against a saved results file")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD)
+    parser.add_argument("--min-seconds", type=float, default=DEFAULT_MIN_SECONDS)
+    parser.add_argument("--fail-on-regression", action="store_true")
+    parser.add_argument("--verbose", action="store_true")
+    args = parser.parse_args()
+    # the pipeline's own log lines would drown the results; --verbose shows progress
+    logging.basicConfig(format='[%(levelname)s] %(message)s')
+    logging.getLogger().setLevel(logging.INFO if args.verbose else logging.ERROR)
+    logging.getLogger().handlers[0].addFilter(
+        lambda record: record.levelno >= logging.ERROR or record.getMessage().startswith("[Bench]")
+    )
+
+    document = run_suite(
+        args.generators, args.sizes, args.targets, args.repeat, not args.no_limits, args.seed
+    )
+    if args.save:
+        with open(args.save, 'w') as f:
+            json.dump(document, f, indent=4)
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        rows = compare(document, baseline, args.threshold, args.min_seconds)
+        print_comparison(rows)
+        if args.fail_on_regression and any(row[4] == "regression" for row in rows):
+            sys.exit(1)
+    else:
+        for r in document["results"]:
+            seconds = f"{r['seconds']:.4f}s" if r["status"] == "ok" else r["status"]
+            print(f"{r['generator']:<18}{r['size']:>10}  {r['target']:<38}{seconds:>12}")
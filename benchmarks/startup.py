@@ -0,0 +1,89 @@
+"""
+Cold-start benchmark for the two entry points.
+
+Run from the repository root:
+
+    python -m benchmarks.startup
+    python -m benchmarks.startup --repeat 10 --save startup.json
+
+Each entry point is imported in a fresh interpreter; the best of --repeat
+runs, minus the start-up time of a bare interpreter, is its import time.
+It must stay within the entry point's budget and must not import any of
+the heavy backends of backends.py. Exits with status 1 otherwise.
+"""
+
+import argparse
+import json
+import subprocess
+import sys
+import time
+
+from backends import BACKENDS
+
+DEFAULT_REPEAT = 5
+
+# entry point -> import time budget in seconds
+# (torch alone costs several seconds, matplotlib and networkx about half a second)
+BUDGETS = {
+    "main": 0.5,
+    "weakest_assumption_generator": 0.5,
+}
+
+# Prints the backends the import pulled in, as a JSON list
+_PROBE = (
+    "import json, sys\n"
+    "import {module}\n"
+    "print(json.dumps([name for name in {modules!r} if name in sys.modules]))\n"
+)
+
+
+def _run(code):
+    """Wall time and stdout of a fresh interpreter running code."""
+    start = time.perf_counter()
+    result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+    return time.perf_counter() - start, result.stdout
+
+
+def measure(module, repeat=DEFAULT_REPEAT):
+    """(import seconds, backends loaded) of importing module in a fresh interpreter."""
+    baseline = min(_run("pass")[0] for _ in range(repeat))
+    modules = [module_name for module_name, _ in BACKENDS.values()]
+    runs = [_run(_PROBE.format(module=module, modules=modules)) for _ in range(repeat)]
+    seconds = max(0.0, min(t for t, _ in runs) - baseline)
+    loaded = json.loads(runs[0][1].strip().splitlines()[-1])
+    return seconds, [name for name, (module_name, _) in BACKENDS.items() if module_name in loaded]
+
+
+def run(budgets=BUDGETS, repeat=DEFAULT_REPEAT):
+    """One result per entry point, with whether it is within its budget."""
+    results = []
+    for module, budget in budgets.items():
+        seconds, loaded = measure(module, repeat)
+        results.append({
+            "entry_point": module,
+            "seconds": round(seconds, 4),
+            "budget": budget,
+            "backends_loaded": loaded,
+            "ok": seconds <= budget and not loaded,
+        })
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Check the cold-start time of the entry points.")
+    parser.add_argument("--repeat", type=int, default=DEFAULT_REPEAT)
+    parser.add_argument("--budget-scale", type=float, default=1.0,
+                        help="multiply every budget, e.g. on a slow machine")
+    parser.add_argument("--save", help="write the results to this JSON file")
+    args = parser.parse_args()
+
+    results = run({module: budget * args.budget_scale for module, budget in BUDGETS.items()}, args.repeat)
+    for r in results:
+        status = "ok" if r["ok"] else "OVER BUDGET"
+        loaded = f"  loaded {', '.join(r['backends_loaded'])}" if r["backends_loaded"] else ""
+        print(f"{r['entry_point']:<32}{r['seconds']:>8.3f}s / {r['budget']:.3f}s  {status}{loaded}")
+    if args.save:
+        with open(args.save, 'w') as f:
+            json.dump(results, f, indent=4)
+    if not all(r["ok"] for r in results):
+        sys.exit(1)
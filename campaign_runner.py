@@ -0,0 +1,263 @@
+# campaign_runner.py
+
+import argparse
+import hashlib
+import json
+import logging
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from components.perception_service import PERCEPTION_VARIANTS, PerceptionService
+from lts_builders.controller_lts_builder import ControllerLTSBuilder
+from lts_builders.label_abstraction import ABSTRACTIONS
+from lts_builders.vehicle_lts_builder import VehicleLTSBuilder
+from lts_core.action_table import OPERATORS, parse_action_label
+from scenarios import (
+    SCENARIOS, sensor_noise, velocity_noise, acceleration_noise, controller_property, vehicle_property,
+)
+from simulation import run_scenario
+
+logging.basicConfig(level=logging.INFO, format='%(message)s')
+
+DEFAULT_OUTPUT_DIR = "campaign_output"
+DEFAULT_NOISE = {"sensor": sensor_noise, "velocity": velocity_noise, "acceleration": acceleration_noise}
+
+# The learned perception model of a worker process, built once by _init_worker
+_perception_service = None
+# Name of the controller label abstraction (see ABSTRACTIONS), set by _init_worker
+_abstraction = "raw"
+
+
+def expand_jobs(scenarios, seeds, noise_configs):
+    """
+    One job per (scenario, seed, noise config), in that nesting order. A
+    job's noise comes from random.Random(seed) alone, so every scenario and
+    noise config run with the same seed sees the same random stream.
+    """
+    jobs = []
+    for scenario in scenarios:
+        if scenario not in SCENARIOS:
+            raise ValueError(f"Unknown scenario {scenario!r}; choose from {', '.join(sorted(SCENARIOS))}")
+        for k, noise in enumerate(noise_configs):
+            for seed in seeds:
+                jobs.append({
+                    "name": f"{scenario}_n{k}_s{seed}",
+                    "scenario": scenario,
+                    "seed": seed,
+                    "noise": dict(DEFAULT_NOISE, **noise),
+                })
+    if not jobs:
+        raise ValueError("No jobs: give at least one scenario, seed and noise config")
+    return jobs
+
+
+def _violated(transitions, property_p):
+    """True if any label of transitions (from, label, to[, ...]) violates property_p."""
+    condition = property_p["violation_condition"]
+    compare = OPERATORS[condition["operator"]]
+    for t in transitions:
+        actual = parse_action_label(t[1]).get(condition["field"])
+        if isinstance(actual, (int, float)) and compare(actual, condition["value"]):
+            return True
+    return False
+
+
+def _init_worker(perception_variant, abstraction="raw"):
+    global _perception_service, _abstraction
+    _abstraction = abstraction
+    if perception_variant is not None:
+        # one intra-op thread per worker, so the workers do not oversubscribe the cores
+        _perception_service = PerceptionService(variant=perception_variant, threads=1)
+
+
+def run_job(job):
+    """Simulate one job; return its summary entry with the LTS transitions of both components."""
+    start = time.perf_counter()
+    noise = job["noise"]
+    obstacle_distances = SCENARIOS[job["scenario"]]()
+    perception_options = {}
+    if _perception_service is not None:
+        perception_options["perception"] = _perception_service.scenario_perception(
+            obstacle_distances, seed=job["seed"]
+        )
+    controller_lts, vehicle_lts = run_scenario(
+        obstacle_distances,
+        rng=random.Random(job["seed"]),
+        sensor_noise=noise["sensor"],
+        velocity_noise=noise["velocity"],
+        acceleration_noise=noise["acceleration"],
+        controller_abstraction=ABSTRACTIONS[_abstraction](),
+        **perception_options
+    )
+    controller_transitions = controller_lts.get_transitions()
+    vehicle_transitions = vehicle_lts.get_transitions()
+    return dict(
+        job,
+        controller_transitions=controller_transitions,
+        vehicle_transitions=vehicle_transitions,
+        controller_steps=controller_lts.steps,
+        controller_violation=_violated(controller_transitions, controller_property),
+        vehicle_violation=_violated(vehicle_transitions, vehicle_property),
+        seconds=round(time.perf_counter() - start, 6),
+    )
+
+
+def merge_transitions(transition_lists):
+    """Every distinct transition, in order of first appearance."""
+    return list(dict.fromkeys(t for transitions in transition_lists for t in transitions))
+
+
+def lts_digest(transitions):
+    """Order-independent hash of a merged LTS, to compare two campaigns exactly."""
+    blob = json.dumps(sorted(map(repr, transitions)), separators=(',', ':'))
+    return hashlib.sha256(blob.encode("utf-8")).hexdigest()
+
+
+def run_campaign(jobs, output_dir=DEFAULT_OUTPUT_DIR, workers=None, per_job=False, perception_variant=None,
+                 abstraction="raw"):
+    """
+    Run every job on a pool of worker processes and export the merged,
+    deduplicated controller and vehicle LTSs (JSON and binary) to
+    output_dir, with campaign_summary.json. Results are merged in job
+    order, not completion order, so a campaign reproduces byte for byte.
+    per_job=True also exports each job's own controller LTS.
+    perception_variant (one of PERCEPTION_VARIANTS) replaces perfect
+    perception with SimplePerceptionNet, built once per worker; each job
+    classifies all its frames in one batch, from a stream seeded by the
+    job's seed. abstraction names one of label_abstraction.ABSTRACTIONS,
+    applied to every job's controller labels.
+    """
+    if not jobs:
+        raise ValueError("No jobs to run")
+    if abstraction not in ABSTRACTIONS:
+        raise ValueError(f"Unknown abstraction {abstraction!r}; choose from {', '.join(ABSTRACTIONS)}")
+    os.makedirs(output_dir, exist_ok=True)
+    workers = min(workers or os.cpu_count() or 1, len(jobs))
+
+    start = time.perf_counter()
+    with ProcessPoolExecutor(
+        max_workers=workers, initializer=_init_worker, initargs=(perception_variant, abstraction)
+    ) as pool:
+        # jobs take milliseconds, so they are sent to the workers in chunks
+        results = list(pool.map(run_job, jobs, chunksize=max(1, len(jobs) // (4 * workers))))
+    wall = time.perf_counter() - start
+
+    controller_lts = ControllerLTSBuilder()
+    controller_lts.transitions = merge_transitions(r["controller_transitions"] for r in results)
+    vehicle_lts = VehicleLTSBuilder(quantize=2)
+    vehicle_lts.transitions = merge_transitions(r["vehicle_transitions"] for r in results)
+    controller_lts.export_to_json(
+        json_path=os.path.join(output_dir, "controller_lts.json"),
+        name="ControllerLTS", initial_state="drive", property_dict=controller_property
+    )
+    controller_lts.export_to_binary(
+        binary_path=os.path.join(output_dir, "controller_lts.ltsb"),
+        name="ControllerLTS", initial_state="drive", property_dict=controller_property
+    )
+    vehicle_lts.export_to_json(
+        json_path=os.path.join(output_dir, "vehicle_lts.json"),
+        name="VehicleLTS", property_dict=vehicle_property
+    )
+    vehicle_lts.export_to_binary(
+        binary_path=os.path.join(output_dir, "vehicle_lts.ltsb"),
+        name="VehicleLTS", property_dict=vehicle_property
+    )
+
+    if per_job:
+        job_dir = os.path.join(output_dir, "jobs")
+        os.makedirs(job_dir, exist_ok=True)
+        for r in results:
+            job_lts = ControllerLTSBuilder()
+            job_lts.transitions = r["controller_transitions"]
+            job_lts.export_to_json(
+                json_path=os.path.join(job_dir, f"{r['name']}_controller_lts.json"),
+                name=f"ControllerLTS_{r['name']}", initial_state="drive", property_dict=controller_property
+            )
+
+    entries = [
+        {
+            key: value for key, value in r.items()
+            if key not in ("controller_transitions", "vehicle_transitions")
+        }
+        for r in results
+    ]
+    for entry, r in zip(entries, results):
+        entry["controller_transitions"] = len(r["controller_transitions"])
+        entry["vehicle_transitions"] = len(r["vehicle_transitions"])
+    summary = {
+        "jobs": len(jobs),
+        "workers": workers,
+        "perception": perception_variant or "perfect",
+        "abstraction": abstraction,
+        "wall_seconds": round(wall, 3),
+        "job_seconds": round(sum(r["seconds"] for r in results), 3),
+        "controller_violation_rate": sum(r["controller_violation"] for r in results) / len(results),
+        "vehicle_violation_rate": sum(r["vehicle_violation"] for r in results) / len(results),
+        "controller_lts": {
+            "steps": sum(r["controller_steps"] for r in results),
+            "transitions": len(controller_lts.transitions),
+            "digest": lts_digest(controller_lts.transitions),
+        },
+        "vehicle_lts": {
+            "transitions": len(vehicle_lts.transitions),
+            "digest": lts_digest(vehicle_lts.transitions),
+        },
+        "results": entries,
+    }
+    with open(os.path.join(output_dir, "campaign_summary.json"), 'w') as f:
+        json.dump(summary, f, indent=4)
+    logging.info(
+        "[Campaign] %d jobs in %.2fs on %d workers: %d controller steps logged as %d distinct transitions, "
+        "%d distinct vehicle transitions",
+        len(jobs), wall, workers, summary["controller_lts"]["steps"], len(controller_lts.transitions),
+        len(vehicle_lts.transitions)
+    )
+    return summary
+
+
+def _seeds(text):
+    """'0-99' or '1,5,7'."""
+    seeds = []
+    for part in text.split(","):
+        if "-" in part:
+            first, last = part.split("-")
+            seeds.extend(range(int(first), int(last) + 1))
+        elif part:
+            seeds.append(int(part))
+    return seeds
+
+
+def _noise(text):
+    """'sensor,velocity,acceleration' standard deviations."""
+    sensor, velocity, acceleration = (float(part) for part in text.split(","))
+    return {"sensor": sensor, "velocity": velocity, "acceleration": acceleration}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run a (scenario, seed, noise) simulation campaign in parallel.")
+    parser.add_argument("--scenarios", default=",".join(SCENARIOS),
+                        help="comma-separated scenario names (default: all)")
+    parser.add_argument("--seeds", type=_seeds, default=_seeds("0-9"), help="e.g. 0-99 or 1,5,7")
+    parser.add_argument("--noise", type=_noise, action="append",
+                        help="sensor,velocity,acceleration noise; repeat for several configs")
+    parser.add_argument("--output", default=DEFAULT_OUTPUT_DIR)
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: one per core)")
+    parser.add_argument("--perception", choices=("perfect",) + PERCEPTION_VARIANTS, default="perfect",
+                        help="perfect perception, or SimplePerceptionNet run as the given variant")
+    parser.add_argument("--abstraction", choices=list(ABSTRACTIONS), default="raw",
+                        help="bin the controller labels: raw values, decision regions, or mode inputs only")
+    parser.add_argument("--per-job", action="store_true", help="also export every job's controller LTS")
+    args = parser.parse_args()
+
+    try:
+        jobs = expand_jobs(
+            [s for s in args.scenarios.split(",") if s], args.seeds, args.noise or [DEFAULT_NOISE]
+        )
+    except ValueError as e:
+        parser.error(str(e))
+    run_campaign(
+        jobs, args.output, args.workers, args.per_job,
+        None if args.perception == "perfect" else args.perception, args.abstraction
+    )
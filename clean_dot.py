@@ -49,11 +49,17 @@ def write_clean_clustered_dot(lts_json, dot_path):
 
 import json
 
-# Load your LTS JSON file (replace with your actual file path)
-with open("ControllerLTS_assumption.json", "r") as f:
-    lts = json.load(f)
+from lts_core.compact_lts import expand_default_transitions
 
-write_clean_clustered_dot(lts, "lts_clean.dot")
+if __name__ == "__main__":
+    # Load your LTS JSON file (replace with your actual file path)
+    with open("ControllerLTS_assumption.json", "r") as f:
+        lts = json.load(f)
 
-# Then run in your terminal:
-# dot -Tpng lts_clean.dot -o lts_clean.png
+    # The assumption stores sink transitions implicitly; draw them explicitly.
+    lts = expand_default_transitions(lts)
+
+    write_clean_clustered_dot(lts, "lts_clean.dot")
+
+    # Then run in your terminal:
+    # dot -Tpng lts_clean.dot -o lts_clean.png
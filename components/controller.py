@@ -1,5 +1,15 @@
 import random
 
+# Cut points of the decision regions used by control(), e.g. for the
+# symbolic guard alphabet of the assumption generator.
+DECISION_BOUNDARIES = {
+    "obstacle_class": [0, 1],
+    "obstacle_distance": [3.0, 6.0, 12.0],
+}
+
+# Control states of control(), drive first
+MODES = ("drive", "coast", "brake", "emergency_brake", "stopped")
+
 class Controller:
     def __init__(self, vehicle, lts_builder):
         self.vehicle = vehicle
@@ -0,0 +1,106 @@
+import logging
+import time
+
+import numpy as np
+
+import backends
+
+# imported on first use, so that importing this module stays cheap
+torch = backends.lazy("torch")
+
+FRAME_SHAPE = (3, 28, 28)
+DEFAULT_BATCH_SIZE = 128  # larger batches fall out of cache on CPU
+WARMUP_BATCHES = 3
+
+# Inference variants of the model
+VARIANT_EAGER = "eager"              # the module itself, under inference mode
+VARIANT_TORCHSCRIPT = "torchscript"  # traced, frozen and optimised for inference
+VARIANT_INT8 = "int8"                # dynamically quantised fully connected layers
+PERCEPTION_VARIANTS = (VARIANT_EAGER, VARIANT_TORCHSCRIPT, VARIANT_INT8)
+
+
+def random_frames(distances, generator):
+    """The stand-in camera frames of main.run_case: one N(0, 1) image per distance."""
+    return torch.randn((len(distances),) + FRAME_SHAPE, generator=generator)
+
+
+class PerceptionService:
+    """
+    Batched CPU inference for SimplePerceptionNet.
+
+    Frames are classified in batches of batch_size under torch.inference_mode
+    rather than one call per step. frame_source(distances, generator)
+    returns the frames for an array of true obstacle distances (random
+    frames by default, as in run_case). The model is built under
+    torch.manual_seed(seed) unless one is given, and warmed up on startup.
+    threads sets torch's intra-op threads, e.g. 1 per worker process.
+    """
+
+    def __init__(self, model=None, variant=VARIANT_EAGER, batch_size=DEFAULT_BATCH_SIZE,
+                 frame_source=random_frames, seed=0, threads=None, warmup=True):
+        backends.load("torch")
+        if variant not in PERCEPTION_VARIANTS:
+            raise ValueError(f"Unknown perception variant: {variant!r}")
+        if threads is not None:
+            torch.set_num_threads(threads)
+        if model is None:
+            from components.perception_net import SimplePerceptionNet
+            torch.manual_seed(seed)
+            model = SimplePerceptionNet()
+        self.variant = variant
+        self.model = self._prepare(model.eval(), variant)
+        self.batch_size = batch_size
+        self.frame_source = frame_source
+        self.generator = torch.Generator().manual_seed(seed)
+        self.frames_classified = 0
+        if warmup:
+            self.warmup()
+
+    def _prepare(self, model, variant):
+        if variant == VARIANT_INT8:
+            # Dynamic quantisation covers the Linear layers; the convolutions stay float
+            return torch.ao.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+        if variant == VARIANT_TORCHSCRIPT:
+            with torch.no_grad():
+                traced = torch.jit.trace(model, torch.zeros((1,) + FRAME_SHAPE))
+            return torch.jit.optimize_for_inference(torch.jit.freeze(traced))
+        return model
+
+    def warmup(self, batches=WARMUP_BATCHES):
+        """Run a few full batches, so that lazy initialisation (and TorchScript's profiling runs) happen now."""
+        start = time.perf_counter()
+        frames = torch.zeros((self.batch_size,) + FRAME_SHAPE)
+        with torch.inference_mode():
+            for _ in range(batches):
+                self.model(frames)
+        logging.info("[Perception] %s model warmed up in %.3fs", self.variant, time.perf_counter() - start)
+
+    def classify(self, frames):
+        """Obstacle class of every frame of an (n, 3, 28, 28) tensor, as an int8 array."""
+        outputs = []
+        with torch.inference_mode():
+            for i in range(0, len(frames), self.batch_size):
+                outputs.append(self.model(frames[i:i + self.batch_size]).argmax(dim=1))
+        self.frames_classified += len(frames)
+        if not outputs:
+            return np.zeros(0, dtype=np.int8)
+        return torch.cat(outputs).to(torch.int8).numpy()
+
+    def perceive(self, distances):
+        """
+        Classes for an array of true distances, e.g. one step of every run
+        of monte_carlo.simulate(perception=service.perceive).
+        """
+        return self.classify(self.frame_source(distances, self.generator))
+
+    def scenario_perception(self, obstacle_distances, seed=None):
+        """
+        A perception(distance) callable for simulation.run_scenario. The
+        frames depend only on the scenario's true distances, not on the
+        closed loop, so every step's frame is classified up front in one
+        batch and the callable returns the results in step order. seed
+        gives the run its own frame stream.
+        """
+        generator = self.generator if seed is None else torch.Generator().manual_seed(seed)
+        classes = iter(self.classify(self.frame_source(list(obstacle_distances), generator)).tolist())
+        return lambda distance: next(classes)
@@ -1,5 +1,7 @@
 import json
 
+from lts_core.compact_lts import expand_default_transitions
+
 
 def export_lts_to_dot(lts_json, dot_filename="lts.dot", simplify_labels=True):
     """
@@ -38,7 +40,11 @@ def export_lts_to_dot(lts_json, dot_filename="lts.dot", simplify_labels=True):
 
     print(f"[INFO] DOT file saved to {dot_filename}")
 
-with open("ControllerLTS_assumption.json") as f:
-    lts_data = json.load(f)
+if __name__ == "__main__":
+    with open("ControllerLTS_assumption.json") as f:
+        lts_data = json.load(f)
+
+    # The assumption stores sink transitions implicitly; draw them explicitly.
+    lts_data = expand_default_transitions(lts_data)
 
-export_lts_to_dot(lts_data, dot_filename="lts.dot")
\ No newline at end of file
+    export_lts_to_dot(lts_data, dot_filename="lts.dot")
@@ -1,11 +1,47 @@
 from lts_builders.lts_utils import BaseLTSBuilder, TerminalColours, STATE_COLOUR_MAP
 
 class ControllerLTSBuilder(BaseLTSBuilder):
-    def __init__(self):
+    def __init__(self, abstraction=None):
+        """
+        abstraction (a LabelAbstraction, see label_abstraction.py) bins or
+        drops the logged values. Its labels are interned to integer ids as
+        they are logged, and each distinct transition is kept once, so the
+        LTS stays bounded however many steps are logged. Without one, every
+        step is kept with its values at two decimals.
+        """
         self.transitions = []
         self.current_state = 'drive'  # initial assumption
+        self.abstraction = abstraction
+        self.labels = []  # label id -> label
+        self.label_ids = {}  # label -> label id
+        self.transition_index = {}  # (from, label id, to) -> index in transitions
+        self.steps = 0  # steps logged, kept or not
+
+    def intern(self, label):
+        """Id of label, registering it on first use."""
+        label_id = self.label_ids.get(label)
+        if label_id is None:
+            label_id = self.label_ids[label] = len(self.labels)
+            self.labels.append(label)
+        return label_id
 
     def log_step(self, obs, dist, next_state, est_vel=None, est_acc=None, req_acc=None):
+        self.steps += 1
+        if self.abstraction is not None:
+            label_id = self.intern(self.abstraction.label({
+                "obstacle_class": obs,
+                "obstacle_distance": dist,
+                "est_vel": est_vel,
+                "est_acc": est_acc,
+                "req_acc": req_acc,
+            }))
+            key = (self.current_state, label_id, next_state)
+            if key not in self.transition_index:
+                self.transition_index[key] = len(self.transitions)
+                self.transitions.append((self.current_state, self.labels[label_id], next_state, next_state))
+            self.current_state = next_state
+            return
+
         # Use key=value format instead of observe(...)
         label = f"obstacle_class={obs}, obstacle_distance={dist:.2f}"
         
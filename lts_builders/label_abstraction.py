@@ -0,0 +1,130 @@
+from bisect import bisect_right
+import math
+
+from components.controller import DECISION_BOUNDARIES
+
+
+def _fmt(value):
+    return f"{value:g}"
+
+
+def _interval(lo, hi):
+    # Written lo..hi rather than [lo, hi) so that parse_action_label, which
+    # splits on "," and "=", keeps the bin as one text value
+    return f"{_fmt(lo)}..{_fmt(hi)}"
+
+
+class Raw:
+    """The value itself, at `decimals` places (integers are kept as they are)."""
+
+    def __init__(self, decimals=2):
+        self.decimals = decimals
+
+    def __call__(self, value):
+        if isinstance(value, int):
+            return str(value)
+        return f"{value:.{self.decimals}f}"
+
+
+class Drop:
+    """Leaves the field out of the label."""
+
+    def __call__(self, value):
+        return None
+
+
+class Thresholds:
+    """
+    Half-open bins [c_i, c_i+1) between sorted cut points, written "lo..hi"
+    ("-inf..c1" and "ck..inf" at the ends), which matches the `<` tests of
+    Controller.control. A value that rounds, at `decimals` places as Raw
+    writes it, to one of `points` is kept as a number, so that a property
+    such as obstacle_distance == 0.0 gets the same verdict as on raw labels.
+    """
+
+    def __init__(self, cuts, points=(), decimals=2):
+        self.cuts = sorted(float(c) for c in cuts)
+        self.points = {float(p) for p in points}
+        self.decimals = decimals
+        edges = [-math.inf] + self.cuts + [math.inf]
+        self._bins = [_interval(lo, hi) for lo, hi in zip(edges, edges[1:])]
+
+    def __call__(self, value):
+        if round(value, self.decimals) in self.points:
+            return f"{value:.{self.decimals}f}"
+        return self._bins[bisect_right(self.cuts, value)]
+
+
+class UniformBins:
+    """Bins of equal `width` starting at `origin`, written "lo..hi"."""
+
+    def __init__(self, width, origin=0.0):
+        if width <= 0:
+            raise ValueError(f"Bin width must be positive, got {width}")
+        self.width = width
+        self.origin = origin
+        self._bins = {}  # bin index -> text, formatted once
+
+    def __call__(self, value):
+        i = math.floor((value - self.origin) / self.width)
+        text = self._bins.get(i)
+        if text is None:
+            lo = self.origin + i * self.width
+            text = self._bins[i] = _interval(lo, lo + self.width)
+        return text
+
+
+class LabelAbstraction:
+    """
+    Maps the fields of a logged step to an action label, one scheme per
+    field (Raw, Drop, Thresholds, UniformBins or any callable returning the
+    value's text, or None to drop it). Fields without a scheme are kept Raw.
+    With every field binned or dropped the number of distinct labels is
+    bounded, however many steps are logged.
+    """
+
+    def __init__(self, schemes=None):
+        self.schemes = dict(schemes or {})
+        self._raw = Raw()
+
+    def label(self, values):
+        """Label of a {field: value} mapping; fields whose value is None are left out."""
+        parts = []
+        for field, value in values.items():
+            if value is None:
+                continue
+            text = self.schemes.get(field, self._raw)(value)
+            if text is not None:
+                parts.append(f"{field}={text}")
+        return ", ".join(parts)
+
+
+def decision_abstraction(velocity_bin=1.0, acceleration_bin=1.0):
+    """
+    Distance binned at the controller's decision boundaries (0.0 kept exact,
+    for the collision property), estimates in uniform bins, and the requested
+    acceleration, which only takes a handful of values, kept raw.
+    """
+    return LabelAbstraction({
+        "obstacle_distance": Thresholds([0.0] + DECISION_BOUNDARIES["obstacle_distance"], points=[0.0]),
+        "est_vel": UniformBins(velocity_bin),
+        "est_acc": UniformBins(acceleration_bin),
+    })
+
+
+def mode_abstraction():
+    """Only the perception output and the distance region: the inputs control() branches on."""
+    return LabelAbstraction({
+        "obstacle_distance": Thresholds([0.0] + DECISION_BOUNDARIES["obstacle_distance"], points=[0.0]),
+        "est_vel": Drop(),
+        "est_acc": Drop(),
+        "req_acc": Drop(),
+    })
+
+
+# Named abstractions for the command-line tools; "raw" logs every value, as before
+ABSTRACTIONS = {
+    "raw": lambda: None,
+    "decision": decision_abstraction,
+    "mode": mode_abstraction,
+}
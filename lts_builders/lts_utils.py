@@ -1,6 +1,8 @@
 from abc import ABC, abstractmethod
 import json
 
+from lts_core.lts_binary import write_binary
+
 class TerminalColours:
     RESET = "\033[0m"
     GREEN = "\033[32m"
@@ -17,6 +19,9 @@ STATE_COLOUR_MAP = {
     "stopped": TerminalColours.RED,
 }
 
+def _state_name(state):
+    return state if isinstance(state, str) else str(state)
+
 class BaseLTSBuilder(ABC):
     @abstractmethod
     def colour_line(self, line: str, **kwargs) -> str:
@@ -26,22 +31,20 @@ class BaseLTSBuilder(ABC):
     def log_step(self, i, state, **kwargs):
         pass
 
-    def export_to_json(
-        self,
-        json_path="lts.json",
-        name="UnnamedLTS",
-        initial_state=None,
-        property_dict=None
-    ):
+    def to_lts_json(self, name="UnnamedLTS", initial_state=None, property_dict=None):
         """
-        Export the LTS to JSON. Assumes subclass has get_transitions().
+        Build the LTS in the JSON schema. Assumes subclass has get_transitions().
         """
-        transitions_raw = self.get_transitions()
+        # Controller transitions carry a 4th element, vehicle transitions do not;
+        # vehicle states are tuples, so state names are taken as str()
+        transitions_raw = [
+            (_state_name(t[0]), t[1], _state_name(t[2])) for t in self.get_transitions()
+        ]
 
         # Collect unique states and actions
         states = set()
         actions = set()
-        for from_state, label, to_state, _ in transitions_raw:
+        for from_state, label, to_state in transitions_raw:
             states.add(from_state)
             states.add(to_state)
             actions.add(label)
@@ -49,7 +52,7 @@ class BaseLTSBuilder(ABC):
         # Build transition list
         transitions = [
             {"from": from_state, "to": to_state, "action": label}
-            for from_state, label, to_state, _ in transitions_raw
+            for from_state, label, to_state in transitions_raw
         ]
 
         # Determine initial state
@@ -59,13 +62,13 @@ class BaseLTSBuilder(ABC):
                 initial_state = transitions_raw[0][0]
         if initial_state is None:
             raise ValueError("Could not determine initial state; please pass it explicitly.")
+        initial_state = _state_name(initial_state)
 
         # Default empty property
         if property_dict is None:
             property_dict = {}
 
-        # Build JSON
-        lts_json = {
+        return {
             "name": name,
             "states": sorted(states),
             "initial_state": initial_state,
@@ -74,8 +77,34 @@ class BaseLTSBuilder(ABC):
             "property": property_dict
         }
 
+    def export_to_json(
+        self,
+        json_path="lts.json",
+        name="UnnamedLTS",
+        initial_state=None,
+        property_dict=None
+    ):
+        """
+        Export the LTS to JSON. Assumes subclass has get_transitions().
+        """
+        lts_json = self.to_lts_json(name, initial_state, property_dict)
+
         # Write to file
         with open(json_path, "w") as f:
             json.dump(lts_json, f, indent=4)
 
         print(f"LTS '{name}' exported to {json_path}")
+
+    def export_to_binary(
+        self,
+        binary_path="lts.ltsb",
+        name="UnnamedLTS",
+        initial_state=None,
+        property_dict=None
+    ):
+        """
+        Export the LTS to the binary format of lts_core/lts_binary.py.
+        """
+        write_binary(self.to_lts_json(name, initial_state, property_dict), binary_path)
+
+        print(f"LTS '{name}' exported to {binary_path}")
@@ -0,0 +1,177 @@
+import logging
+import math
+import operator
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+OPERATORS = {
+    "==": operator.eq,
+    "!=": operator.ne,
+    "<": operator.lt,
+    ">": operator.gt,
+    "<=": operator.le,
+    ">=": operator.ge,
+}
+
+
+def parse_action_label(action_str):
+    """
+    Converts an action string like "a=1, b=2" to a dictionary {'a': 1.0, 'b': 2.0}.
+    Values that are not numbers are kept as strings. Raises ValueError for a
+    malformed part such as "a=1=2". Parentheses around the whole label, as in
+    the vehicle's "(acceleration=-4.0, act_vel=5.20)", are dropped.
+    """
+    result = {}
+    action_str = action_str.strip()
+    if action_str.startswith("(") and action_str.endswith(")"):
+        action_str = action_str[1:-1]
+    for part in action_str.split(","):
+        if "=" in part:
+            key, val = part.split("=")
+            key = key.strip()
+            val = val.strip()
+            try:
+                val = float(val)
+            except ValueError:
+                pass
+            result[key] = val
+    return result
+
+
+class ActionTable:
+    """
+    Columnar table of parsed action labels, one row per action id.
+
+    Labels are parsed once, when sync() first sees them; each numeric field is
+    kept as one column (a NumPy float array when NumPy is available, NaN where
+    the field is absent) and non-numeric values are kept per field in a sparse
+    text map. Conditions over a field are evaluated for all rows at once.
+    Labels that fail to parse are recorded in `failed` with their error.
+    """
+
+    def __init__(self):
+        self.labels = []
+        self.failed = {}  # row -> error message
+        self._values = {}  # field -> list of floats (NaN if absent)
+        self._text = {}  # field -> {row: str}
+        self._columns = {}
+
+    def __len__(self):
+        return len(self.labels)
+
+    def sync(self, labels):
+        """
+        Parse labels[len(self):], i.e. every label added since the last call,
+        and report the ones that could not be parsed. Returns the number of
+        new parse failures.
+        """
+        start = len(self.labels)
+        new_failures = []
+        for label in labels[start:]:
+            row = len(self.labels)
+            self.labels.append(label)
+            try:
+                parsed = parse_action_label(label)
+            except ValueError as e:
+                self.failed[row] = str(e)
+                new_failures.append(label)
+                parsed = {}
+            for field, value in parsed.items():
+                if field not in self._values:
+                    self._values[field] = [math.nan] * row
+                if isinstance(value, str):
+                    self._text.setdefault(field, {})[row] = value
+                else:
+                    self._values[field].append(value)
+            for column in self._values.values():
+                if len(column) == row:
+                    column.append(math.nan)
+        if len(self.labels) != start:
+            self._columns = {}
+        if new_failures:
+            logging.warning(
+                "[Parse] %d of %d action labels could not be parsed (e.g. %s)",
+                len(new_failures), len(self.labels) - start,
+                ", ".join(repr(label) for label in new_failures[:3])
+            )
+        return len(new_failures)
+
+    @property
+    def fields(self):
+        return list(self._values)
+
+    def column(self, field):
+        """Values of field for every row (NaN where absent or non-numeric)."""
+        column = self._columns.get(field)
+        if column is None:
+            values = self._values.get(field, [math.nan] * len(self.labels))
+            column = np.array(values, dtype=np.float64) if np is not None else values
+            self._columns[field] = column
+        return column
+
+    def parsed(self, row):
+        return row not in self.failed
+
+    def row(self, row):
+        """Parsed dictionary of one row, as parse_action_label would return it."""
+        result = {}
+        for field, values in self._values.items():
+            value = values[row]
+            if value == value:  # not NaN
+                result[field] = value
+        for field, text in self._text.items():
+            if row in text:
+                result[field] = text[row]
+        return result
+
+    def violations(self, field, op, value):
+        """
+        Evaluate `field op value` over every row. Rows without the field, and
+        rows that failed to parse, never violate.
+        """
+        compare = OPERATORS.get(op)
+        n = len(self.labels)
+        if compare is None:
+            return [False] * n
+        if isinstance(value, str):
+            text = self._text.get(field, {})
+            mask = [False] * n
+            if op in ("==", "!="):
+                for row, actual in text.items():
+                    mask[row] = compare(actual, value)
+            if op == "!=":
+                # numeric values always differ from a non-numeric value
+                for row, actual in enumerate(self.column(field)):
+                    if actual == actual:
+                        mask[row] = True
+            return mask
+        column = self.column(field)
+        if np is not None:
+            with np.errstate(invalid="ignore"):
+                mask = compare(column, value) & ~np.isnan(column)
+        else:
+            mask = [actual == actual and compare(actual, value) for actual in column]
+        if op == "!=":
+            # non-numeric values always differ from a numeric value
+            for row in self._text.get(field, {}):
+                mask[row] = True
+        for row in self.failed:
+            mask[row] = False
+        return mask
+
+    def violates(self, row, field, op, value):
+        """violations() for a single row."""
+        compare = OPERATORS.get(op)
+        actual = self.row(row).get(field)
+        if compare is None or actual is None or row in self.failed:
+            return False
+        if isinstance(actual, str) or isinstance(value, str):
+            if op == "==":
+                return actual == value
+            if op == "!=":
+                return actual != value
+            return False
+        return compare(actual, value)
@@ -0,0 +1,432 @@
+from array import array
+
+# Per-state flag bits
+ERROR = 1
+SINK = 2
+INITIAL = 4
+UNSAFE = 8
+
+SINK_STATE = "sink"
+
+# Label of internal actions hidden by projection
+TAU = "tau"
+
+JSON_KEYS = (
+    "states", "initial_state", "transitions", "interface_alphabet", "unsafe_states",
+    "default_target", "default_targets", "blocked_transitions", "violations",
+)
+
+
+def is_error_name(state):
+    """
+    True if a state name denotes an error state: either 'err' itself (or
+    'err:<mask>' in multi-property mode), a product state whose last
+    component is one (e.g. "brake||err"), or a determinised macro-state
+    "{...}" with such a member.
+    """
+    if state.startswith("{") and state.endswith("}"):
+        return any(is_error_name(member) for member in state[1:-1].split(","))
+    last = state.rsplit("||", 1)[-1]
+    return last == "err" or last.startswith("err:")
+
+
+class SymbolTable:
+    """Bidirectional mapping between names and dense integer ids."""
+
+    def __init__(self, names=()):
+        self.names = []
+        self.ids = {}
+        for name in names:
+            self.intern(name)
+
+    def intern(self, name):
+        idx = self.ids.get(name)
+        if idx is None:
+            idx = len(self.names)
+            self.ids[name] = idx
+            self.names.append(name)
+        return idx
+
+    def get(self, name, default=None):
+        return self.ids.get(name, default)
+
+    def rename(self, idx, name):
+        if name in self.ids:
+            raise ValueError(f"Name '{name}' is already taken.")
+        del self.ids[self.names[idx]]
+        self.ids[name] = idx
+        self.names[idx] = name
+
+    def __contains__(self, name):
+        return name in self.ids
+
+    def __getitem__(self, idx):
+        return self.names[idx]
+
+    def __len__(self):
+        return len(self.names)
+
+
+class CompactLTS:
+    """
+    Integer-encoded LTS.
+
+    States and actions live in symbol tables, transitions are stored as three
+    parallel int arrays (src, dst, act) and every state carries a byte of flag
+    bits (ERROR, SINK, INITIAL, UNSAFE). Outgoing and incoming transitions are
+    indexed CSR-style on demand: offsets[s]:offsets[s + 1] slices the edge ids
+    of state s.
+
+    A state may also have an implicit default target (e.g. the sink): every
+    alphabet action without an explicit or blocked transition from that state
+    goes there. Blocked (state, action) pairs have no successor at all, e.g.
+    transitions into a removed error state. expand_defaults() makes the
+    default transitions explicit for consumers that need them.
+
+    In multi-property mode `violations` holds, per state, the bitmask of the
+    properties the state violates (bit k for property k); it is None when
+    only one property is checked.
+    """
+
+    def __init__(self, actions=None):
+        self.states = SymbolTable()
+        self.actions = actions if actions is not None else SymbolTable()
+        self.flags = bytearray()
+        self.default = array('i')
+        self.blocked_src = array('i')
+        self.blocked_act = array('i')
+        self.src = array('i')
+        self.dst = array('i')
+        self.act = array('i')
+        self.initial = -1
+        self.alphabet = None  # list of action ids, or None if not declared
+        self.track_unsafe = False
+        self.violations = None
+        self.extra = {}
+        self._out = None
+        self._in = None
+
+    # --- construction ---
+
+    def add_state(self, name, flags=0, violations=0):
+        idx = self.states.intern(name)
+        if idx == len(self.flags):
+            self.flags.append(flags)
+            self.default.append(-1)
+            if self.violations is not None:
+                self.violations.append(violations)
+        else:
+            self.flags[idx] |= flags
+            if self.violations is not None:
+                self.violations[idx] |= violations
+        return idx
+
+    def set_initial(self, state):
+        if self.initial >= 0:
+            self.flags[self.initial] &= ~INITIAL
+        self.initial = state
+        self.flags[state] |= INITIAL
+
+    def add_transition(self, src, dst, act):
+        self.src.append(src)
+        self.dst.append(dst)
+        self.act.append(act)
+        self._out = self._in = None
+
+    def redirect(self, edge, dst):
+        """Point an existing transition at a new target state."""
+        self.dst[edge] = dst
+        self._out = self._in = None
+
+    def set_default(self, state, target):
+        self.default[state] = target
+
+    def block(self, state, act):
+        self.blocked_src.append(state)
+        self.blocked_act.append(act)
+
+    def set_alphabet(self, action_names):
+        self.alphabet = [self.actions.intern(a) for a in action_names]
+
+    # --- queries ---
+
+    @property
+    def num_states(self):
+        return len(self.states)
+
+    @property
+    def num_transitions(self):
+        return len(self.src)
+
+    def is_error(self, state):
+        return bool(self.flags[state] & ERROR)
+
+    def alphabet_mask(self):
+        """bytearray over action ids, 1 for actions in the interface alphabet."""
+        mask = bytearray(len(self.actions))
+        for a in (self.alphabet if self.alphabet is not None else range(len(self.actions))):
+            mask[a] = 1
+        return mask
+
+    def _build_index(self, keys):
+        n = self.num_states
+        offsets = array('i', [0]) * (n + 1)
+        for k in keys:
+            offsets[k + 1] += 1
+        for i in range(n):
+            offsets[i + 1] += offsets[i]
+        edges = array('i', [0]) * len(keys)
+        fill = offsets[:-1]
+        for e, k in enumerate(keys):
+            edges[fill[k]] = e
+            fill[k] += 1
+        return offsets, edges
+
+    def out_index(self):
+        if self._out is None or len(self._out[0]) != self.num_states + 1:
+            self._out = self._build_index(self.src)
+        return self._out
+
+    def in_index(self):
+        if self._in is None or len(self._in[0]) != self.num_states + 1:
+            self._in = self._build_index(self.dst)
+        return self._in
+
+    def outgoing(self, state):
+        offsets, edges = self.out_index()
+        return edges[offsets[state]:offsets[state + 1]]
+
+    def incoming(self, state):
+        offsets, edges = self.in_index()
+        return edges[offsets[state]:offsets[state + 1]]
+
+    def states_with(self, flag):
+        return [s for s, f in enumerate(self.flags) if f & flag]
+
+    # --- derived automata ---
+
+    def subgraph(self, keep_state, keep_edge=None, block_removed=False):
+        """
+        Return a new LTS with only the states where keep_state[s] is true and
+        the transitions between them (optionally filtered by keep_edge[e]).
+        With block_removed, transitions from a kept state into a removed one
+        become blocked. The action table is shared with this LTS.
+        """
+        sub = CompactLTS(self.actions)
+        sub.alphabet = self.alphabet
+        sub.track_unsafe = self.track_unsafe
+        sub.extra = dict(self.extra)
+        if self.violations is not None:
+            sub.violations = array('Q')
+        remap = array('i', [-1]) * self.num_states
+        for s in range(self.num_states):
+            if keep_state[s]:
+                remap[s] = sub.add_state(
+                    self.states[s], self.flags[s],
+                    self.violations[s] if self.violations is not None else 0
+                )
+        if self.initial >= 0 and remap[self.initial] >= 0:
+            sub.initial = remap[self.initial]
+        for s in range(self.num_states):
+            u = remap[s]
+            if u >= 0 and self.default[s] >= 0:
+                sub.default[u] = remap[self.default[s]]
+        for s, a in zip(self.blocked_src, self.blocked_act):
+            if remap[s] >= 0:
+                sub.block(remap[s], a)
+        for e in range(self.num_transitions):
+            u = remap[self.src[e]]
+            v = remap[self.dst[e]]
+            if u < 0 or (keep_edge is not None and not keep_edge[e]):
+                continue
+            if v >= 0:
+                sub.src.append(u)
+                sub.dst.append(v)
+                sub.act.append(self.act[e])
+            elif block_removed:
+                sub.block(u, self.act[e])
+        return sub
+
+    def expand_defaults(self, complement=None):
+        """
+        Return a copy in which every implicit default transition is explicit:
+        from each state with a default target, one edge per alphabet action
+        that has neither an explicit nor a blocked transition. With
+        complement, each such state instead gets a single edge labelled
+        complement(defined_action_ids) (used for symbolic guards).
+        """
+        expanded = self.subgraph(bytearray([1]) * self.num_states)
+        expanded.default = array('i', [-1]) * self.num_states
+        expanded.blocked_src = array('i')
+        expanded.blocked_act = array('i')
+        offsets, edges = self.out_index()
+        blocked = {}
+        for s, a in zip(self.blocked_src, self.blocked_act):
+            blocked.setdefault(s, set()).add(a)
+        alphabet = self.alphabet if self.alphabet is not None else range(len(self.actions))
+
+        for s in range(self.num_states):
+            target = self.default[s]
+            if target < 0:
+                continue
+            defined = {self.act[e] for e in edges[offsets[s]:offsets[s + 1]]}
+            defined |= blocked.get(s, set())
+            missing = [a for a in alphabet if a not in defined]
+            if not missing:
+                continue
+            if complement is not None:
+                expanded.add_transition(s, target, complement(defined))
+            else:
+                for a in missing:
+                    expanded.add_transition(s, target, a)
+        return expanded
+
+    # --- JSON schema ---
+
+    @classmethod
+    def from_json(cls, lts_json, actions=None):
+        lts = cls(actions)
+        for name in lts_json.get("states", []):
+            flags = ERROR if is_error_name(name) else 0
+            if name == SINK_STATE:
+                flags |= SINK
+            lts.add_state(name, flags)
+        initial = lts_json.get("initial_state")
+        if initial is not None:
+            lts.set_initial(lts.add_state(initial))
+        if "interface_alphabet" in lts_json:
+            lts.set_alphabet(lts_json["interface_alphabet"])
+        intern_state = lts.states.intern
+        for t in lts_json.get("transitions", []):
+            for name in (t["from"], t["to"]):
+                if name not in lts.states:
+                    lts.add_state(name, ERROR if is_error_name(name) else 0)
+            lts.src.append(intern_state(t["from"]))
+            lts.dst.append(intern_state(t["to"]))
+            lts.act.append(lts.actions.intern(t["action"]))
+        if "unsafe_states" in lts_json:
+            lts.track_unsafe = True
+            for name in lts_json["unsafe_states"]:
+                lts.flags[lts.add_state(name)] |= UNSAFE | ERROR
+        if "default_target" in lts_json:
+            target = lts.add_state(lts_json["default_target"])
+            for s in range(lts.num_states):
+                if s != target:
+                    lts.default[s] = target
+        for name, target in lts_json.get("default_targets", {}).items():
+            lts.default[lts.add_state(name)] = lts.add_state(target)
+        for t in lts_json.get("blocked_transitions", []):
+            lts.block(lts.add_state(t["from"]), lts.actions.intern(t["action"]))
+        if "violations" in lts_json:
+            lts.violations = array('Q', [0]) * lts.num_states
+            for name, mask in lts_json["violations"].items():
+                s = lts.add_state(name)
+                lts.violations[s] = mask
+                lts.flags[s] |= ERROR
+        for key, value in lts_json.items():
+            if key not in JSON_KEYS:
+                lts.extra[key] = value
+        return lts
+
+    def transition_dicts(self):
+        state_names = self.states.names
+        action_names = self.actions.names
+        return [
+            {"from": state_names[u], "to": state_names[v], "action": action_names[a]}
+            for u, v, a in zip(self.src, self.dst, self.act)
+        ]
+
+    def to_json(self):
+        lts_json = {
+            "states": list(self.states.names),
+            "initial_state": self.states[self.initial] if self.initial >= 0 else None,
+            "transitions": self.transition_dicts(),
+        }
+        if self.alphabet is not None:
+            lts_json["interface_alphabet"] = [self.actions[a] for a in self.alphabet]
+        lts_json.update(self.extra)
+        defaults = [(s, t) for s, t in enumerate(self.default) if t >= 0]
+        if defaults:
+            targets = {t for _, t in defaults}
+            target = next(iter(targets))
+            if len(targets) == 1 and self.default[target] < 0 and len(defaults) == self.num_states - 1:
+                lts_json["default_target"] = self.states[target]
+            else:
+                lts_json["default_targets"] = {self.states[s]: self.states[t] for s, t in defaults}
+        if len(self.blocked_src):
+            lts_json["blocked_transitions"] = [
+                {"from": self.states[s], "action": self.actions[a]}
+                for s, a in zip(self.blocked_src, self.blocked_act)
+            ]
+        if self.track_unsafe:
+            lts_json["unsafe_states"] = [self.states[s] for s in self.states_with(UNSAFE)]
+        if self.violations is not None:
+            lts_json["violations"] = {
+                self.states[s]: mask for s, mask in enumerate(self.violations) if mask
+            }
+        return lts_json
+
+    # --- columnar form ---
+
+    def to_columns(self):
+        """
+        Lossless plain-data form of the integer encoding (ids, flags and
+        columns as lists), for caches that must restore exactly this LTS.
+        """
+        return {
+            "states": list(self.states.names),
+            "actions": list(self.actions.names),
+            "flags": list(self.flags),
+            "default": self.default.tolist(),
+            "initial": self.initial,
+            "src": self.src.tolist(),
+            "dst": self.dst.tolist(),
+            "act": self.act.tolist(),
+            "blocked_src": self.blocked_src.tolist(),
+            "blocked_act": self.blocked_act.tolist(),
+            "alphabet": list(self.alphabet) if self.alphabet is not None else None,
+            "track_unsafe": self.track_unsafe,
+            "violations": self.violations.tolist() if self.violations is not None else None,
+            "extra": self.extra,
+        }
+
+    @classmethod
+    def from_columns(cls, columns, actions=None):
+        """
+        Inverse of to_columns(). With a shared action table, the stored
+        action ids are remapped onto it.
+        """
+        lts = cls(actions)
+        ids = [lts.actions.intern(name) for name in columns["actions"]]
+        identity = ids == list(range(len(ids)))
+
+        def remap(values):
+            return array('i', values if identity else (ids[a] for a in values))
+
+        for name in columns["states"]:
+            lts.states.intern(name)
+        lts.flags = bytearray(columns["flags"])
+        lts.default = array('i', columns["default"])
+        lts.initial = columns["initial"]
+        lts.src = array('i', columns["src"])
+        lts.dst = array('i', columns["dst"])
+        lts.act = remap(columns["act"])
+        lts.blocked_src = array('i', columns["blocked_src"])
+        lts.blocked_act = remap(columns["blocked_act"])
+        if columns["alphabet"] is not None:
+            lts.alphabet = list(remap(columns["alphabet"]))
+        lts.track_unsafe = columns["track_unsafe"]
+        if columns["violations"] is not None:
+            lts.violations = array('Q', columns["violations"])
+        lts.extra = dict(columns["extra"])
+        return lts
+
+
+def expand_default_transitions(lts_json):
+    """
+    Return lts_json with its implicit default (sink) transitions written out
+    as explicit transitions, for exporters such as DOT/PNG.
+    """
+    if "default_target" not in lts_json and "default_targets" not in lts_json:
+        return lts_json
+    return CompactLTS.from_json(lts_json).expand_defaults().to_json()
@@ -0,0 +1,117 @@
+import logging
+from array import array
+
+from lts_core.compact_lts import CompactLTS, ERROR, UNSAFE, TAU
+
+DEFAULT_MAX_MACRO_STATES = 100000
+DEFAULT_PROGRESS_EVERY = 10000
+
+
+class DeterminisationLimitExceeded(RuntimeError):
+    """Raised when subset construction explores more macro-states than allowed."""
+
+
+def macro_state_name(member_names):
+    """
+    Name of a macro-state: the member's own name for singletons, otherwise
+    "{a,b,...}" with member names sorted, so the name does not depend on the
+    order in which states were numbered.
+    """
+    if len(member_names) == 1:
+        return member_names[0]
+    return "{" + ",".join(sorted(member_names)) + "}"
+
+
+def subset_construction(lts, max_macro_states=DEFAULT_MAX_MACRO_STATES,
+                        progress_every=DEFAULT_PROGRESS_EVERY, progress=None):
+    """
+    On-the-fly subset construction over the reachable macro-states of lts.
+
+    Macro-states are interned as frozensets of state ids and closed under
+    internal (τ) moves, which do not appear in the result. A macro-state that
+    contains an error state is itself an error state (likewise for UNSAFE);
+    its violation mask, if any, is the union of its members' masks.
+    Raises DeterminisationLimitExceeded once more than max_macro_states
+    macro-states have been discovered. progress, if given, is called as
+    progress(explored, discovered, blow_up) every progress_every macro-states.
+    """
+    offsets, edges = lts.out_index()
+    tau = lts.actions.get(TAU)
+    det = CompactLTS(lts.actions)
+    det.alphabet = lts.alphabet if lts.alphabet is None else [a for a in lts.alphabet if a != tau]
+    det.track_unsafe = lts.track_unsafe
+    det.extra = dict(lts.extra)
+    if lts.violations is not None:
+        det.violations = array('Q')
+
+    macro_ids = {}
+    macro_states = []
+    num_states = max(lts.num_states, 1)
+
+    def closure(states):
+        if tau is None:
+            return frozenset(states)
+        closed = set(states)
+        stack = list(states)
+        while stack:
+            s = stack.pop()
+            for e in edges[offsets[s]:offsets[s + 1]]:
+                if lts.act[e] == tau and lts.dst[e] not in closed:
+                    closed.add(lts.dst[e])
+                    stack.append(lts.dst[e])
+        return frozenset(closed)
+
+    def intern(members):
+        idx = macro_ids.get(members)
+        if idx is None:
+            if len(macro_states) >= max_macro_states:
+                raise DeterminisationLimitExceeded(
+                    f"Subset construction exceeded {max_macro_states} macro-states "
+                    f"(blow-up {len(macro_states) / num_states:.2f}x over {lts.num_states} states)."
+                )
+            flags = 0
+            violations = 0
+            for s in members:
+                flags |= lts.flags[s]
+                if lts.violations is not None:
+                    violations |= lts.violations[s]
+            idx = det.add_state(
+                macro_state_name([lts.states[s] for s in members]),
+                flags & (ERROR | UNSAFE), violations
+            )
+            macro_ids[members] = idx
+            macro_states.append(members)
+        return idx
+
+    if lts.initial >= 0:
+        det.set_initial(intern(closure((lts.initial,))))
+
+    explored = 0
+    while explored < len(macro_states):
+        src = explored
+        successors = {}
+        for s in macro_states[src]:
+            for e in edges[offsets[s]:offsets[s + 1]]:
+                if lts.act[e] != tau:
+                    successors.setdefault(lts.act[e], set()).add(lts.dst[e])
+        for a, targets in successors.items():
+            det.add_transition(src, intern(closure(targets)), a)
+        explored += 1
+
+        if progress_every and explored % progress_every == 0:
+            blow_up = len(macro_states) / num_states
+            logging.info(
+                "[Determinise] %d macro-states explored, %d discovered (blow-up %.2fx)",
+                explored, len(macro_states), blow_up
+            )
+            if progress is not None:
+                progress(explored, len(macro_states), blow_up)
+
+    blow_up = len(macro_states) / num_states
+    logging.info(
+        "[Determinise] %d states -> %d macro-states (blow-up %.2fx)",
+        lts.num_states, len(macro_states), blow_up
+    )
+    if progress is not None:
+        progress(explored, len(macro_states), blow_up)
+    return det
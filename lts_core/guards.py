@@ -0,0 +1,132 @@
+from bisect import bisect_left
+import math
+
+INF = math.inf
+
+
+def _fmt(value):
+    return f"{value:g}"
+
+
+class GuardAlphabet:
+    """
+    Symbolic interface alphabet made of guards over parsed action fields.
+
+    Each field gets a sorted list of cut points c1 < ... < ck, which split the
+    real line into decision regions (-inf, c1), [c1], (c1, c2), ..., (ck, inf).
+    A guard is a conjunction with one region per field that appeared in the
+    concrete label: either an open interval (lo, hi), a point (v, v), or, for
+    non-numeric values, the value itself. Fields without cut points are
+    dropped, so every concrete label maps to the region it falls into and the
+    alphabet size depends on the number of regions, not on the number of
+    logged steps.
+    """
+
+    def __init__(self, boundaries):
+        self.fields = list(boundaries)
+        self.cuts = {
+            field: sorted({float(c) for c in cuts})
+            for field, cuts in boundaries.items()
+        }
+        self.guards = {}  # label -> guard
+
+    @classmethod
+    def from_property(cls, P, boundaries=None):
+        """
+        Cut points from boundaries plus the value of P's violation condition
+        (P may also be a list of properties).
+        """
+        merged = {field: list(cuts) for field, cuts in (boundaries or {}).items()}
+        for prop in (P if isinstance(P, list) else [P]):
+            condition = prop["violation_condition"]
+            if not isinstance(condition["value"], str):
+                merged.setdefault(condition["field"], []).append(condition["value"])
+            else:
+                merged.setdefault(condition["field"], [])
+        return cls(merged)
+
+    def region(self, field, value):
+        if isinstance(value, str):
+            return value
+        cuts = self.cuts[field]
+        i = bisect_left(cuts, value)
+        if i < len(cuts) and cuts[i] == value:
+            return (value, value)
+        lo = cuts[i - 1] if i > 0 else -INF
+        hi = cuts[i] if i < len(cuts) else INF
+        return (lo, hi)
+
+    def guard_of(self, action_dict):
+        """Guard (tuple of (field, region)) containing a parsed concrete action."""
+        return tuple(
+            (field, self.region(field, action_dict[field]))
+            for field in self.fields
+            if field in action_dict
+        )
+
+    def label(self, guard):
+        parts = []
+        for field, region in guard:
+            if isinstance(region, str):
+                parts.append(f"{field}={region}")
+                continue
+            lo, hi = region
+            if lo == hi:
+                parts.append(f"{field}={_fmt(lo)}")
+            elif lo == -INF and hi == INF:
+                continue
+            elif lo == -INF:
+                parts.append(f"{field}<{_fmt(hi)}")
+            elif hi == INF:
+                parts.append(f"{field}>{_fmt(lo)}")
+            else:
+                parts.append(f"{_fmt(lo)}<{field}<{_fmt(hi)}")
+        return ", ".join(parts) if parts else "true"
+
+    def abstract(self, action_dict):
+        """Return the guard label for a parsed action, registering the guard."""
+        guard = self.guard_of(action_dict)
+        label = self.label(guard)
+        self.guards.setdefault(label, guard)
+        return label
+
+    def may_violate(self, label, field, operator, value):
+        """
+        True if some concrete action inside the guard satisfies
+        `field operator value`. Exact whenever value is one of the cut points
+        of field, which from_property guarantees for the property's own value.
+        """
+        region = dict(self.guards[label]).get(field)
+        if region is None:
+            return False
+        if isinstance(region, str) or isinstance(value, str):
+            if operator == "==":
+                return region == value
+            if operator == "!=":
+                return region != value
+            return False
+        lo, hi = region
+        if lo == hi:
+            actual = lo
+            return {
+                "==": actual == value, "!=": actual != value,
+                "<": actual < value, ">": actual > value,
+                "<=": actual <= value, ">=": actual >= value,
+            }.get(operator, False)
+        # open interval (lo, hi)
+        if operator == "==":
+            return lo < value < hi
+        if operator == "!=":
+            return True
+        if operator in ("<", "<="):
+            return lo < value
+        if operator in (">", ">="):
+            return hi > value
+        return False
+
+    @staticmethod
+    def complement_label(labels):
+        """Label of the guard covering everything outside the given guards."""
+        if not labels:
+            return "true"
+        return "not(" + " | ".join(sorted(labels)) + ")"
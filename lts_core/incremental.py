@@ -0,0 +1,409 @@
+import logging
+from collections import deque
+
+from lts_core.compact_lts import CompactLTS, ERROR, UNSAFE, SINK, SINK_STATE, is_error_name
+from lts_core.determinise import (
+    DEFAULT_MAX_MACRO_STATES, DeterminisationLimitExceeded, macro_state_name
+)
+from lts_core.minimise import hopcroft_minimise
+from lts_core.propagation import PROPAGATE_TAU, PROPAGATE_ALL
+
+
+class IncrementalAssumption:
+    """
+    Weakest assumption maintained while transitions are added to M.
+
+    Keeps every stage as mutable, indexed state: the product M || Perr
+    (step 1), read through Σ with other actions as τ (step 2), its unsafe
+    product states (step 3) and the determinised automaton completed with
+    the sink (steps 4 and 5). add_transitions() extends the product from the
+    new M edges only, propagates unsafety backwards from the new edges and
+    error states, and updates just the macro-states containing a product
+    state that gained an edge: a τ edge grows the macro-state in place, a
+    Σ edge redirects one transition to a (possibly new) macro-state. All of
+    this only grows, so an update costs time in the size of the affected
+    part, not of M. A macro-state that grows into one that already exists is
+    merged into it and dropped, and one that is no longer the target of any
+    other macro-state's transition is retired, with its successors in turn.
+    final() leaves out the macro-states no longer reachable (such as a cycle
+    nothing enters any more), removes error states (step 6) and, with
+    minimise=True, minimises the result.
+
+    New action labels join Σ when extend_error_automaton is given; it is
+    called as extend_error_automaton(Perr, action_id) to add Perr's
+    transitions for the new action. Otherwise they are internal actions.
+    """
+
+    def __init__(self, M, Perr, sigma_ids, propagate_on=PROPAGATE_TAU,
+                 intern_action=None, extend_error_automaton=None,
+                 max_macro_states=DEFAULT_MAX_MACRO_STATES, minimise=False):
+        if propagate_on not in (PROPAGATE_TAU, PROPAGATE_ALL):
+            raise ValueError(f"Unknown propagating action class: {propagate_on!r}")
+        self.M = M
+        self.Perr = Perr
+        self.propagate_all = propagate_on == PROPAGATE_ALL
+        self.intern_action = intern_action or M.actions.intern
+        self.extend_error_automaton = extend_error_automaton
+        self.max_macro_states = max_macro_states
+        self.minimise = minimise
+
+        self.sigma = list(sigma_ids)
+        self.in_sigma = set(self.sigma)
+        self.known_actions = len(M.actions)
+        self.m_out = [[] for _ in range(M.num_states)]
+        for u, v, a in zip(M.src, M.dst, M.act):
+            self.m_out[u].append((a, v))
+        self.perr_out = {}
+        self.perr_edges = 0
+        self._index_error_automaton()
+
+        # steps 1-3: product states, their edges and unsafety
+        self.composed = CompactLTS(M.actions)
+        self.composed.track_unsafe = True
+        self.pair_ids = {}
+        self.pairs = []
+        self.pairs_of_m = {}
+        self.p_out = []  # Σ successors
+        self.p_tau = []  # τ successors
+        self.p_pred = []  # predecessors along propagating edges
+        self.macros_of = []
+
+        # steps 4-5: macro-states over product states, completed with the sink
+        self.completed = CompactLTS(M.actions)
+        self.completed.alphabet = self.sigma
+        self.completed.track_unsafe = True
+        self.sink = self.completed.add_state(SINK_STATE, SINK)
+        self.members = [None]
+        self.macro_ids = {}
+        self.edge_of = {}
+        self.in_edges = [set()]
+        self.out_edges = [[]]
+        self.dead = bytearray(1)
+
+        queue = deque()
+        if M.initial >= 0:
+            self._intern_pair(M.initial, Perr.initial, queue)
+        new_edges, _ = self._extend_product((), queue)
+        self._propagate(new_edges, 0)
+        explore = deque()
+        if self.pairs:
+            self.completed.set_initial(self._intern_macro(self._closure((0,)), explore))
+        self._explore(explore)
+
+    def _index_error_automaton(self):
+        Perr = self.Perr
+        for e in range(self.perr_edges, Perr.num_transitions):
+            self.perr_out.setdefault((Perr.src[e], Perr.act[e]), []).append(Perr.dst[e])
+        self.perr_edges = Perr.num_transitions
+
+    def _propagates(self, a):
+        return self.propagate_all or a not in self.in_sigma
+
+    # --- product (steps 1-3) ---
+
+    def _intern_pair(self, s1, s2, queue):
+        p = self.pair_ids.get((s1, s2))
+        if p is None:
+            p = self.composed.add_state(
+                f"{self.M.states[s1]}||{self.Perr.states[s2]}",
+                (self.M.flags[s1] | self.Perr.flags[s2]) & ERROR
+            )
+            self.pair_ids[(s1, s2)] = p
+            self.pairs.append((s1, s2))
+            self.pairs_of_m.setdefault(s1, []).append(p)
+            self.p_out.append([])
+            self.p_tau.append([])
+            self.p_pred.append([])
+            self.macros_of.append(set())
+            queue.append(p)
+        return p
+
+    def _product_step(self, p, a, v, queue, new_edges):
+        s2 = self.pairs[p][1]
+        if a in self.in_sigma:
+            targets = [self._intern_pair(v, t2, queue) for t2 in self.perr_out.get((s2, a), ())]
+        else:
+            targets = [self._intern_pair(v, s2, queue)]
+        for q in targets:
+            self.composed.add_transition(p, q, a)
+            if a in self.in_sigma:
+                self.p_out[p].append((a, q))
+            else:
+                self.p_tau[p].append(q)
+            if self._propagates(a):
+                self.p_pred[q].append(p)
+            new_edges.append((p, a, q))
+
+    def _extend_product(self, m_edges, queue):
+        """Product edges created by the new M edges (and the states they reach)."""
+        new_edges = []
+        old_pairs = len(self.pairs)
+        for u, a, v in m_edges:
+            for p in self.pairs_of_m.get(u, ()):
+                if p >= old_pairs:
+                    break  # explored below, with all its edges
+                self._product_step(p, a, v, queue, new_edges)
+        while queue:
+            p = queue.popleft()
+            for a, v in self.m_out[self.pairs[p][0]]:
+                self._product_step(p, a, v, queue, new_edges)
+        return new_edges, old_pairs
+
+    def _propagate(self, new_edges, old_pairs):
+        """Backward unsafety from new error states and new edges into unsafe states."""
+        flags = self.composed.flags
+        queue = deque(p for p in range(old_pairs, len(self.pairs)) if flags[p] & ERROR)
+        for p, a, q in new_edges:
+            if flags[q] & UNSAFE and self._propagates(a):
+                queue.append(p)
+        newly_unsafe = []
+        while queue:
+            p = queue.popleft()
+            if flags[p] & UNSAFE:
+                continue
+            flags[p] |= UNSAFE | ERROR
+            newly_unsafe.append(p)
+            queue.extend(self.p_pred[p])
+        return newly_unsafe
+
+    # --- macro-states (steps 4-5) ---
+
+    def _closure(self, states, exclude=()):
+        closed = {p for p in states if p not in exclude}
+        stack = list(closed)
+        while stack:
+            p = stack.pop()
+            for q in self.p_tau[p]:
+                if q not in closed and q not in exclude:
+                    closed.add(q)
+                    stack.append(q)
+        return closed
+
+    def _macro_flags(self, members):
+        flags = 0
+        for p in members:
+            flags |= self.composed.flags[p]
+        return flags & (ERROR | UNSAFE)
+
+    def _macro_name(self, members):
+        return macro_state_name([self.composed.states[p] for p in members])
+
+    def _intern_macro(self, members, explore):
+        key = frozenset(members)
+        X = self.macro_ids.get(key)
+        if X is None:
+            if len(self.macro_ids) >= self.max_macro_states:
+                raise DeterminisationLimitExceeded(
+                    f"Incremental assumption exceeded {self.max_macro_states} macro-states."
+                )
+            X = self.completed.add_state(self._macro_name(key), self._macro_flags(key))
+            self.completed.set_default(X, self.sink)
+            self.macro_ids[key] = X
+            self.members.append(set(key))
+            self.in_edges.append(set())
+            self.out_edges.append([])
+            self.dead.append(0)
+            for p in key:
+                self.macros_of[p].add(X)
+            explore.append(X)
+        return X
+
+    def _add_edge(self, X, a, Y):
+        self.completed.add_transition(X, Y, a)
+        e = self.completed.num_transitions - 1
+        self.edge_of[(X, a)] = e
+        self.in_edges[Y].add(e)
+        self.out_edges[X].append(e)
+
+    def _explore(self, explore):
+        while explore:
+            X = explore.popleft()
+            successors = {}
+            for p in self.members[X]:
+                for a, q in self.p_out[p]:
+                    successors.setdefault(a, set()).add(q)
+            for a, targets in successors.items():
+                self._add_edge(X, a, self._intern_macro(self._closure(targets), explore))
+
+    def _grow(self, X, states, pending):
+        """Add the τ-closure of states to macro-state X in place."""
+        new = self._closure(states, exclude=self.members[X])
+        if not new:
+            return
+        members = self.members[X]
+        del self.macro_ids[frozenset(members)]
+        members |= new
+        for p in new:
+            self.macros_of[p].add(X)
+            for a, q in self.p_out[p]:
+                pending.setdefault((X, a), set()).add(q)
+        self.completed.flags[X] |= self._macro_flags(new)
+        key = frozenset(members)
+        Y = self.macro_ids.get(key)
+        if Y is None:
+            self.macro_ids[key] = X
+            self.completed.states.rename(X, self._macro_name(key))
+        else:
+            self._merge(X, Y)
+
+    def _merge(self, X, Y):
+        """Redirect every transition into X to Y, which has the same members."""
+        for e in self.in_edges[X]:
+            self.completed.redirect(e, Y)
+            self.in_edges[Y].add(e)
+        self.in_edges[X] = set()
+        if self.completed.initial == X:
+            self.completed.set_initial(Y)
+        for p in self.members[X]:
+            self.macros_of[p].discard(X)
+        self.dead[X] = 1
+        self.completed.states.rename(X, f"{self.completed.states[X]}#merged{X}")
+        self._release(X)
+
+    def _release(self, X):
+        """
+        Drop the transitions of dead macro-state X from its targets, and
+        retire every target that no other macro-state's transition reaches
+        any more (except the initial state). Unreachable cycles stay; final()
+        leaves them out.
+        """
+        stack = [X]
+        while stack:
+            X = stack.pop()
+            targets = set()
+            for e in self.out_edges[X]:
+                Y = self.completed.dst[e]
+                self.in_edges[Y].discard(e)
+                targets.add(Y)
+            self.out_edges[X] = []
+            for Y in targets:
+                if self.dead[Y] or Y == self.completed.initial:
+                    continue
+                if all(self.completed.src[e] == Y for e in self.in_edges[Y]):
+                    self._retire(Y)
+                    stack.append(Y)
+
+    def _retire(self, X):
+        """
+        Mark unreachable macro-state X dead, so that later updates skip it,
+        and free its name for a new macro-state with the same members.
+        """
+        key = frozenset(self.members[X])
+        if self.macro_ids.get(key) == X:
+            del self.macro_ids[key]
+        for p in self.members[X]:
+            self.macros_of[p].discard(X)
+        self.dead[X] = 1
+        self.completed.states.rename(X, f"{self.completed.states[X]}#retired{X}")
+
+    def _update(self, m_edges):
+        new_edges, old_pairs = self._extend_product(m_edges, deque())
+        newly_unsafe = self._propagate(new_edges, old_pairs)
+
+        for p in newly_unsafe:
+            for X in self.macros_of[p]:
+                self.completed.flags[X] |= ERROR | UNSAFE
+
+        pending = {}
+        for p, a, q in new_edges:
+            for X in list(self.macros_of[p]):
+                if self.dead[X]:
+                    continue
+                if a in self.in_sigma:
+                    pending.setdefault((X, a), set()).add(q)
+                else:
+                    self._grow(X, (q,), pending)
+
+        explore = deque()
+        for (X, a), targets in pending.items():
+            if self.dead[X]:
+                continue
+            e = self.edge_of.get((X, a))
+            if e is None:
+                self._add_edge(X, a, self._intern_macro(self._closure(targets), explore))
+                continue
+            T = self.completed.dst[e]
+            added = self._closure(targets, exclude=self.members[T])
+            if added:
+                Y = self._intern_macro(self.members[T] | added, explore)
+                self.in_edges[T].discard(e)
+                self.in_edges[Y].add(e)
+                self.completed.redirect(e, Y)
+                if T != self.completed.initial and all(self.completed.src[f] == T for f in self.in_edges[T]):
+                    self._retire(T)
+                    self._release(T)
+        self._explore(explore)
+        return len(new_edges), len(newly_unsafe)
+
+    # --- public API ---
+
+    def add_transitions(self, delta):
+        """
+        Add transitions to M and update every stage. delta items are
+        transition dicts ({"from", "action", "to"}) or ControllerLTSBuilder
+        tuples (from, label, to, ...). Returns the number of new product
+        transitions and of newly unsafe product states.
+        """
+        m_edges = []
+        M = self.M
+        for item in delta:
+            if isinstance(item, dict):
+                u, label, v = item["from"], item["action"], item["to"]
+            else:
+                u, label, v = item[0], item[1], item[2]
+            a = self.intern_action(label)
+            if a >= self.known_actions:
+                self.known_actions = len(M.actions)
+                if self.extend_error_automaton is not None:
+                    self.sigma.append(a)
+                    self.in_sigma.add(a)
+                    self.extend_error_automaton(self.Perr, a)
+                    self._index_error_automaton()
+            for name in (u, v):
+                if name not in M.states:
+                    M.add_state(name, ERROR if is_error_name(name) else 0)
+                    self.m_out.append([])
+            u, v = M.states.get(u), M.states.get(v)
+            M.add_transition(u, v, a)
+            self.m_out[u].append((a, v))
+            m_edges.append((u, a, v))
+
+        new_transitions, new_unsafe = self._update(m_edges)
+        logging.info(
+            "[Incremental] %d M transitions -> %d product transitions, %d newly unsafe states",
+            len(m_edges), new_transitions, new_unsafe
+        )
+        return new_transitions, new_unsafe
+
+    def _live(self):
+        """The sink and the macro-states reachable from the initial one."""
+        live = bytearray(self.completed.num_states)
+        live[self.sink] = 1
+        X = self.completed.initial
+        if X < 0:
+            return live
+        live[X] = 1
+        stack = [X]
+        while stack:
+            X = stack.pop()
+            for e in self.out_edges[X]:
+                Y = self.completed.dst[e]
+                if not live[Y]:
+                    live[Y] = 1
+                    stack.append(Y)
+        return live
+
+    def completed_lts(self):
+        """The sink-completed automaton (step 5), without merged or unreachable macro-states."""
+        return self.completed.subgraph(self._live())
+
+    def final(self):
+        """The weakest assumption (step 6): error states removed."""
+        keep = bytearray(
+            live and not f & ERROR for f, live in zip(self.completed.flags, self._live())
+        )
+        final = self.completed.subgraph(keep, block_removed=True)
+        final.alphabet = list(self.sigma)
+        if self.minimise:
+            final = hopcroft_minimise(final)
+        return final
@@ -0,0 +1,216 @@
+import json
+import mmap
+import struct
+import sys
+import zlib
+from array import array
+
+from lts_core.compact_lts import CompactLTS, SymbolTable
+
+MAGIC = b"LTSB"
+FORMAT_VERSION = 1
+
+# Format flag bits
+ZLIB_STRINGS = 1
+
+# magic, version, flags, header, states blob and actions blob lengths,
+# number of states, actions and transitions
+_PREAMBLE = struct.Struct("<4sHHIIIIII")
+_ALIGN = 4
+
+
+def _pad(n):
+    return -n % _ALIGN
+
+
+def _string_table(names, compress):
+    for name in names:
+        if "\0" in name:
+            raise ValueError(f"Name {name!r} contains a NUL character.")
+    blob = "\0".join(names).encode("utf-8")
+    return zlib.compress(blob) if compress else blob
+
+
+def _read_strings(blob, count, compressed):
+    if compressed:
+        blob = zlib.decompress(blob)
+    names = bytes(blob).decode("utf-8").split("\0") if count else []
+    if len(names) != count:
+        raise ValueError(f"String table holds {len(names)} names, expected {count}.")
+    return names
+
+
+def write_binary(lts_json, path, compress_strings=True):
+    """
+    Write an LTS in the JSON schema to the binary format:
+
+        preamble (magic, version, flags, section lengths and counts)
+        header   JSON with every key but "states" and "transitions"
+        states   NUL-separated UTF-8 names, optionally zlib-compressed
+        actions  likewise
+        src, dst, act   little-endian int32 columns of state/action ids
+
+    States are numbered in the order of "states", then of first appearance
+    in the transitions; actions in the order of "interface_alphabet", then
+    of first appearance. This is the numbering CompactLTS.from_json() uses,
+    so load_binary() can take the columns as they are.
+    """
+    states = SymbolTable()
+    listed = lts_json.get("states")
+    for name in listed or ():
+        states.intern(name)
+    if listed is not None and len(states) != len(listed):
+        raise ValueError("'states' lists a state more than once.")
+    actions = SymbolTable()
+    alphabet = lts_json.get("interface_alphabet")
+    for name in alphabet or ():
+        actions.intern(name)
+    alphabet_prefix = alphabet is not None and len(actions) == len(alphabet)
+
+    transitions = lts_json.get("transitions", [])
+    src = array('i')
+    dst = array('i')
+    act = array('i')
+    for t in transitions:
+        if len(t) != 3:
+            raise ValueError(f"Transition {t} has keys other than from/to/action.")
+        src.append(states.intern(t["from"]))
+        dst.append(states.intern(t["to"]))
+        act.append(actions.intern(t["action"]))
+    if sys.byteorder != "little":
+        for column in (src, dst, act):
+            column.byteswap()
+
+    skipped = {"states", "transitions"}
+    if alphabet_prefix:
+        skipped.add("interface_alphabet")
+    header = json.dumps({
+        "keys": list(lts_json),
+        "listed_states": len(listed) if listed is not None else None,
+        "alphabet_size": len(alphabet) if alphabet_prefix else None,
+        "doc": {key: value for key, value in lts_json.items() if key not in skipped},
+    }, separators=(',', ':')).encode("utf-8")
+    state_blob = _string_table(states.names, compress_strings)
+    action_blob = _string_table(actions.names, compress_strings)
+
+    with open(path, 'wb') as f:
+        f.write(_PREAMBLE.pack(
+            MAGIC, FORMAT_VERSION, ZLIB_STRINGS if compress_strings else 0,
+            len(header), len(state_blob), len(action_blob),
+            len(states), len(actions), len(transitions)
+        ))
+        f.write(header)
+        f.write(state_blob)
+        f.write(action_blob)
+        f.write(b"\0" * _pad(_PREAMBLE.size + len(header) + len(state_blob) + len(action_blob)))
+        for column in (src, dst, act):
+            column.tofile(f)
+
+
+class _Sections:
+    """Parsed preamble and section views of a mapped binary LTS."""
+
+    def __init__(self, buffer):
+        if len(buffer) < _PREAMBLE.size:
+            raise ValueError("File is too short for a binary LTS.")
+        (magic, version, flags, header_len, states_len, actions_len,
+         self.num_states, self.num_actions, self.num_transitions) = _PREAMBLE.unpack_from(buffer)
+        if magic != MAGIC:
+            raise ValueError("Not a binary LTS file.")
+        if version != FORMAT_VERSION:
+            raise ValueError(f"Unsupported binary LTS version {version}.")
+        self.compressed = bool(flags & ZLIB_STRINGS)
+        offset = _PREAMBLE.size
+        self.header = json.loads(bytes(buffer[offset:offset + header_len]))
+        offset += header_len
+        self.state_blob = buffer[offset:offset + states_len]
+        offset += states_len
+        self.action_blob = buffer[offset:offset + actions_len]
+        offset += actions_len
+        offset += _pad(offset)
+        size = 4 * self.num_transitions
+        if len(buffer) < offset + 3 * size:
+            raise ValueError("Binary LTS is truncated.")
+        self.columns = [buffer[offset + k * size:offset + (k + 1) * size] for k in range(3)]
+
+    def states(self):
+        return _read_strings(self.state_blob, self.num_states, self.compressed)
+
+    def actions(self):
+        return _read_strings(self.action_blob, self.num_actions, self.compressed)
+
+
+def _map(path):
+    with open(path, 'rb') as f:
+        return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+
+def load_binary(path, copy=True):
+    """
+    Memory-map a binary LTS and return it as a CompactLTS, without parsing
+    any transition. The columns are copied out of the mapping in one block
+    each; with copy=False they stay read-only views of the mapping (so the
+    LTS can be read, composed and hashed but not extended), which lets
+    several processes share one copy of the file in the page cache.
+    """
+    mapped = _map(path)
+    sections = _Sections(memoryview(mapped))
+    header = sections.header
+    state_names = sections.states()
+    action_names = sections.actions()
+
+    doc = dict(header["doc"])
+    doc["states"] = state_names
+    if header["alphabet_size"] is not None:
+        doc["interface_alphabet"] = action_names[:header["alphabet_size"]]
+    lts = CompactLTS.from_json(doc, actions=SymbolTable(action_names))
+
+    if copy or sys.byteorder != "little":
+        columns = []
+        for view in sections.columns:
+            column = array('i')
+            column.frombytes(view)
+            if sys.byteorder != "little":
+                column.byteswap()
+            columns.append(column)
+    else:
+        columns = [view.cast('i') for view in sections.columns]
+    lts.src, lts.dst, lts.act = columns
+    return lts
+
+
+def read_binary_json(path):
+    """Read a binary LTS back into exactly the JSON document it was written from."""
+    mapped = _map(path)
+    sections = _Sections(memoryview(mapped))
+    header = sections.header
+    state_names = sections.states()
+    action_names = sections.actions()
+    columns = []
+    for view in sections.columns:
+        column = array('i')
+        column.frombytes(view)
+        if sys.byteorder != "little":
+            column.byteswap()
+        columns.append(column)
+
+    values = dict(header["doc"])
+    if header["listed_states"] is not None:
+        values["states"] = state_names[:header["listed_states"]]
+    if header["alphabet_size"] is not None:
+        values["interface_alphabet"] = action_names[:header["alphabet_size"]]
+    values["transitions"] = [
+        {"from": state_names[u], "to": state_names[v], "action": action_names[a]}
+        for u, v, a in zip(*columns)
+    ]
+    return {key: values[key] for key in header["keys"]}
+
+
+def json_to_binary(json_path, binary_path, compress_strings=True):
+    with open(json_path) as f:
+        write_binary(json.load(f), binary_path, compress_strings)
+
+
+def binary_to_json(binary_path, json_path):
+    with open(json_path, 'w') as f:
+        json.dump(read_binary_json(binary_path), f, indent=4)
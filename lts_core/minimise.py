@@ -0,0 +1,157 @@
+import logging
+from collections import deque
+
+from lts_core.compact_lts import CompactLTS, SINK, INITIAL
+
+
+def _reachable(lts, alphabet):
+    """States reachable from the initial state, following a default target
+    only if some action of the alphabet actually falls back to it."""
+    offsets, edges = lts.out_index()
+    blocked = {}
+    for s, a in zip(lts.blocked_src, lts.blocked_act):
+        blocked.setdefault(s, set()).add(a)
+    seen = bytearray(lts.num_states)
+    if lts.initial < 0:
+        return seen
+    seen[lts.initial] = 1
+    queue = deque([lts.initial])
+    while queue:
+        s = queue.popleft()
+        out = edges[offsets[s]:offsets[s + 1]]
+        successors = [lts.dst[e] for e in out]
+        if lts.default[s] >= 0:
+            defined = blocked.get(s, set()) | {lts.act[e] for e in out}
+            if len(defined) < len(alphabet):
+                successors.append(lts.default[s])
+        for t in successors:
+            if not seen[t]:
+                seen[t] = 1
+                queue.append(t)
+    return seen
+
+
+def hopcroft_minimise(lts):
+    """
+    Minimise a deterministic LTS by Hopcroft partition refinement.
+
+    The LTS is read as a complete DFA over its alphabet: every (state, action)
+    goes to its explicit target, to the state's default target, or, if it is
+    blocked or undefined, to a virtual dead state. Sink states form their own
+    initial class, separate from the dead state and from ordinary states.
+    The sink class is never used as a splitter (Hopcroft only needs all
+    initial classes but one), so implicit default transitions into the sink
+    never have to be enumerated and the refinement runs in O(|Σ|·n log n).
+    Unreachable states are dropped first. Each class keeps the name of its
+    lowest-numbered member.
+    """
+    alphabet = lts.alphabet if lts.alphabet is not None else list(range(len(lts.actions)))
+    lts = lts.subgraph(_reachable(lts, alphabet))
+    n = lts.num_states
+    if lts.initial < 0:
+        return lts  # the initial state was removed: nothing is reachable
+    dead = n
+    offsets, edges = lts.out_index()
+
+    # inverse transitions into every class but the sink: (action, target) -> sources
+    inverse = {}
+    for s in range(n):
+        defined = {}
+        for e in edges[offsets[s]:offsets[s + 1]]:
+            a, t = lts.act[e], lts.dst[e]
+            if a in defined:
+                if defined[a] != t:
+                    raise ValueError(
+                        f"Minimisation requires a deterministic LTS; state '{lts.states[s]}' "
+                        f"has several '{lts.actions[a]}' transitions."
+                    )
+                continue
+            defined[a] = t
+            if not lts.flags[t] & SINK:
+                inverse.setdefault((a, t), []).append(s)
+        if lts.default[s] < 0:
+            for a in alphabet:
+                if a not in defined:
+                    inverse.setdefault((a, dead), []).append(s)
+    for s, a in zip(lts.blocked_src, lts.blocked_act):
+        inverse.setdefault((a, dead), []).append(s)
+
+    sinks = [s for s in range(n) if lts.flags[s] & SINK]
+    ordinary = [s for s in range(n) if not lts.flags[s] & SINK]
+    blocks = []
+    sink_block = None
+    for members in (ordinary, [dead], sinks):
+        if members:
+            if members is sinks:
+                sink_block = len(blocks)
+            blocks.append(set(members))
+    block_of = [0] * (n + 1)
+    for b, members in enumerate(blocks):
+        for s in members:
+            block_of[s] = b
+
+    pending = deque()
+    in_pending = set()
+    for b in range(len(blocks)):
+        if b != sink_block:
+            for a in alphabet:
+                pending.append((b, a))
+                in_pending.add((b, a))
+
+    while pending:
+        splitter, a = pending.popleft()
+        in_pending.discard((splitter, a))
+        touched = {}
+        for t in blocks[splitter]:
+            for s in inverse.get((a, t), ()):
+                touched.setdefault(block_of[s], set()).add(s)
+        for b, members in touched.items():
+            if len(members) == len(blocks[b]):
+                continue
+            new = len(blocks)
+            moved = members
+            blocks[b] -= moved
+            blocks.append(moved)
+            for s in moved:
+                block_of[s] = new
+            for c in alphabet:
+                if (b, c) in in_pending:
+                    pending.append((new, c))
+                    in_pending.add((new, c))
+                else:
+                    smaller = new if len(moved) <= len(blocks[b]) else b
+                    pending.append((smaller, c))
+                    in_pending.add((smaller, c))
+
+    minimal = CompactLTS(lts.actions)
+    minimal.alphabet = lts.alphabet
+    minimal.track_unsafe = lts.track_unsafe
+    minimal.extra = dict(lts.extra)
+    representative = {}
+    class_id = [-1] * len(blocks)
+    for s in range(n):
+        b = block_of[s]
+        if class_id[b] < 0:
+            class_id[b] = minimal.add_state(lts.states[s], 0)
+            representative[class_id[b]] = s
+        minimal.flags[class_id[b]] |= lts.flags[s] & ~INITIAL
+    minimal.set_initial(class_id[block_of[lts.initial]])
+
+    blocked = {}
+    for s, a in zip(lts.blocked_src, lts.blocked_act):
+        blocked.setdefault(s, []).append(a)
+    for c, s in representative.items():
+        seen = set()
+        for e in edges[offsets[s]:offsets[s + 1]]:
+            key = (class_id[block_of[lts.dst[e]]], lts.act[e])
+            if key not in seen:
+                seen.add(key)
+                minimal.add_transition(c, key[0], key[1])
+        if lts.default[s] >= 0:
+            minimal.set_default(c, class_id[block_of[lts.default[s]]])
+        for a in blocked.get(s, ()):
+            minimal.block(c, a)
+
+    logging.info("[Minimise] %d states -> %d states", n, minimal.num_states)
+    return minimal
+
@@ -0,0 +1,71 @@
+from collections import deque
+
+from lts_core.compact_lts import ERROR, UNSAFE, TAU
+
+# Action classes along which error is propagated backwards
+PROPAGATE_TAU = "tau"
+PROPAGATE_ALL = "all"
+
+
+def backward_error_propagation(lts, propagate_on=PROPAGATE_TAU):
+    """
+    Mark every state from which an error state is reachable via propagating
+    transitions as UNSAFE, and treat it as an error state from then on.
+
+    With PROPAGATE_TAU only internal (τ) moves propagate, following the
+    algorithm: the environment cannot prevent an internal move into err.
+    With PROPAGATE_ALL every transition does. Runs as a single backward
+    search over the CSR incoming index with the per-state flag bytes as the
+    visited set, so it is linear in |S| + |T|. lts is updated in place and
+    returned.
+
+    In multi-property mode the violation masks are propagated as well: a
+    state's mask becomes the union of the masks it can reach. A state is
+    revisited only when its mask grows, so with k properties each state is
+    processed at most k + 1 times.
+    """
+    if propagate_on not in (PROPAGATE_TAU, PROPAGATE_ALL):
+        raise ValueError(f"Unknown propagating action class: {propagate_on!r}")
+    tau = lts.actions.get(TAU)
+    follow_all = propagate_on == PROPAGATE_ALL
+    offsets, edges = lts.in_index()
+    flags = lts.flags
+    src = lts.src
+    act = lts.act
+
+    queue = deque(s for s in range(lts.num_states) if flags[s] & ERROR)
+    for s in queue:
+        flags[s] |= UNSAFE
+
+    if lts.violations is not None:
+        violations = lts.violations
+        queued = bytearray(lts.num_states)
+        for s in queue:
+            queued[s] = 1
+        while queue and (follow_all or tau is not None):
+            s = queue.popleft()
+            queued[s] = 0
+            for e in edges[offsets[s]:offsets[s + 1]]:
+                if not follow_all and act[e] != tau:
+                    continue
+                pred = src[e]
+                mask = violations[pred] | violations[s]
+                if mask != violations[pred] or not flags[pred] & UNSAFE:
+                    violations[pred] = mask
+                    flags[pred] |= UNSAFE | ERROR
+                    if not queued[pred]:
+                        queued[pred] = 1
+                        queue.append(pred)
+    elif follow_all or tau is not None:
+        while queue:
+            s = queue.popleft()
+            for e in edges[offsets[s]:offsets[s + 1]]:
+                if not follow_all and act[e] != tau:
+                    continue
+                pred = src[e]
+                if not flags[pred] & UNSAFE:
+                    flags[pred] |= UNSAFE | ERROR
+                    queue.append(pred)
+
+    lts.track_unsafe = True
+    return lts
@@ -0,0 +1,108 @@
+from array import array
+from collections import deque
+
+from lts_core.compact_lts import CompactLTS, ERROR, UNSAFE
+from lts_core.determinise import macro_state_name
+
+
+def property_name(P, index):
+    """Name of a property: its "name" entry, or p<index> if it has none."""
+    return P.get("name", f"p{index}")
+
+
+def shared_error_automaton(actions, sigma_ids, violated_by):
+    """
+    Product of the error automata of several properties, over one action table.
+
+    violated_by maps each action id of sigma_ids to the bitmask of the
+    properties it violates (bit k for property k), or to None if the action
+    could not be evaluated. A state is the set of properties violated so
+    far: "ok" for none, "err:<mask>" otherwise, which is an error state
+    tagged with that mask. Unlike a single Perr, error states keep moving,
+    so that a trace that already violates one property can still go on to
+    violate another.
+    """
+    shared = CompactLTS(actions)
+    shared.violations = array('Q')
+    shared.alphabet = list(sigma_ids)
+    ok = shared.add_state("ok")
+    shared.set_initial(ok)
+
+    state_of = {0: ok}
+    queue = deque([0])
+    while queue:
+        mask = queue.popleft()
+        src = state_of[mask]
+        for a in sigma_ids:
+            violated = violated_by.get(a)
+            if violated is None:
+                continue  # unparseable, reported by the caller
+            target = mask | violated
+            if target not in state_of:
+                state_of[target] = shared.add_state(f"err:{target}", ERROR, target)
+                queue.append(target)
+            shared.add_transition(src, state_of[target], a)
+    return shared
+
+
+def _selected_name(name, mask):
+    """
+    Name of a state of the shared product with its error automaton component
+    restricted to mask: "err:<k>" becomes "ok" if k does not meet mask, and
+    "err" (or "err:<k & mask>" for several properties) if it does. Members of
+    a macro-state "{...}" are renamed alike, and duplicates merged.
+    """
+    if name.startswith("{") and name.endswith("}"):
+        return macro_state_name(sorted({_selected_name(m, mask) for m in name[1:-1].split(",")}))
+    prefix, _, last = name.rpartition("||")
+    if not last.startswith("err:"):
+        return name
+    violated = int(last[4:]) & mask
+    if not violated:
+        last = "ok"
+    elif mask & (mask - 1):
+        last = f"err:{violated}"
+    else:
+        last = "err"
+    return f"{prefix}||{last}" if prefix else last
+
+
+def select_properties(lts, mask):
+    """
+    View of a multi-property LTS with only the properties in mask: a state
+    is an (unsafe) error state iff its violation mask meets mask. States
+    that only differ in properties outside mask (e.g. "s0||ok" and
+    "s0||err:2" for mask 1) are merged, and named as a single-property run
+    names them, so the result matches an LTS built for those properties
+    alone, without violation masks.
+    """
+    selected = CompactLTS(lts.actions)
+    selected.alphabet = lts.alphabet
+    selected.track_unsafe = lts.track_unsafe
+    selected.extra = dict(lts.extra)
+    selected.extra.pop("properties", None)
+    error = ERROR | (UNSAFE if lts.track_unsafe else 0)
+    remap = array('i', [-1]) * lts.num_states
+    for s in range(lts.num_states):
+        flags = lts.flags[s] & ~(ERROR | UNSAFE)
+        if lts.violations[s] & mask:
+            flags |= error
+        remap[s] = selected.add_state(_selected_name(lts.states[s], mask), flags)
+    if lts.initial >= 0:
+        selected.set_initial(remap[lts.initial])
+    for s in range(lts.num_states):
+        if lts.default[s] >= 0:
+            selected.set_default(remap[s], remap[lts.default[s]])
+    # merged states have the same successors, so their edges are deduplicated
+    blocked = set()
+    for s, a in zip(lts.blocked_src, lts.blocked_act):
+        if (remap[s], a) not in blocked:
+            blocked.add((remap[s], a))
+            selected.block(remap[s], a)
+    edges = set()
+    for u, v, a in zip(lts.src, lts.dst, lts.act):
+        edge = (remap[u], remap[v], a)
+        if edge not in edges:
+            edges.add(edge)
+            selected.add_transition(*edge)
+    return selected
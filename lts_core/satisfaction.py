@@ -0,0 +1,145 @@
+import logging
+from collections import deque
+
+from lts_core.compact_lts import CompactLTS, SINK, TAU
+
+
+class CheckResult:
+    """
+    Outcome of check_satisfies(). trace is a shortest run of N (every action
+    label it takes, local moves included) whose last action A does not
+    allow, or None when N ⊨ A.
+    """
+
+    def __init__(self, holds, trace=None, explored=0, reason=None):
+        self.holds = holds
+        self.trace = trace
+        self.explored = explored
+        self.reason = reason
+
+    def __bool__(self):
+        return self.holds
+
+    def __repr__(self):
+        if self.holds:
+            return f"CheckResult(holds, explored={self.explored})"
+        return f"CheckResult(violated: {self.reason}, trace={self.trace}, explored={self.explored})"
+
+
+class _IndexedEnvironment:
+    """The initial_state/successors() view of a CompactLTS."""
+
+    def __init__(self, lts):
+        self.lts = lts
+        self.initial_state = lts.initial if lts.initial >= 0 else None
+
+    def successors(self, state):
+        lts = self.lts
+        names = lts.actions.names
+        return [(names[lts.act[e]], lts.dst[e]) for e in lts.outgoing(state)]
+
+
+class _AssumptionTable:
+    """
+    A's transition function, built one state at a time: a (state, label)
+    pair goes to its explicit target, else to the state's default target;
+    it is refused if blocked or undefined.
+    """
+
+    def __init__(self, A):
+        self.A = A
+        self.alphabet = set(
+            A.actions[a] for a in (A.alphabet if A.alphabet is not None else set(A.act))
+        )
+        self.alphabet.discard(TAU)
+        self.blocked = {}
+        for s, a in zip(A.blocked_src, A.blocked_act):
+            self.blocked.setdefault(s, set()).add(A.actions[a])
+        self.rows = {}
+
+    def step(self, state, label):
+        row = self.rows.get(state)
+        if row is None:
+            A = self.A
+            row = self.rows[state] = {A.actions[A.act[e]]: A.dst[e] for e in A.outgoing(state)}
+        target = row.get(label)
+        if target is not None:
+            return target, None
+        if label in self.blocked.get(state, ()):
+            return None, "blocked"
+        if self.A.default[state] >= 0:
+            return self.A.default[state], None
+        return None, "undefined"
+
+
+def check_satisfies(N, A, relabel=None):
+    """
+    Check N ⊨ A on the fly: breadth-first search of the pairs (n, q) of
+    N × A reachable from the initial pair, stopping at the first action that
+    A does not allow in q. Only the pairs the search reaches are built, so a
+    violation near the start is found without touching the rest of N.
+
+    N is a CompactLTS, an LTS in the JSON schema, or any object with an
+    initial_state attribute and a successors(state) method returning
+    (label, next_state) pairs, e.g. a simulator explored lazily. A is a
+    deterministic assumption as built by AssumptionGenerator. Labels of N
+    in A's alphabet move both; any other label (and τ) moves N alone.
+    relabel, if given, maps each label of N into A's alphabet first (e.g. a
+    concrete label to its guard when A is symbolic).
+
+    For a CompactLTS, N's outgoing-edge index is built on the first call and
+    kept on the LTS, so further checks of N only pay for the search.
+
+    A pair whose A-state is the sink needs no further exploration, since
+    the sink allows every continuation. Because the search is breadth-first,
+    the returned counterexample is a shortest one.
+    """
+    if not isinstance(A, CompactLTS):
+        A = CompactLTS.from_json(A)
+    if isinstance(N, CompactLTS):
+        N = _IndexedEnvironment(N)
+    elif isinstance(N, dict):
+        N = _IndexedEnvironment(CompactLTS.from_json(N))
+    table = _AssumptionTable(A)
+
+    if N.initial_state is None:
+        return CheckResult(True, explored=0)
+    if A.initial < 0:
+        # Every state of A was removed: M violates P whatever the environment does
+        return CheckResult(False, [], explored=0, reason="empty assumption")
+
+    relabelled = {}
+    start = (N.initial_state, A.initial)
+    parent = {start: None}
+    queue = deque([start])
+    while queue:
+        pair = queue.popleft()
+        n, q = pair
+        if A.flags[q] & SINK:
+            continue
+        for label, n_next in N.successors(n):
+            a_label = relabelled.get(label)
+            if a_label is None:
+                a_label = relabelled[label] = relabel(label) if relabel is not None else label
+            if a_label in table.alphabet:
+                q_next, reason = table.step(q, a_label)
+                if q_next is None:
+                    trace = [label]
+                    while parent[pair] is not None:
+                        pair, taken = parent[pair]
+                        trace.append(taken)
+                    trace.reverse()
+                    logging.info(
+                        "[Check] N does not satisfy A: '%s' is %s in A after %d steps (%d pairs explored)",
+                        label, reason, len(trace) - 1, len(parent)
+                    )
+                    return CheckResult(False, trace, len(parent), reason)
+            else:
+                q_next = q
+            successor = (n_next, q_next)
+            if successor not in parent:
+                parent[successor] = (pair, label)
+                queue.append(successor)
+
+    logging.info("[Check] N satisfies A (%d pairs explored)", len(parent))
+    return CheckResult(True, explored=len(parent))
@@ -0,0 +1,116 @@
+import logging
+
+from lts_core.compact_lts import CompactLTS, ERROR, SINK, SINK_STATE
+from lts_core.determinise import (
+    DEFAULT_MAX_MACRO_STATES, DEFAULT_PROGRESS_EVERY, DeterminisationLimitExceeded, macro_state_name
+)
+
+
+def fused_assumption(M, Perr, sigma_ids, max_macro_states=DEFAULT_MAX_MACRO_STATES,
+                     progress_every=DEFAULT_PROGRESS_EVERY, progress=None):
+    """
+    Build the final weakest assumption in one on-the-fly exploration.
+
+    Fuses the staged pipeline: macro-states are sets of (M, Perr) product
+    states reached over Σ-transitions and closed under M's internal moves,
+    i.e. its actions outside Σ (compose + project + τ-propagation +
+    determinise). Perr only synchronises on Σ.
+    A successor set containing an error state is an error macro-state, so the
+    transition into it is blocked and the macro-state is never explored
+    (error removal). Every macro-state defaults to the sink for the actions
+    it does not define (completion). Only the reachable part of the final
+    assumption is ever built; M and Perr must share one action table.
+    progress, if given, is called as progress(explored, discovered, blow_up)
+    every progress_every macro-states, as in subset_construction, with the
+    blow-up taken over M's states.
+    """
+    m_offsets, m_edges = M.out_index()
+    in_sigma = bytearray(len(M.actions))
+    for a in sigma_ids:
+        in_sigma[a] = 1
+
+    perr_out = {}
+    for u, v, a in zip(Perr.src, Perr.dst, Perr.act):
+        perr_out.setdefault((u, a), []).append(v)
+
+    final = CompactLTS(M.actions)
+    final.alphabet = sigma_ids
+    macro_ids = {}
+    macro_states = []
+    num_states = max(M.num_states, 1)
+
+    def is_error(pair):
+        return (M.flags[pair[0]] | Perr.flags[pair[1]]) & ERROR
+
+    def closure(pairs):
+        closed = set(pairs)
+        stack = list(pairs)
+        while stack:
+            s1, s2 = stack.pop()
+            for e in m_edges[m_offsets[s1]:m_offsets[s1 + 1]]:
+                pair = (M.dst[e], s2)
+                if not in_sigma[M.act[e]] and pair not in closed:
+                    closed.add(pair)
+                    stack.append(pair)
+        return frozenset(closed)
+
+    def intern(members):
+        idx = macro_ids.get(members)
+        if idx is None:
+            if len(macro_states) >= max_macro_states:
+                raise DeterminisationLimitExceeded(
+                    f"Fused exploration exceeded {max_macro_states} macro-states."
+                )
+            names = [f"{M.states[s1]}||{Perr.states[s2]}" for s1, s2 in members]
+            idx = final.add_state(macro_state_name(names))
+            macro_ids[members] = idx
+            macro_states.append(members)
+        return idx
+
+    initial = closure(((M.initial, Perr.initial),))
+    if any(is_error(p) for p in initial):
+        logging.warning("[Streaming] Initial state is an error state; assumption is empty.")
+        final.set_initial(final.add_state(SINK_STATE, SINK))
+        return final
+    final.set_initial(intern(initial))
+
+    explored = 0
+    while explored < len(macro_states):
+        src = explored
+        successors = {}
+        for s1, s2 in macro_states[src]:
+            for e in m_edges[m_offsets[s1]:m_offsets[s1 + 1]]:
+                a = M.act[e]
+                if not in_sigma[a]:
+                    continue
+                for to2 in perr_out.get((s2, a), ()):
+                    successors.setdefault(a, set()).add((M.dst[e], to2))
+        for a, targets in successors.items():
+            targets = closure(targets)
+            if any(is_error(p) for p in targets):
+                final.block(src, a)
+                continue
+            final.add_transition(src, intern(targets), a)
+        explored += 1
+
+        if progress_every and explored % progress_every == 0:
+            blow_up = len(macro_states) / num_states
+            logging.info(
+                "[Streaming] %d macro-states explored, %d discovered (blow-up %.2fx)",
+                explored, len(macro_states), blow_up
+            )
+            if progress is not None:
+                progress(explored, len(macro_states), blow_up)
+
+    if progress is not None:
+        progress(explored, len(macro_states), len(macro_states) / num_states)
+
+    sink = final.add_state(SINK_STATE, SINK)
+    for s in range(sink):
+        final.set_default(s, sink)
+
+    logging.info(
+        "[Streaming] Built assumption with %d states and %d transitions",
+        final.num_states, final.num_transitions
+    )
+    return final
@@ -0,0 +1,209 @@
+import logging
+from collections import deque
+
+from lts_core.compact_lts import CompactLTS, SINK, TAU
+
+# Validation levels
+VALIDATION_OFF = "off"      # no checks
+VALIDATION_CHEAP = "cheap"  # reference integrity and alphabet membership
+VALIDATION_FULL = "full"    # also determinism, completeness and reachability
+VALIDATION_LEVELS = (VALIDATION_OFF, VALIDATION_CHEAP, VALIDATION_FULL)
+
+# Properties a stage may be expected to have (checked at VALIDATION_FULL)
+DETERMINISTIC = "deterministic"
+COMPLETE = "complete"
+REACHABLE = "reachable"
+
+MAX_SAMPLES = 5
+
+_DESCRIPTIONS = {
+    "initial": "initial state is missing or unknown",
+    "src": "transitions have an unknown 'from' state",
+    "dst": "transitions have an unknown 'to' state",
+    "act": "transitions have an unknown or missing action",
+    "alphabet": "transitions use actions outside interface_alphabet",
+    "default": "states have an unknown default target",
+    "blocked": "blocked pairs refer to an unknown state or action",
+    DETERMINISTIC: "non-deterministic (state, action) choices",
+    COMPLETE: "states are incomplete",
+    REACHABLE: "states are unreachable",
+}
+
+
+class ValidationReport:
+    """
+    Issues found by validate(), counted per kind with up to MAX_SAMPLES
+    examples each, and the properties measured at VALIDATION_FULL
+    (deterministic, complete, unreachable; None when not measured).
+    """
+
+    def __init__(self, name, level):
+        self.name = name
+        self.level = level
+        self.counts = {}
+        self.samples = {}
+        self.deterministic = None
+        self.complete = None
+        self.unreachable = None
+
+    def add(self, kind, sample):
+        self.counts[kind] = self.counts.get(kind, 0) + 1
+        samples = self.samples.setdefault(kind, [])
+        if len(samples) < MAX_SAMPLES:
+            samples.append(sample)
+
+    @property
+    def ok(self):
+        return not self.counts
+
+    def log(self):
+        if self.level == VALIDATION_OFF:
+            return
+        if self.ok:
+            logging.info("[Validation] %s passed %s structural checks.", self.name, self.level)
+            return
+        logging.warning("[Validation] Issues found in %s:", self.name)
+        for kind, count in self.counts.items():
+            logging.warning(
+                " - %d %s, e.g. %s", count, _DESCRIPTIONS[kind], "; ".join(map(str, self.samples[kind]))
+            )
+
+
+def _check_references(lts, report):
+    """
+    Reference integrity and alphabet membership. Column bounds are checked
+    with min()/max() and the used actions with one set(); transitions are
+    only walked one by one to collect samples once an issue is known.
+    """
+    n = lts.num_states
+    num_actions = len(lts.actions)
+    if not 0 <= lts.initial < n:
+        report.add("initial", lts.initial)
+    if lts.src and (min(lts.src) < 0 or max(lts.src) >= n):
+        for i, u in enumerate(lts.src):
+            if not 0 <= u < n:
+                report.add("src", f"transition {i}: {u}")
+    if lts.dst and (min(lts.dst) < 0 or max(lts.dst) >= n):
+        for i, v in enumerate(lts.dst):
+            if not 0 <= v < n:
+                report.add("dst", f"transition {i}: {v}")
+    if lts.act and (min(lts.act) < 0 or max(lts.act) >= num_actions):
+        for i, a in enumerate(lts.act):
+            if not 0 <= a < num_actions:
+                report.add("act", f"transition {i}: {a}")
+    if lts.alphabet is not None:
+        outside = set(lts.act) - set(lts.alphabet)
+        outside.discard(lts.actions.get(TAU))
+        if outside:
+            for i, a in enumerate(lts.act):
+                if a in outside and 0 <= a < num_actions:
+                    report.add("alphabet", f"transition {i}: '{lts.actions[a]}'")
+    for s, t in enumerate(lts.default):
+        if t >= n:
+            report.add("default", f"{lts.states[s]} -> {t}")
+    for s, a in zip(lts.blocked_src, lts.blocked_act):
+        if not (0 <= s < n and 0 <= a < num_actions):
+            report.add("blocked", (s, a))
+
+
+def _check_structure(lts, report, expect):
+    """
+    Determinism, completeness and reachability in one traversal of the
+    outgoing-edge index: reachable states in breadth-first order from the
+    initial state, then the rest, so every edge is looked at exactly once.
+    Sink states allow every action and count as complete.
+    """
+    n = lts.num_states
+    offsets, edges = lts.out_index()
+    tau = lts.actions.get(TAU)
+    alphabet = set(lts.alphabet if lts.alphabet is not None else range(len(lts.actions)))
+    alphabet.discard(tau)
+    blocked = {}
+    for s, a in zip(lts.blocked_src, lts.blocked_act):
+        blocked.setdefault(s, set()).add(a)
+
+    seen = bytearray(n)
+    reached = 0
+    deterministic = complete = True
+    # reachable states first, then each remaining state as a new root
+    for root in [lts.initial] + list(range(n)):
+        if not 0 <= root < n or seen[root]:
+            continue
+        reachable = root == lts.initial
+        seen[root] = 1
+        queue = deque([root])
+        while queue:
+            s = queue.popleft()
+            if reachable:
+                reached += 1
+            elif REACHABLE in expect:
+                report.add(REACHABLE, lts.states[s])
+            targets = {}
+            for e in edges[offsets[s]:offsets[s + 1]]:
+                a, t = lts.act[e], lts.dst[e]
+                if a == tau or targets.setdefault(a, t) != t:
+                    deterministic = False
+                    if DETERMINISTIC in expect:
+                        report.add(DETERMINISTIC, f"{lts.states[s]} on '{lts.actions[a]}'")
+                if not seen[t]:
+                    seen[t] = 1
+                    queue.append(t)
+            defined = alphabet.intersection(targets).union(blocked.get(s, ()))
+            if len(defined) < len(alphabet):
+                t = lts.default[s]
+                if t >= 0:
+                    if not seen[t]:
+                        seen[t] = 1
+                        queue.append(t)
+                elif not lts.flags[s] & SINK:
+                    complete = False
+                    if COMPLETE in expect:
+                        report.add(COMPLETE, f"{lts.states[s]} ({len(alphabet) - len(defined)} actions missing)")
+
+    report.deterministic = deterministic
+    report.complete = complete
+    report.unreachable = n - reached
+
+
+def validate(lts, level=VALIDATION_CHEAP, name="LTS", expect=(), log=True):
+    """
+    Validate an LTS (a CompactLTS or the JSON schema) at the given level and
+    return a ValidationReport. VALIDATION_CHEAP checks reference integrity
+    and alphabet membership; VALIDATION_FULL also indexes the LTS and, in a
+    single traversal, measures determinism, completeness and reachability,
+    reporting an issue for each property in expect that does not hold.
+    """
+    if level not in VALIDATION_LEVELS:
+        raise ValueError(f"Unknown validation level: {level!r}")
+    report = ValidationReport(name, level)
+    if level == VALIDATION_OFF:
+        return report
+    if not isinstance(lts, CompactLTS):
+        lts = _from_json_checked(lts, report)
+    _check_references(lts, report)
+    if level == VALIDATION_FULL and not report.counts.keys() & {"src", "dst", "act"}:
+        _check_structure(lts, report, expect)
+    if log:
+        report.log()
+    return report
+
+
+def _from_json_checked(lts_json, report):
+    """
+    CompactLTS.from_json() adds any state a transition mentions, so unknown
+    states and missing actions are looked for in the JSON itself first.
+    """
+    states = set(lts_json.get("states", []))
+    for i, t in enumerate(lts_json.get("transitions", [])):
+        if t.get("from") not in states:
+            report.add("src", f"transition {i}: {t.get('from')}")
+        if t.get("to") not in states:
+            report.add("dst", f"transition {i}: {t.get('to')}")
+        if "action" not in t:
+            report.add("act", f"transition {i}")
+    if report.counts:
+        lts_json = dict(lts_json, transitions=[t for t in lts_json.get("transitions", []) if "action" in t])
+    lts = CompactLTS.from_json(lts_json)
+    if lts_json.get("initial_state") not in states:
+        lts.initial = -1
+    return lts
@@ -1,91 +1,28 @@
-import torch
 import time
-import random
 
-from components.perception import SimplePerceptionNet, perfect_perception
-from components.vehicle import Vehicle
-from components.controller import Controller
-from lts_builders.controller_lts_builder import ControllerLTSBuilder
-from lts_builders.vehicle_lts_builder import VehicleLTSBuilder
+from components.perception import perfect_perception
+from components.perception_service import PerceptionService
+from simulation import run_scenario
 from visualiser.visualise_lts import visualise_lts
-
-sensor_noise = 0.5  # for obstacle distance
-velocity_noise = 0.2  # for velocity estimate
-acceleration_noise = 0.5  # for acceleration estimate
-
-def scenario_obstacle_approaches():
-    return [max(0, 15 - step * 1.0) for step in range(18)]
-
-def scenario_obstacle_appears_and_disappears():
-    return [
-        20, 20, 20, 20, 20,  # Steps 0–4: no obstacle
-        5, 5, 5, 5, 5,       # Steps 5–9: obstacle present
-        20, 20, 20, 20, 20, 20, 20  # Steps 10–16: no obstacle again
-    ]
-
-def scenario_obstacle_stays_and_disappears():
-    return [
-        20, 20, 20, # Steps 0–2: no obstacle
-        5, 5,  # Steps 3-4: obstacle present
-        3, 3, # Steps 5–6: obstacle close
-        1, # Steps 7: obstacle very close
-        9, 9, # Steps 8–9: obstacle present
-        20, 20, 20, 20, 20, 20, 20  # Steps 10–16: no obstacle again
-    ]
-
-
-def calculate_noisy_inputs(vehicle, obstacle_distance, velocity_noise, acceleration_noise, sensor_noise):
-    # Add noise to obstacle distance (sensor noise)
-    noisy_obstacle_distance = max(0.0, obstacle_distance + random.gauss(0, sensor_noise))
-
-    # Add noise to velocity and acceleration estimates
-    estimated_velocity = vehicle.actual_velocity + random.gauss(0, velocity_noise)
-    estimated_acceleration = vehicle.actual_acceleration + random.gauss(0, acceleration_noise)
-
-    return noisy_obstacle_distance, estimated_velocity, estimated_acceleration
-
+from scenarios import (
+    sensor_noise, velocity_noise, acceleration_noise, controller_property, vehicle_property,
+    scenario_obstacle_approaches, scenario_obstacle_appears_and_disappears,
+    scenario_obstacle_stays_and_disappears,
+)
 
 def run_case(obstacle_distances, case_name="Scenario"):
     print(f"\n--- Running {case_name} ---\n")
     USE_PERFECT_PERCEPTION = True
-    if not USE_PERFECT_PERCEPTION:
-        model = SimplePerceptionNet()
-        model.eval()
-
-    def get_perception_output(distance):
-        if USE_PERFECT_PERCEPTION:
-            return perfect_perception(distance)
-        else:
-            dummy_input = torch.randn(1, 3, 28, 28)
-            output = model(dummy_input)
-            return output.argmax(dim=1).item()
-
-    controller_lts_builder = ControllerLTSBuilder()
-    vehicle_lts_builder = VehicleLTSBuilder(quantize=2)
-    vehicle = Vehicle(vehicle_lts_builder)
-    controller = Controller(vehicle, controller_lts_builder)
+    if USE_PERFECT_PERCEPTION:
+        get_perception_output = perfect_perception
+    else:
+        # every step's frame is classified up front, in one batch
+        get_perception_output = PerceptionService().scenario_perception(obstacle_distances)
 
-    dt = 0.2
     DEBUG = True
 
-    for step, obstacle_distance in enumerate(obstacle_distances):
-        perception_output = get_perception_output(obstacle_distance)
-        
-        noisy_obstacle_distance, estimated_velocity, estimated_acceleration = calculate_noisy_inputs(
-            vehicle,
-            obstacle_distance,
-            velocity_noise,
-            acceleration_noise,
-            sensor_noise
-        )
-        
-        # Update controller with noisy estimates
-        controller.update_estimates(estimated_velocity, estimated_acceleration)
-        
-        # Pass noisy distance to control loop
-        steering, requested_acceleration = controller.control(perception_output, noisy_obstacle_distance)
-        vehicle.step(steering, requested_acceleration, dt)
-
+    def print_step(step, controller, vehicle, perception_output, obstacle_distance,
+                   noisy_obstacle_distance, requested_acceleration):
         if DEBUG:
             line = (
                 f"Step {step} -  State {controller.state}, "
@@ -109,9 +46,19 @@ def run_case(obstacle_distances, case_name="Scenario"):
                 f"requested_acceleration={requested_acceleration:.2f}"
             )
 
-        print(controller_lts_builder.colour_line(line, controller.state))
+        print(controller.lts_builder.colour_line(line, controller.state))
+        # Pace the console output; campaign_runner.py runs without it
         time.sleep(0.1)
 
+    controller_lts_builder, vehicle_lts_builder = run_scenario(
+        obstacle_distances,
+        sensor_noise=sensor_noise,
+        velocity_noise=velocity_noise,
+        acceleration_noise=acceleration_noise,
+        perception=get_perception_output,
+        on_step=print_step
+    )
+
     controller_lts_builder.print_lts()
     vehicle_lts_builder.print_lts()
     visualise_lts(controller_lts_builder.get_transitions(), save_path='controller_lts.png')
@@ -121,15 +68,19 @@ def run_case(obstacle_distances, case_name="Scenario"):
         json_path="controller_lts.json",
         name="ControllerLTS",
         initial_state="drive",
-        property_dict={
-            "type": "safety",
-            "description": "No collision: obstacle_distance must never be 0.0",
-            "violation_condition": {
-                 "field": "obstacle_distance",
-                 "operator": "==",
-                 "value": 0.0
-            }      
-        }
+        property_dict=controller_property
+    )
+    controller_lts_builder.export_to_binary(
+        binary_path="controller_lts.ltsb",
+        name="ControllerLTS",
+        initial_state="drive",
+        property_dict=controller_property
+    )
+
+    vehicle_lts_builder.export_to_binary(
+        binary_path="vehicle_lts.ltsb",
+        name="VehicleLTS",
+        property_dict=vehicle_property
     )
 
 
@@ -0,0 +1,304 @@
+"""
+Batched Monte Carlo simulation of the Vehicle / Controller loop of main.run_case.
+
+Thousands of independent runs advance together: vehicle state, controller
+mode and noise are NumPy arrays with one entry per run, and every step is a
+handful of array operations. The dynamics are those of Vehicle.step (first
+order lag, stop logic) and Controller.control (perception and distance
+thresholds, forced stop), operation for operation, so a run fed the same
+noise as the scalar classes takes the same values:
+
+    python monte_carlo.py --scenario obstacle_approaches --runs 100000 --seed 0
+    python monte_carlo.py --runs 10000 --traces 3 --output mc_output
+"""
+
+import argparse
+import json
+import logging
+import os
+import time
+
+import numpy as np
+
+from components.controller import DECISION_BOUNDARIES, MODES
+from components.perception_service import PERCEPTION_VARIANTS, PerceptionService
+from lts_builders.controller_lts_builder import ControllerLTSBuilder
+from lts_builders.vehicle_lts_builder import VehicleLTSBuilder
+from lts_core.action_table import OPERATORS
+from scenarios import (
+    SCENARIOS, acceleration_noise, controller_property, sensor_noise, vehicle_property, velocity_noise,
+)
+
+logging.basicConfig(level=logging.INFO, format='%(message)s')
+
+DEFAULT_RUNS = 10_000
+DEFAULT_DT = 0.2  # the step main.run_case passes to Vehicle.step
+INITIAL_VELOCITY = 6.0
+LAG_ALPHA = 0.5  # Vehicle.step's responsiveness factor
+STOP_EPSILON = 1e-5
+PERCEPTION_RANGE = 9  # perfect_perception: an obstacle is seen at distance <= 9
+
+DRIVE, COAST, BRAKE, EMERGENCY_BRAKE, STOPPED = range(len(MODES))
+
+# Controller.control per distance region (cut points from DECISION_BOUNDARIES)
+# when an obstacle is perceived: emergency brake, brake, coast, drive
+_REGION_MODE = np.array([EMERGENCY_BRAKE, BRAKE, COAST, DRIVE], dtype=np.int8)
+_REGION_ACCELERATION = np.array([-8.0, -4.0, 0.0, 1.0])
+
+
+def perfect_perception(distances):
+    """components.perception.perfect_perception over an array of distances."""
+    return (distances <= PERCEPTION_RANGE).astype(np.int8)
+
+
+class _Trace:
+    """Per-step values of the traced runs, turned into LTS builders at the end."""
+
+    def __init__(self, runs):
+        self.runs = runs
+        self.steps = []
+
+    def record(self, **columns):
+        self.steps.append({key: value[:self.runs].copy() for key, value in columns.items()})
+
+    def builders(self):
+        """(ControllerLTSBuilder, VehicleLTSBuilder) per traced run, logged as run_case logs them."""
+        traces = []
+        for run in range(self.runs):
+            controller_lts = ControllerLTSBuilder()
+            vehicle_lts = VehicleLTSBuilder(quantize=2)
+            for step in self.steps:
+                controller_lts.log_step(
+                    obs=int(step["obs"][run]),
+                    dist=float(step["dist"][run]),
+                    next_state=MODES[step["mode"][run]],
+                    est_vel=float(step["est_vel"][run]),
+                    est_acc=float(step["est_acc"][run]),
+                    req_acc=float(step["req_acc"][run]),
+                )
+                if step["moved"][run]:
+                    vehicle_lts.log_step(
+                        s1=_vehicle_state(step["x_before"][run], step["vel_before"][run]),
+                        delta=0.0,
+                        acceleration=float(step["acc"][run]),
+                        s2=_vehicle_state(step["x"][run], step["vel"][run]),
+                        act_vel=float(step["vel"][run]),
+                        req_acc=float(step["req_acc"][run]),
+                    )
+            traces.append((controller_lts, vehicle_lts))
+        return traces
+
+
+def _vehicle_state(x, velocity, quantize=2):
+    """Vehicle.get_state(): y and theta stay 0.0, since steering is always 0.0."""
+    return (round(float(x), quantize), 0.0, 0.0, round(float(velocity), quantize))
+
+
+def _label_fields(obs, dist, est_vel, est_acc, req_acc):
+    """Controller label fields, as the parsed label would give them."""
+    return {
+        "obstacle_class": lambda: obs,
+        "obstacle_distance": lambda: np.round(dist, 2),
+        "est_vel": lambda: np.round(est_vel, 2),
+        "est_acc": lambda: np.round(est_acc, 2),
+        "req_acc": lambda: np.round(req_acc, 2),
+    }
+
+
+def _violations(property_p, fields):
+    """Boolean array: runs whose label at this step violates property_p."""
+    condition = property_p["violation_condition"]
+    column = fields.get(condition["field"])
+    compare = OPERATORS.get(condition["operator"])
+    if column is None or compare is None:
+        return None
+    return compare(column(), condition["value"])
+
+
+class MonteCarloResult:
+    """Aggregate statistics of simulate(), plus the LTS builders of any traced runs."""
+
+    def __init__(self, runs, steps, wall_seconds, stats, traces):
+        self.runs = runs
+        self.steps = steps
+        self.wall_seconds = wall_seconds
+        self.stats = stats
+        self.traces = traces
+
+    @property
+    def steps_per_second(self):
+        return self.runs * self.steps / self.wall_seconds if self.wall_seconds > 0 else float("inf")
+
+    def to_json(self):
+        return {
+            "runs": self.runs,
+            "steps": self.steps,
+            "wall_seconds": self.wall_seconds,
+            "steps_per_second": self.steps_per_second,
+            **self.stats,
+        }
+
+
+def simulate(obstacle_distances, runs=DEFAULT_RUNS, dt=DEFAULT_DT, sensor_noise=sensor_noise,
+             velocity_noise=velocity_noise, acceleration_noise=acceleration_noise, seed=None,
+             trace_runs=0, perception=perfect_perception,
+             controller_properties=(controller_property,), vehicle_properties=(vehicle_property,)):
+    """
+    Simulate `runs` independent runs of main.run_case's loop over the true
+    obstacle_distances, a sequence with one distance per step (shared by
+    every run) or a (runs, steps) array.
+
+    perception maps an array of true distances to obstacle classes.
+    Each property is evaluated on the label its component would log: the
+    controller properties at every step, the vehicle properties at every
+    step the vehicle moves. The stats give, per property, the fraction of
+    runs that violate it and the mean first violating step. The first
+    trace_runs runs are also returned as (ControllerLTSBuilder,
+    VehicleLTSBuilder) pairs holding the transitions run_case would log.
+    """
+    distances = np.asarray(obstacle_distances, dtype=float)
+    per_run = distances.ndim == 2
+    if per_run and distances.shape[0] != runs:
+        raise ValueError(f"obstacle_distances has {distances.shape[0]} rows for {runs} runs")
+    steps = distances.shape[-1]
+    rng = np.random.default_rng(seed)
+    cuts = np.asarray(DECISION_BOUNDARIES["obstacle_distance"], dtype=float)
+
+    x = np.zeros(runs)
+    velocity = np.full(runs, INITIAL_VELOCITY)
+    acceleration = np.zeros(runs)
+    stopped = np.zeros(runs, dtype=bool)
+    stop_step = np.full(runs, -1)
+    mode_counts = np.zeros(len(MODES), dtype=np.int64)
+    properties = [("controller", p) for p in controller_properties] + [("vehicle", p) for p in vehicle_properties]
+    first_violation = [np.full(runs, -1) for _ in properties]
+    trace = _Trace(min(trace_runs, runs)) if trace_runs else None
+
+    start = time.perf_counter()
+    for step in range(steps):
+        true_distance = distances[:, step] if per_run else np.full(runs, distances[step])
+        obs = perception(true_distance)
+
+        # simulation.calculate_noisy_inputs, from the state before the step
+        noise = rng.standard_normal((3, runs))
+        dist = np.maximum(0.0, true_distance + sensor_noise * noise[0])
+        est_vel = velocity + velocity_noise * noise[1]
+        est_acc = acceleration + acceleration_noise * noise[2]
+
+        # Controller.control
+        region = np.searchsorted(cuts, dist, side="right")
+        seen = obs == 1
+        mode = np.where(seen, _REGION_MODE[region], DRIVE).astype(np.int8)
+        req_acc = np.where(seen, _REGION_ACCELERATION[region], 1.0)
+        mode[stopped] = STOPPED
+        req_acc[stopped] = 0.0
+        forced = est_vel <= STOP_EPSILON
+        mode[forced] = STOPPED
+        req_acc[forced] = 0.0
+        stopped |= forced
+
+        # Vehicle.step: a stopped vehicle only zeroes its acceleration
+        active = ~stopped
+        x_before, vel_before = x.copy(), velocity.copy()
+        acceleration = np.where(active, acceleration + LAG_ALPHA * (req_acc - acceleration), 0.0)
+        velocity = np.where(active, velocity + acceleration * dt, velocity)
+        np.maximum(velocity, 0.0, out=velocity)
+        halted = active & (velocity <= STOP_EPSILON)
+        velocity[halted] = 0.0
+        acceleration[halted] = 0.0
+        stopped |= halted
+        moved = active & ~halted
+        x = np.where(moved, x + velocity * dt, x)
+
+        stop_step[(stop_step < 0) & stopped] = step
+        mode_counts += np.bincount(mode, minlength=len(MODES))
+
+        controller_fields = _label_fields(obs, dist, est_vel, est_acc, req_acc)
+        vehicle_fields = {
+            "acceleration": lambda: np.round(acceleration, 2),
+            "act_vel": lambda: np.round(velocity, 2),
+        }
+        for k, (component, property_p) in enumerate(properties):
+            fields = controller_fields if component == "controller" else vehicle_fields
+            violated = _violations(property_p, fields)
+            if violated is None:
+                continue
+            if component == "vehicle":
+                violated &= moved  # the vehicle only logs the steps it moves
+            first_violation[k][(first_violation[k] < 0) & violated] = step
+
+        if trace is not None:
+            trace.record(
+                obs=obs, dist=dist, mode=mode, est_vel=est_vel, est_acc=est_acc, req_acc=req_acc,
+                moved=moved, x_before=x_before, vel_before=vel_before, x=x, vel=velocity, acc=acceleration,
+            )
+    wall_seconds = time.perf_counter() - start
+
+    stats = {
+        "property_violations": [],
+        "stopped_rate": float(stopped.mean()),
+        "mean_stop_step": float(stop_step[stop_step >= 0].mean()) if stopped.any() else None,
+        "final_velocity": {
+            "mean": float(velocity.mean()), "std": float(velocity.std()),
+            "min": float(velocity.min()), "max": float(velocity.max()),
+        },
+        "mean_distance_travelled": float(x.mean()),
+        "mode_occupancy": {name: float(count) / (runs * steps) for name, count in zip(MODES, mode_counts)},
+    }
+    for (component, property_p), first in zip(properties, first_violation):
+        violated = first >= 0
+        stats["property_violations"].append({
+            "component": component,
+            "description": property_p.get("description"),
+            "violation_rate": float(violated.mean()),
+            "mean_first_step": float(first[violated].mean()) if violated.any() else None,
+        })
+    traces = trace.builders() if trace is not None else []
+    return MonteCarloResult(runs, steps, wall_seconds, stats, traces)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Batched Monte Carlo simulation of the vehicle and controller.")
+    parser.add_argument("--scenario", choices=sorted(SCENARIOS), default="obstacle_approaches")
+    parser.add_argument("--runs", type=int, default=DEFAULT_RUNS)
+    parser.add_argument("--seed", type=int)
+    parser.add_argument("--dt", type=float, default=DEFAULT_DT)
+    parser.add_argument("--sensor-noise", type=float, default=sensor_noise)
+    parser.add_argument("--velocity-noise", type=float, default=velocity_noise)
+    parser.add_argument("--acceleration-noise", type=float, default=acceleration_noise)
+    parser.add_argument("--perception", choices=("perfect",) + PERCEPTION_VARIANTS, default="perfect",
+                        help="perfect perception, or SimplePerceptionNet run as the given variant")
+    parser.add_argument("--traces", type=int, default=0, help="export the LTS of the first N runs")
+    parser.add_argument("--output", help="directory for stats.json and the traced LTSs")
+    args = parser.parse_args()
+
+    perception = perfect_perception
+    if args.perception != "perfect":
+        # one batch of frames per step, across all runs
+        perception = PerceptionService(variant=args.perception, seed=args.seed or 0).perceive
+    result = simulate(
+        SCENARIOS[args.scenario](), runs=args.runs, dt=args.dt, sensor_noise=args.sensor_noise,
+        velocity_noise=args.velocity_noise, acceleration_noise=args.acceleration_noise,
+        seed=args.seed, trace_runs=args.traces, perception=perception,
+    )
+    logging.info(
+        "[MonteCarlo] %d runs x %d steps in %.3fs (%.0f steps/s)",
+        result.runs, result.steps, result.wall_seconds, result.steps_per_second
+    )
+    for violation in result.stats["property_violations"]:
+        logging.info("[MonteCarlo] %s: %.4f of runs", violation["description"], violation["violation_rate"])
+    if args.output:
+        os.makedirs(args.output, exist_ok=True)
+        with open(os.path.join(args.output, "stats.json"), 'w') as f:
+            json.dump(dict(result.to_json(), scenario=args.scenario, seed=args.seed), f, indent=4)
+        for run, (controller_lts, vehicle_lts) in enumerate(result.traces):
+            controller_lts.export_to_json(
+                json_path=os.path.join(args.output, f"run{run}_controller_lts.json"),
+                name=f"ControllerLTS_run{run}", initial_state="drive", property_dict=controller_property,
+            )
+            vehicle_lts.export_to_json(
+                json_path=os.path.join(args.output, f"run{run}_vehicle_lts.json"),
+                name=f"VehicleLTS_run{run}", property_dict=vehicle_property,
+            )
+    else:
+        print(json.dumps(result.to_json(), indent=4))
@@ -0,0 +1,203 @@
+import cProfile
+import json
+import pstats
+import time
+import tracemalloc
+from contextlib import contextmanager
+
+# Functions kept per stage when profiling
+DEFAULT_TOP_CALLERS = 10
+
+
+def _size(lts):
+    if lts is None:
+        return None, None
+    return lts.num_states, lts.num_transitions
+
+
+class StageMetrics:
+    """Measurements of one pipeline stage (or one cache load of it)."""
+
+    def __init__(self, stage):
+        self.stage = stage
+        self.cached = False
+        self.wall_seconds = 0.0
+        self.cpu_seconds = 0.0
+        self.peak_memory_bytes = None
+        self.input_states = self.input_transitions = None
+        self.output_states = self.output_transitions = None
+        self.hot_callers = None
+
+    def set_input(self, lts):
+        self.input_states, self.input_transitions = _size(lts)
+
+    def set_output(self, lts):
+        self.output_states, self.output_transitions = _size(lts)
+
+    @property
+    def blowup(self):
+        """Output states per input state, e.g. the subset construction's blow-up."""
+        if not self.input_states or self.output_states is None:
+            return None
+        return self.output_states / self.input_states
+
+    def to_json(self):
+        data = {key: value for key, value in vars(self).items() if value is not None}
+        if self.blowup is not None:
+            data["blowup"] = round(self.blowup, 4)
+        return data
+
+
+class PipelineMetrics:
+    """
+    Per-stage metrics of one build_assumption() call: wall and CPU time,
+    tracemalloc peak above the stage's starting point, input and output
+    sizes and, with profile=True, the functions with the most own time.
+    With trace_memory=False tracemalloc is left alone (it slows allocation
+    down noticeably, so timing-only runs such as benchmarks turn it off).
+    """
+
+    def __init__(self, lts_name, profile=False, top_callers=DEFAULT_TOP_CALLERS, trace_memory=True):
+        self.lts_name = lts_name
+        self.profile = profile
+        self.trace_memory = trace_memory
+        self.top_callers = top_callers
+        self.stages = []
+        self.wall_seconds = 0.0
+        self.cpu_seconds = 0.0
+        self.peak_memory_bytes = None
+        self._started_tracing = False
+
+    def start(self):
+        """Start timing the whole build; tracemalloc is started if it is not already tracing."""
+        if self.trace_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracing = True
+        self._wall = time.perf_counter()
+        self._cpu = time.process_time()
+
+    def finish(self):
+        self.wall_seconds = time.perf_counter() - self._wall
+        self.cpu_seconds = time.process_time() - self._cpu
+        # stages reset the peak, so the build's peak is the largest stage peak
+        peaks = [s.peak_memory_bytes for s in self.stages if s.peak_memory_bytes is not None]
+        self.peak_memory_bytes = max(peaks, default=None)
+        if self._started_tracing:
+            tracemalloc.stop()
+            self._started_tracing = False
+
+    @contextmanager
+    def stage(self, name, input_lts=None):
+        """Measure the body of the with-block as one stage; call set_output() on the record."""
+        record = StageMetrics(name)
+        record.set_input(input_lts)
+        tracing = tracemalloc.is_tracing()
+        if tracing:
+            tracemalloc.reset_peak()
+            start_memory = tracemalloc.get_traced_memory()[0]
+        profiler = cProfile.Profile() if self.profile else None
+        wall = time.perf_counter()
+        cpu = time.process_time()
+        if profiler is not None:
+            profiler.enable()
+        try:
+            yield record
+        finally:
+            if profiler is not None:
+                profiler.disable()
+            record.wall_seconds = time.perf_counter() - wall
+            record.cpu_seconds = time.process_time() - cpu
+            if tracing:
+                record.peak_memory_bytes = max(0, tracemalloc.get_traced_memory()[1] - start_memory)
+            if profiler is not None:
+                record.hot_callers = self._hot_callers(profiler)
+            self.stages.append(record)
+
+    def record_cached(self, name, lts, seconds):
+        record = StageMetrics(name)
+        record.cached = True
+        record.wall_seconds = seconds
+        record.set_output(lts)
+        self.stages.append(record)
+
+    def _hot_callers(self, profiler):
+        stats = pstats.Stats(profiler).stats
+        ranked = sorted(stats.items(), key=lambda item: item[1][2], reverse=True)
+        return [
+            {
+                "function": f"{filename}:{line}({function})",
+                "calls": calls,
+                "own_seconds": round(own, 6),
+                "cumulative_seconds": round(cumulative, 6),
+            }
+            for (filename, line, function), (_, calls, own, cumulative, _) in ranked[:self.top_callers]
+        ]
+
+    def to_json(self):
+        return {
+            "lts": self.lts_name,
+            "wall_seconds": self.wall_seconds,
+            "cpu_seconds": self.cpu_seconds,
+            "peak_memory_bytes": self.peak_memory_bytes,
+            "stages": [s.to_json() for s in self.stages],
+        }
+
+    def to_prometheus(self, prefix="assumption"):
+        """The metrics in the Prometheus text exposition format."""
+        lines = []
+
+        def family(name, help_text, samples):
+            lines.append(f"# HELP {prefix}_{name} {help_text}")
+            lines.append(f"# TYPE {prefix}_{name} gauge")
+            for labels, value in samples:
+                if value is None:
+                    continue
+                text = ",".join(f'{key}="{_escape(val)}"' for key, val in labels.items())
+                number = value if isinstance(value, int) else repr(float(value))
+                lines.append(f"{prefix}_{name}{{{text}}} {number}")
+
+        lts = {"lts": self.lts_name}
+        family("build_wall_seconds", "Wall time of build_assumption.", [(lts, self.wall_seconds)])
+        family("build_cpu_seconds", "CPU time of build_assumption.", [(lts, self.cpu_seconds)])
+        family("build_peak_memory_bytes", "Largest tracemalloc peak of any stage.",
+               [(lts, self.peak_memory_bytes)])
+        per_stage = lambda s, **extra: dict(lts, stage=s.stage, **extra)
+        family("stage_wall_seconds", "Wall time per pipeline stage.",
+               [(per_stage(s), s.wall_seconds) for s in self.stages])
+        family("stage_cpu_seconds", "CPU time per pipeline stage.",
+               [(per_stage(s), s.cpu_seconds) for s in self.stages])
+        family("stage_peak_memory_bytes", "tracemalloc peak per pipeline stage.",
+               [(per_stage(s), s.peak_memory_bytes) for s in self.stages])
+        family("stage_cached", "1 if the stage was loaded from the cache.",
+               [(per_stage(s), int(s.cached)) for s in self.stages])
+        family("stage_states", "States per pipeline stage.",
+               [(per_stage(s, side="input"), s.input_states) for s in self.stages]
+               + [(per_stage(s, side="output"), s.output_states) for s in self.stages])
+        family("stage_transitions", "Transitions per pipeline stage.",
+               [(per_stage(s, side="input"), s.input_transitions) for s in self.stages]
+               + [(per_stage(s, side="output"), s.output_transitions) for s in self.stages])
+        family("stage_blowup", "Output states per input state.",
+               [(per_stage(s), s.blowup) for s in self.stages])
+        return "\n".join(lines) + "\n"
+
+    def write(self, path):
+        """Write the metrics as Prometheus text for a .prom or .txt path, as JSON otherwise."""
+        with open(path, 'w') as f:
+            if path.endswith((".prom", ".txt")):
+                f.write(self.to_prometheus())
+            else:
+                json.dump(self.to_json(), f, indent=4)
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+@contextmanager
+def measure(metrics, name, input_lts=None):
+    """metrics.stage(), or an unrecorded StageMetrics when metrics is None."""
+    if metrics is None:
+        yield StageMetrics(name)
+    else:
+        with metrics.stage(name, input_lts) as record:
+            yield record
@@ -0,0 +1,49 @@
+sensor_noise = 0.5  # for obstacle distance
+velocity_noise = 0.2  # for velocity estimate
+acceleration_noise = 0.5  # for acceleration estimate
+
+controller_property = {
+    "type": "safety",
+    "description": "No collision: obstacle_distance must never be 0.0",
+    "violation_condition": {
+         "field": "obstacle_distance",
+         "operator": "==",
+         "value": 0.0
+    }
+}
+
+vehicle_property = {
+    "type": "safety",
+    "description": "No harsh braking: acceleration must never drop below -6.0",
+    "violation_condition": {
+         "field": "acceleration",
+         "operator": "<",
+         "value": -6.0
+    }
+}
+
+def scenario_obstacle_approaches():
+    return [max(0, 15 - step * 1.0) for step in range(18)]
+
+def scenario_obstacle_appears_and_disappears():
+    return [
+        20, 20, 20, 20, 20,  # Steps 0–4: no obstacle
+        5, 5, 5, 5, 5,       # Steps 5–9: obstacle present
+        20, 20, 20, 20, 20, 20, 20  # Steps 10–16: no obstacle again
+    ]
+
+def scenario_obstacle_stays_and_disappears():
+    return [
+        20, 20, 20, # Steps 0–2: no obstacle
+        5, 5,  # Steps 3-4: obstacle present
+        3, 3, # Steps 5–6: obstacle close
+        1, # Steps 7: obstacle very close
+        9, 9, # Steps 8–9: obstacle present
+        20, 20, 20, 20, 20, 20, 20  # Steps 10–16: no obstacle again
+    ]
+
+SCENARIOS = {
+    "obstacle_approaches": scenario_obstacle_approaches,
+    "obstacle_appears_and_disappears": scenario_obstacle_appears_and_disappears,
+    "obstacle_stays_and_disappears": scenario_obstacle_stays_and_disappears,
+}
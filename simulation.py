@@ -0,0 +1,64 @@
+import random
+
+from components.perception import perfect_perception
+from components.vehicle import Vehicle
+from components.controller import Controller
+from lts_builders.controller_lts_builder import ControllerLTSBuilder
+from lts_builders.vehicle_lts_builder import VehicleLTSBuilder
+from scenarios import sensor_noise, velocity_noise, acceleration_noise
+
+DEFAULT_DT = 0.2
+
+
+def calculate_noisy_inputs(vehicle, obstacle_distance, velocity_noise, acceleration_noise, sensor_noise, rng=random):
+    # Add noise to obstacle distance (sensor noise)
+    noisy_obstacle_distance = max(0.0, obstacle_distance + rng.gauss(0, sensor_noise))
+
+    # Add noise to velocity and acceleration estimates
+    estimated_velocity = vehicle.actual_velocity + rng.gauss(0, velocity_noise)
+    estimated_acceleration = vehicle.actual_acceleration + rng.gauss(0, acceleration_noise)
+
+    return noisy_obstacle_distance, estimated_velocity, estimated_acceleration
+
+
+def run_scenario(obstacle_distances, rng=random, sensor_noise=sensor_noise, velocity_noise=velocity_noise,
+                 acceleration_noise=acceleration_noise, perception=perfect_perception, dt=DEFAULT_DT,
+                 on_step=None, controller_abstraction=None):
+    """
+    Run one Vehicle / Controller pair over the obstacle distances and return
+    their (ControllerLTSBuilder, VehicleLTSBuilder). All noise is drawn from
+    rng, so a random.Random(seed) makes the run reproducible. on_step, if
+    given, is called after every step as on_step(step, controller, vehicle,
+    perception_output, obstacle_distance, noisy_obstacle_distance,
+    requested_acceleration), e.g. to print progress. controller_abstraction
+    (a LabelAbstraction) bins the controller's labels.
+    """
+    controller_lts_builder = ControllerLTSBuilder(controller_abstraction)
+    vehicle_lts_builder = VehicleLTSBuilder(quantize=2)
+    vehicle = Vehicle(vehicle_lts_builder)
+    controller = Controller(vehicle, controller_lts_builder)
+
+    for step, obstacle_distance in enumerate(obstacle_distances):
+        perception_output = perception(obstacle_distance)
+
+        noisy_obstacle_distance, estimated_velocity, estimated_acceleration = calculate_noisy_inputs(
+            vehicle,
+            obstacle_distance,
+            velocity_noise,
+            acceleration_noise,
+            sensor_noise,
+            rng
+        )
+
+        # Update controller with noisy estimates
+        controller.update_estimates(estimated_velocity, estimated_acceleration)
+
+        # Pass noisy distance to control loop
+        steering, requested_acceleration = controller.control(perception_output, noisy_obstacle_distance)
+        vehicle.step(steering, requested_acceleration, dt)
+
+        if on_step is not None:
+            on_step(step, controller, vehicle, perception_output, obstacle_distance,
+                    noisy_obstacle_distance, requested_acceleration)
+
+    return controller_lts_builder, vehicle_lts_builder
@@ -0,0 +1,126 @@
+import hashlib
+import json
+import logging
+import os
+
+from lts_core.compact_lts import CompactLTS
+
+DEFAULT_CACHE_DIR = ".assumption_cache"
+DEFAULT_CACHE_MAX_BYTES = 512 * 1024 * 1024
+
+_SUFFIX = ".stage"
+
+
+def stage_key(*parts):
+    """Hex digest of the canonical JSON of parts (earlier keys, stage name, options)."""
+    blob = json.dumps(parts, sort_keys=True, separators=(',', ':'), default=str)
+    return hashlib.sha256(blob.encode("utf-8")).hexdigest()
+
+
+def lts_digest(lts):
+    """
+    Canonical hash of an LTS: the same states, flags, transitions, defaults,
+    blocked pairs and alphabet give the same digest, whatever the order in
+    which they were stored or numbered.
+    """
+    states = lts.states.names
+    actions = lts.actions.names
+    h = hashlib.sha256()
+    for part in (
+        sorted((states[s], lts.flags[s]) for s in range(lts.num_states)),
+        states[lts.initial] if lts.initial >= 0 else None,
+        sorted((states[u], actions[a], states[v]) for u, v, a in zip(lts.src, lts.dst, lts.act)),
+        sorted((states[s], states[t]) for s, t in enumerate(lts.default) if t >= 0),
+        sorted((states[s], actions[a]) for s, a in zip(lts.blocked_src, lts.blocked_act)),
+        sorted(actions[a] for a in lts.alphabet) if lts.alphabet is not None else None,
+    ):
+        h.update(json.dumps(part, separators=(',', ':')).encode("utf-8"))
+        h.update(b"\n")
+    return h.hexdigest()
+
+
+class StageCache:
+    """
+    Content-addressed on-disk cache of pipeline stages.
+
+    Each entry is one CompactLTS in its columnar form, stored under its stage
+    key as "<sha256 of payload>\\n<payload>". The checksum is verified on
+    every read; a corrupt or mismatching entry is deleted and treated as a
+    miss. Reads refresh the entry's mtime, and writes evict the least
+    recently used entries until the directory fits in max_bytes.
+    """
+
+    def __init__(self, directory=DEFAULT_CACHE_DIR, max_bytes=DEFAULT_CACHE_MAX_BYTES):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, key):
+        return os.path.join(self.directory, key + _SUFFIX)
+
+    def __contains__(self, key):
+        return os.path.exists(self._path(key))
+
+    def get(self, key, actions=None):
+        """The cached LTS for key (sharing the given action table), or None."""
+        path = self._path(key)
+        try:
+            with open(path, 'rb') as f:
+                checksum, _, payload = f.read().partition(b"\n")
+        except FileNotFoundError:
+            return None
+        try:
+            if hashlib.sha256(payload).hexdigest().encode("ascii") != checksum:
+                raise ValueError("checksum mismatch")
+            entry = json.loads(payload)
+            if entry["key"] != key:
+                raise ValueError("key mismatch")
+            lts = CompactLTS.from_columns(entry["lts"], actions)
+        except (ValueError, KeyError, TypeError) as e:
+            logging.warning("[Cache] Dropping corrupt entry %s: %s", key[:12], e)
+            self._remove(path)
+            return None
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        return lts
+
+    def put(self, key, lts):
+        payload = json.dumps(
+            {"key": key, "lts": lts.to_columns()}, separators=(',', ':')
+        ).encode("utf-8")
+        checksum = hashlib.sha256(payload).hexdigest().encode("ascii")
+        path = self._path(key)
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, 'wb') as f:
+            f.write(checksum + b"\n" + payload)
+        os.replace(tmp, path)
+        self._evict()
+
+    def _remove(self, path):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+    def _evict(self):
+        entries = []
+        total = 0
+        for name in os.listdir(self.directory):
+            if not name.endswith(_SUFFIX):
+                continue
+            path = os.path.join(self.directory, name)
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+            total += stat.st_size
+        entries.sort()
+        for _, size, path in entries:
+            if total <= self.max_bytes:
+                break
+            self._remove(path)
+            total -= size
+            logging.info("[Cache] Evicted %s", os.path.basename(path))
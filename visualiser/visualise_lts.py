@@ -1,7 +1,15 @@
-import networkx as nx
-import matplotlib.pyplot as plt
+import hashlib
+import json
+import logging
 import textwrap
 import os
+from collections import OrderedDict
+
+import backends
+
+# networkx and matplotlib are imported on the first render, not on import
+nx = backends.lazy("networkx")
+mpl_figure = backends.lazy("matplotlib")
 
 MATPLOTLIB_COLOR_MAP = {
     "drive": "green",
@@ -11,6 +19,27 @@ MATPLOTLIB_COLOR_MAP = {
     "stopped": "red",
 }
 
+# Rendering modes
+MODE_AUTO = "auto"          # pick detailed or summary from the size of the graph
+MODE_DETAILED = "detailed"  # one numbered, labelled edge per transition
+MODE_SUMMARY = "summary"    # parallel edges collapsed into one edge with a count
+RENDER_MODES = (MODE_AUTO, MODE_DETAILED, MODE_SUMMARY)
+
+# Size thresholds of MODE_AUTO: above DETAILED_MAX_TRANSITIONS the summary
+# view is drawn, and above SUMMARY_MAX_EDGES collapsed edges or
+# SUMMARY_MAX_NODES states nothing is drawn at all.
+DETAILED_MAX_TRANSITIONS = 150
+SUMMARY_MAX_EDGES = 5_000
+SUMMARY_MAX_NODES = 2_000
+
+# Summary views larger than this lose their edge labels, arrow heads and
+# node names, which would only cover the drawing
+SUMMARY_LABEL_MAX_EDGES = 300
+
+# Layouts kept in memory, keyed by graph hash
+LAYOUT_CACHE_SIZE = 32
+_layout_cache = OrderedDict()
+
 def wrap_label(label, items_per_line=2):
     """
     Wrap long edge labels for better readability by splitting on commas.
@@ -21,68 +50,108 @@ def wrap_label(label, items_per_line=2):
     )
     return wrapped
 
-def visualise_lts(transitions, save_path=None):
+def _parse_transition(t):
+    """(from, action, to, colour label) of a dict or tuple transition."""
+    if isinstance(t, dict) and all(k in t for k in ("from", "to", "action")):
+        s1 = t["from"]
+        # Get the label part after "||" for color
+        state_label = s1.split("||")[1] if isinstance(s1, str) and "||" in s1 else None
+        return s1, t["action"], t["to"], state_label
+    if isinstance(t, tuple) and len(t) in (3, 4):
+        if len(t) == 4:
+            return t
+        s1, action, s2 = t
+        return s1, action, s2, None
+    raise ValueError(f"Unexpected transition format: {t}")
+
+def _node_colour(node):
+    # Use color for nodes based on label part before "||"
+    return MATPLOTLIB_COLOR_MAP.get(str(node).split("||")[0], 'lightblue')
+
+def graph_hash(G):
     """
-    Visualise an LTS with labelled transitions and execution numbers.
-    Each transition can be a dict with keys 'from', 'to', 'action' or a tuple.
+    Hash of the nodes and the (from, to) pairs of G. Labels and parallel
+    edges do not move nodes, so every graph with the same shape shares a
+    layout, e.g. the composed, projected and backward stages of one LTS.
     """
-    G = nx.MultiDiGraph()
-    plt.figure(figsize=(14, 10))  # Slightly bigger figure
+    h = hashlib.sha256()
+    h.update(json.dumps(sorted(map(str, G.nodes()))).encode("utf-8"))
+    h.update(json.dumps(sorted({(str(u), str(v)) for u, v in G.edges()})).encode("utf-8"))
+    return h.hexdigest()
 
+def _compute_layout(G):
+    n = G.number_of_nodes()
+    # Use a layout that spreads nodes nicely for sequential or hierarchical data
+    try:
+        # More iterations & spacing on small graphs, where they are cheap
+        return nx.spring_layout(G, seed=42, k=1.2, iterations=100 if n <= 200 else 50)
+    except ImportError:
+        # spring_layout needs scipy from 500 nodes on
+        print("[INFO] scipy not found. Falling back to circular_layout.")
+        return nx.circular_layout(G)
+
+def cached_layout(G, cache_dir=None):
+    """
+    Node positions of G, memoised by graph_hash() in memory (the last
+    LAYOUT_CACHE_SIZE graphs) and, when cache_dir is given, on disk as
+    <cache_dir>/<hash>.layout.json.
+    """
+    key = graph_hash(G)
+    nodes = sorted(G.nodes(), key=str)
+    coords = _layout_cache.get(key)
+    path = os.path.join(cache_dir, key + ".layout.json") if cache_dir else None
+    if coords is None and path and os.path.exists(path):
+        try:
+            with open(path) as f:
+                coords = json.load(f)
+            if len(coords) != len(nodes):
+                raise ValueError("node count mismatch")
+        except (OSError, ValueError) as e:
+            logging.warning("[Visualise] Ignoring unreadable layout %s: %s", path, e)
+            coords = None
+    if coords is None:
+        pos = _compute_layout(G)
+        coords = [[float(x) for x in pos[node]] for node in nodes]
+        if path:
+            os.makedirs(cache_dir, exist_ok=True)
+            with open(path, 'w') as f:
+                json.dump(coords, f)
+    _layout_cache[key] = coords
+    _layout_cache.move_to_end(key)
+    while len(_layout_cache) > LAYOUT_CACHE_SIZE:
+        _layout_cache.popitem(last=False)
+    return dict(zip(nodes, coords))
+
+def _draw_detailed(ax, parsed, layout_cache_dir):
+    G = nx.MultiDiGraph()
     edge_labels = {}
-    edge_styles = {}
+    edge_groups = {}
 
     # Build the graph from transitions
-    for i, t in enumerate(transitions):
-        if isinstance(t, dict) and all(k in t for k in ("from", "to", "action")):
-            s1 = t["from"]
-            s2 = t["to"]
-            action = t["action"]
-            # Get the label part after "||" for color
-            state_label = s1.split("||")[1] if "||" in s1 else None
-        elif isinstance(t, tuple) and len(t) in (3, 4):
-            if len(t) == 4:
-                s1, action, s2, state_label = t
-            else:
-                s1, action, s2 = t
-                state_label = None
-        else:
-            raise ValueError(f"Unexpected transition format: {t}")
-
+    for i, (s1, action, s2, state_label) in enumerate(parsed):
         step_num = i + 1
         numbered_label = f"#{step_num}\n{wrap_label(action, items_per_line=3)}"  # Wrap more per line for less height
 
         color = MATPLOTLIB_COLOR_MAP.get(state_label, "black")
-
-        G.add_node(s1)
-        G.add_node(s2)
+        rad = 0.1 * (step_num % 5)  # less curvature
 
         key = f"{s1}->{s2}#{step_num}"
-        G.add_edge(s1, s2, key=key, label=numbered_label, color=color, rad=0.1 * (step_num % 5))  # less curvature
+        G.add_edge(s1, s2, key=key, label=numbered_label, color=color, rad=rad)
 
         edge_labels[(s1, s2, key)] = numbered_label
-        edge_styles[(s1, s2, key)] = (color, 0.1 * (step_num % 5))
+        edge_groups.setdefault((color, rad), []).append((s1, s2))
 
-    # Use a layout that spreads nodes nicely for sequential or hierarchical data
-    try:
-        pos = nx.spring_layout(G, seed=42, k=1.2, iterations=100)  # More iterations & spacing
-    except ImportError:
-        print("[INFO] scipy not found. Falling back to spring_layout.")
-        pos = nx.spring_layout(G, seed=42)
-
-    # Use color for nodes based on label part before "||"
-    node_colors = [
-        MATPLOTLIB_COLOR_MAP.get(n.split("||")[0], 'lightblue') for n in G.nodes()
-    ]
-
-    nx.draw_networkx_nodes(G, pos, node_color=node_colors, node_size=900, alpha=0.9)
-    nx.draw_networkx_labels(G, pos, font_size=9, font_weight='bold')
+    pos = cached_layout(G, layout_cache_dir)
+    node_colors = [_node_colour(n) for n in G.nodes()]
+    nx.draw_networkx_nodes(G, pos, ax=ax, node_color=node_colors, node_size=900, alpha=0.9)
+    nx.draw_networkx_labels(G, pos, ax=ax, font_size=9, font_weight='bold')
 
-    # Draw edges with curvature and color coding
-    for (u, v, k), (color, rad) in edge_styles.items():
+    # One call per (colour, curvature) style rather than per edge
+    for (color, rad), edgelist in edge_groups.items():
         nx.draw_networkx_edges(
             G, pos,
-            edgelist=[(u, v)],
+            ax=ax,
+            edgelist=edgelist,
             edge_color=color,
             connectionstyle=f'arc3,rad={rad}',
             arrows=True,
@@ -95,20 +164,126 @@ def visualise_lts(transitions, save_path=None):
     # Edge labels in smaller font & gray for subtlety
     nx.draw_networkx_edge_labels(
         G, pos,
+        ax=ax,
         edge_labels=edge_labels,
         font_size=7,
         font_color='dimgray',
         label_pos=0.5,  # center on edge
     )
+    ax.set_title("Labelled Transition System (Sequential Trace)", fontsize=14)
+
+def _collapse(parsed):
+    """{(from, to): (count, distinct actions, colour of the first transition)}."""
+    collapsed = {}
+    for s1, action, s2, state_label in parsed:
+        entry = collapsed.get((s1, s2))
+        if entry is None:
+            collapsed[(s1, s2)] = [1, {action}, MATPLOTLIB_COLOR_MAP.get(state_label, "black")]
+        else:
+            entry[0] += 1
+            entry[1].add(action)
+    return collapsed
+
+def _summary_label(count, actions):
+    if len(actions) == 1:
+        action = textwrap.shorten(next(iter(actions)), width=60, placeholder="…")
+        label = wrap_label(action, items_per_line=3)
+        return label if count == 1 else f"{label}\n(×{count})"
+    if len(actions) == count:
+        return f"×{count}"
+    return f"×{count} ({len(actions)} actions)"
+
+def _draw_summary(ax, G, collapsed, layout_cache_dir):
+    small = len(collapsed) <= SUMMARY_LABEL_MAX_EDGES
+    pos = cached_layout(G, layout_cache_dir)
+    node_colors = [_node_colour(n) for n in G.nodes()]
+    nx.draw_networkx_nodes(G, pos, ax=ax, node_color=node_colors, node_size=600 if small else 20, alpha=0.9)
+    if small:
+        nx.draw_networkx_labels(G, pos, ax=ax, font_size=8, font_weight='bold')
+
+    # One call per colour; widths grow with the number of collapsed transitions
+    groups = {}
+    for (u, v), (count, _, color) in collapsed.items():
+        group = groups.setdefault(color, ([], []))
+        group[0].append((u, v))
+        group[1].append(min(4.0, 1.0 + 0.5 * (count - 1)) if small else 0.3)
+    for color, (edgelist, widths) in groups.items():
+        if small:
+            nx.draw_networkx_edges(
+                G, pos, ax=ax, edgelist=edgelist, edge_color=color, width=widths,
+                connectionstyle='arc3,rad=0.1', arrows=True, arrowstyle='-|>', arrowsize=12, alpha=0.8,
+            )
+        else:
+            # without arrow heads networkx draws the whole list as one LineCollection
+            nx.draw_networkx_edges(
+                G, pos, ax=ax, edgelist=edgelist, edge_color=color, width=widths, arrows=False, alpha=0.5
+            )
+
+    if small:
+        nx.draw_networkx_edge_labels(
+            G, pos,
+            ax=ax,
+            edge_labels={(u, v): _summary_label(count, actions) for (u, v), (count, actions, _) in collapsed.items()},
+            font_size=6,
+            font_color='dimgray',
+            connectionstyle='arc3,rad=0.1',
+        )
+    ax.set_title(
+        f"Labelled Transition System (summary: {G.number_of_nodes()} states, {len(collapsed)} edges)",
+        fontsize=14,
+    )
+
+def visualise_lts(transitions, save_path=None, mode=MODE_AUTO, layout_cache_dir=None,
+                  max_detailed_transitions=DETAILED_MAX_TRANSITIONS,
+                  max_summary_edges=SUMMARY_MAX_EDGES, max_summary_nodes=SUMMARY_MAX_NODES):
+    """
+    Visualise an LTS with labelled transitions and execution numbers.
+    Each transition can be a dict with keys 'from', 'to', 'action' or a tuple.
+
+    MODE_DETAILED draws every transition with its step number and label.
+    MODE_SUMMARY collapses the transitions between each pair of states into
+    one edge labelled with its action (or count of actions) and
+    multiplicity. MODE_AUTO draws the detailed view up to
+    max_detailed_transitions transitions, the summary view up to
+    max_summary_edges collapsed edges and max_summary_nodes states, and
+    skips larger graphs with a warning. Layouts are cached by graph shape
+    (see cached_layout). Returns the mode drawn, or None if skipped.
+    """
+    if mode not in RENDER_MODES:
+        raise ValueError(f"Unknown render mode: {mode!r}")
+    parsed = [_parse_transition(t) for t in transitions]
+
+    if mode == MODE_AUTO and len(parsed) <= max_detailed_transitions:
+        mode = MODE_DETAILED
+    if mode != MODE_DETAILED:
+        collapsed = _collapse(parsed)
+        G = nx.DiGraph()
+        G.add_edges_from(collapsed)
+        if mode == MODE_AUTO:
+            if len(collapsed) > max_summary_edges or G.number_of_nodes() > max_summary_nodes:
+                logging.warning(
+                    "[Visualise] Skipping %s: %d states and %d collapsed edges exceed the summary limits (%d, %d)",
+                    save_path or "render", G.number_of_nodes(), len(collapsed), max_summary_nodes, max_summary_edges
+                )
+                return None
+            mode = MODE_SUMMARY
 
-    plt.title("Labelled Transition System (Sequential Trace)", fontsize=14)
-    plt.axis('off')
-    plt.tight_layout()
+    # A standalone Figure, not pyplot: it renders with Agg on whichever
+    # thread calls it, e.g. the background artefact writer
+    fig = mpl_figure.Figure(figsize=(14, 10))  # Slightly bigger figure
+    ax = fig.add_subplot()
+    if mode == MODE_DETAILED:
+        _draw_detailed(ax, parsed, layout_cache_dir)
+    else:
+        _draw_summary(ax, G, collapsed, layout_cache_dir)
+    ax.axis('off')
+    fig.tight_layout()
 
     if save_path:
         cwd = os.getcwd()
         save_path = os.path.join(cwd, save_path)
-        plt.savefig(save_path, format='png', dpi=300)
+        # Summary views are mostly lines and dots, which need less resolution
+        fig.savefig(save_path, format='png', dpi=300 if mode == MODE_DETAILED else 150)
         print(f"[INFO] Saved LTS visualisation to {save_path}")
 
-    plt.close()
+    return mode
@@ -1,119 +1,440 @@
 # weakest_assumption_generator.py
 
 import json
-import copy
 import logging
 import os
+import time
 from visualiser.visualise_lts import visualise_lts
-from collections import defaultdict
-
-try:
-    import graphviz
-except ImportError:
-    graphviz = None
+from array import array
+from collections import defaultdict, deque
+from lts_core.compact_lts import CompactLTS, ERROR, SINK, SINK_STATE, TAU
+from lts_core.determinise import subset_construction, DEFAULT_MAX_MACRO_STATES
+from lts_core.streaming import fused_assumption
+from lts_core.minimise import hopcroft_minimise
+from lts_core.propagation import backward_error_propagation, PROPAGATE_TAU, PROPAGATE_ALL
+from artefact_writer import (
+    ArtefactHandle, AssumptionResult, write_json, ARTEFACT_LEVELS,
+    ARTEFACTS_NONE, ARTEFACTS_FINAL, ARTEFACTS_JSON, ARTEFACTS_FULL
+)
+from lts_core.guards import GuardAlphabet
+from lts_core.properties import property_name, shared_error_automaton, select_properties
+from lts_core.action_table import ActionTable, parse_action_label
+from lts_core.incremental import IncrementalAssumption
+from lts_core.lts_binary import load_binary
+from lts_core.validation import (
+    validate, VALIDATION_LEVELS, VALIDATION_CHEAP, DETERMINISTIC, COMPLETE, REACHABLE
+)
+from pipeline_metrics import PipelineMetrics, measure
+from stage_cache import StageCache, stage_key, lts_digest, DEFAULT_CACHE_DIR, DEFAULT_CACHE_MAX_BYTES
 
 logging.basicConfig(level=logging.INFO, format='[%(levelname)s] %(message)s')
 
-def validate_lts_structure(lts, name="LTS"):
-    errors = []
-    states = set(lts.get("states", []))
-    initial = lts.get("initial_state", None)
-    transitions = lts.get("transitions", [])
-
-    if initial not in states:
-        errors.append(f"{name}: initial_state '{initial}' not in states.")
-
-    for i, t in enumerate(transitions):
-        if t["from"] not in states:
-            errors.append(f"{name}: transition {i} has unknown 'from' state: {t['from']}")
-        if t["to"] not in states:
-            errors.append(f"{name}: transition {i} has unknown 'to' state: {t['to']}")
-        if "action" not in t:
-            errors.append(f"{name}: transition {i} missing 'action'.")
-
-    if "interface_alphabet" in lts:
-        alphabet = set(lts["interface_alphabet"])
-        for i, t in enumerate(transitions):
-            if t["action"] not in alphabet:
-                errors.append(f"{name}: transition {i} uses action '{t['action']}' not in interface_alphabet.")
-
-    if errors:
-        logging.warning(f"[Validation] Issues found in {name}:")
-        for err in errors:
-            logging.warning(" - %s", err)
-    else:
-        logging.info(f"[Validation] {name} passed structural checks.")
+# Bump whenever a stage's output changes, so that cached stages are not reused
+ALGORITHM_VERSION = 1
+
+# Names of steps 1-5, as used in artefact file names and cache keys
+PIPELINE_STAGES = ("composed", "projected", "backward", "determinized", "completed")
+
+# Properties each stage must have, checked at VALIDATION_FULL
+STAGE_EXPECTATIONS = {
+    "composed": (REACHABLE,),
+    "projected": (REACHABLE,),
+    "backward": (REACHABLE,),
+    "determinized": (DETERMINISTIC, REACHABLE),
+    "completed": (DETERMINISTIC, COMPLETE),
+    "final_assumption": (DETERMINISTIC, COMPLETE),
+}
+
+def validate_lts_structure(lts, name="LTS", level=VALIDATION_CHEAP, expect=()):
+    """Validate an LTS and log a summary of its issues (see lts_core/validation.py)."""
+    return validate(lts, level, name, expect)
 
 def is_deterministic(lts):
-    seen = defaultdict(set)
-    for t in lts["transitions"]:
-        key = (t["from"], t["action"])
-        if t["to"] in seen[key]:
-            continue
-        if len(seen[key]) > 0:
-            return False
-        seen[key].add(t["to"])
+    if not isinstance(lts, CompactLTS):
+        lts = CompactLTS.from_json(lts)
+    tau = lts.actions.get(TAU)
+    if tau is not None and tau in lts.act:
+        return False  # internal moves need a τ-closure
+    offsets, edges = lts.out_index()
+    for s in range(lts.num_states):
+        targets = {}
+        for e in edges[offsets[s]:offsets[s + 1]]:
+            if targets.setdefault(lts.act[e], lts.dst[e]) != lts.dst[e]:
+                return False
     return True
 
 class AssumptionGenerator:
-    def __init__(self, lts_model, property_p, interface_alphabet):
+    def __init__(self, lts_model, property_p, interface_alphabet,
+                 max_macro_states=DEFAULT_MAX_MACRO_STATES, artefacts=ARTEFACTS_FULL,
+                 symbolic=False, guard_boundaries=None, minimise=False,
+                 propagate_on=PROPAGATE_TAU, cache_dir=None,
+                 cache_max_bytes=DEFAULT_CACHE_MAX_BYTES, output_dir=None,
+                 validation=VALIDATION_CHEAP, metrics=False, profile=False,
+                 metrics_file=None, trace_memory=True, progress=None):
+        """
+        artefacts is one of ARTEFACT_LEVELS: ARTEFACTS_NONE, ARTEFACTS_FINAL
+        (final assumption JSON only), ARTEFACTS_JSON (JSON for every stage) or
+        ARTEFACTS_FULL (JSON and PNG for every stage).
+
+        With symbolic=True the concrete action labels of M and Σ are replaced
+        by guards over their parsed fields (see lts_core/guards.py). Cut points
+        come from guard_boundaries (e.g. the controller's decision thresholds)
+        plus the value of the property's violation condition.
+
+        With minimise=True the assumption is reduced by Hopcroft partition
+        refinement after error removal, before it is written and returned.
+
+        propagate_on selects the transitions along which backward error
+        propagation runs: PROPAGATE_TAU (internal moves, as in the algorithm)
+        or PROPAGATE_ALL.
+
+        property_p may also be a list of properties. M is then composed once
+        with the product of their error automata, each error state carrying
+        the bitmask of the properties it violates, and build_assumption
+        derives one assumption per property (or their conjunction) from that
+        single exploration.
+
+        With cache_dir, every stage is stored in a content-addressed cache
+        (see stage_cache.py) keyed by M, Σ, the property, the options that
+        affect it and ALGORITHM_VERSION; later runs load unchanged stages
+        and only recompute from the first stage whose key changed.
+
+        Artefacts go to output_dir, by default "<name>_assumption_output".
+
+        validation is one of VALIDATION_LEVELS: VALIDATION_OFF, VALIDATION_CHEAP
+        (reference integrity and alphabet membership of every stage) or
+        VALIDATION_FULL (also the determinism, completeness and reachability
+        each stage should have, see STAGE_EXPECTATIONS).
+
+        With metrics=True every build records per-stage wall and CPU time,
+        tracemalloc peak and input/output sizes (see pipeline_metrics.py) and
+        returns them as the result's `metrics`; profile=True also runs each
+        stage under cProfile and keeps its hottest functions. metrics_file
+        (implying metrics) receives them as JSON, or as Prometheus text for
+        a .prom or .txt path. trace_memory=False leaves tracemalloc off, for
+        timings undistorted by its overhead.
+
+        progress, if given, is called as progress(explored, discovered,
+        blow_up) during determinisation (or the fused exploration in
+        streaming mode), every DEFAULT_PROGRESS_EVERY macro-states and once
+        at the end, to report a subset blow-up as it happens.
+        """
+        if not isinstance(lts_model, CompactLTS):
+            lts_model = CompactLTS.from_json(lts_model)
         self.M = lts_model
         self.P = property_p
+        self.properties = None
+        if isinstance(property_p, list):
+            self.properties = [property_name(P, k) for k, P in enumerate(property_p)]
+            self.property_mask = (1 << len(property_p)) - 1
         self.Sigma = interface_alphabet
-        self.lts_name = self.M.get("name", "lts")
-
-    def build_assumption(self):
-        output_dir = f"{self.lts_name}_assumption_output"
-        os.makedirs(output_dir, exist_ok=True)
-        self.output_dir = output_dir
-
-        logging.info("[Step 1] Composing model with error automaton...")
-        Perr = self._build_error_automaton(self.P)
-        M_comp = self._compose(self.M, Perr)
-        validate_lts_structure(M_comp, f"{self.lts_name}_composed")
-        visualise_lts(M_comp['transitions'], os.path.join(self.output_dir, f"1_{self.lts_name}_composed.png"))
-        with open(os.path.join(output_dir, f"1_{self.lts_name}_composed.json"), 'w') as f:
-            json.dump(M_comp, f, indent=4)
-
-        logging.info("[Step 2] Projecting composed model to interface alphabet Σ...")
-        M_proj = self._project_to_alphabet(M_comp, self.Sigma)
-        validate_lts_structure(M_proj, f"{self.lts_name}_projected")
-        visualise_lts(M_proj['transitions'], os.path.join(self.output_dir, f"2_{self.lts_name}_projected.png"))
-        with open(os.path.join(output_dir, f"2_{self.lts_name}_projected.json"), 'w') as f:
-            json.dump(M_proj, f, indent=4)
-
-        logging.info("[Step 3] Performing backward error propagation...")
-        M_bep = self._backward_error_propagation(M_proj)
-        validate_lts_structure(M_bep, f"{self.lts_name}_backward")
-        visualise_lts(M_bep['transitions'], os.path.join(self.output_dir, f"3_{self.lts_name}_backward.png"))
-        with open(os.path.join(output_dir, f"3_{self.lts_name}_backward.json"), 'w') as f:
-            json.dump(M_bep, f, indent=4)
-
-        if not is_deterministic(M_proj):
-            logging.warning("Projected LTS is non-deterministic. Determinization will be applied.")
-            M_det = self._determinize(M_bep)
-        else:
-            logging.info("Projected LTS is deterministic. Skipping determinization.")
-            M_det = M_bep
-        with open(os.path.join(output_dir, f"4_{self.lts_name}_determinized.json"), 'w') as f:
-            json.dump(M_det, f, indent=4)
-
-        logging.info("[Step 5] Completing with sink state...")
-        M_completed = self._complete_with_sink(M_det)
-        validate_lts_structure(M_completed, f"{self.lts_name}_completed")
-        visualise_lts(M_completed['transitions'], os.path.join(self.output_dir, f"5_{self.lts_name}_completed.png"))
-        with open(os.path.join(output_dir, f"5_{self.lts_name}_completed.json"), 'w') as f:
-            json.dump(M_completed, f, indent=4)
+        self.lts_name = self.M.extra.get("name", "lts")
+        self.output_dir = output_dir or f"{self.lts_name}_assumption_output"
+        self.guards = None
+        self.action_table = ActionTable()
+        if symbolic:
+            self.guards = GuardAlphabet.from_property(property_p, guard_boundaries)
+            self.M, self.Sigma = self._abstract_to_guards(self.M, self.Sigma)
+        self.sigma_ids = [self.M.actions.intern(a) for a in self.Sigma]
+        self.max_macro_states = max_macro_states
+        self.progress = progress
+        if artefacts not in ARTEFACT_LEVELS:
+            raise ValueError(f"Unknown artefact level: {artefacts!r}")
+        self.artefacts = artefacts
+        if validation not in VALIDATION_LEVELS:
+            raise ValueError(f"Unknown validation level: {validation!r}")
+        self.validation = validation
+        self.reports = {}
+        self.profile = profile
+        self.metrics_file = metrics_file
+        self.trace_memory = trace_memory
+        self.collect_metrics = metrics or profile or metrics_file is not None
+        self.metrics = None
+        self.minimise = minimise
+        self.propagate_on = propagate_on
+        self.cache = StageCache(cache_dir, cache_max_bytes) if cache_dir else None
+
+    def _emit_stage(self, lts, step, stage, final=False, render=True):
+        """
+        Queue the JSON (and, at ARTEFACTS_FULL, the PNG) of one stage on the
+        background writer. The JSON document and the expanded sink
+        transitions are taken on the calling thread, since later steps may
+        update lts in place and expansion interns complement guards in the
+        shared action table; only serialisation and rendering run in the
+        background.
+        """
+        level = self.artefacts
+        if level == ARTEFACTS_NONE or (level == ARTEFACTS_FINAL and not final):
+            return
+        stem = os.path.join(self.output_dir, f"{step}_{self.lts_name}_{stage}")
+        lts_json = lts.to_json()
+        self._handle.submit(stem + ".json", write_json, lts_json, stem + ".json")
+        if level == ARTEFACTS_FULL and render:
+            if lts_json.get("default_target") or lts_json.get("default_targets"):
+                transitions = self._explicit_transitions(lts)
+            else:
+                transitions = lts_json["transitions"]
+            self._handle.submit(stem + ".png", visualise_lts, transitions, stem + ".png")
+
+    def build_assumption(self, streaming=False, conjunctive=False):
+        """
+        Run the six-step pipeline and return the weakest assumption.
+
+        With several properties the result maps each property name to its
+        assumption, or, with conjunctive=True, is the single assumption for
+        the conjunction of all properties.
+
+        With streaming=True the steps are fused into a single on-the-fly
+        exploration that only builds the final assumption; the intermediate
+        LTSs are then only materialised when the artefact level asks for
+        them (ARTEFACTS_JSON or ARTEFACTS_FULL).
+
+        Artefacts are written on a background thread. The returned
+        AssumptionResult is the assumption's JSON dict; its `artefacts`
+        handle reports when every file has been written. With metrics
+        enabled, its `metrics` attribute holds the PipelineMetrics.
+        """
+        self.metrics = None
+        if self.collect_metrics:
+            self.metrics = PipelineMetrics(self.lts_name, self.profile, trace_memory=self.trace_memory)
+        if self.metrics is not None:
+            self.metrics.start()
+        try:
+            result = self._build_assumption(streaming, conjunctive)
+        finally:
+            if self.metrics is not None:
+                self.metrics.finish()
+        result.metrics = self.metrics
+        if self.metrics_file is not None:
+            self.metrics.write(self.metrics_file)
+        return result
+
+    def _build_assumption(self, streaming, conjunctive):
+        if self.artefacts != ARTEFACTS_NONE:
+            os.makedirs(self.output_dir, exist_ok=True)
+        self._handle = ArtefactHandle()
+
+        if streaming and self.artefacts in (ARTEFACTS_NONE, ARTEFACTS_FINAL):
+            if self.propagate_on != PROPAGATE_TAU:
+                logging.info("Streaming mode only propagates over τ; using the staged pipeline.")
+            elif self.properties is not None and not conjunctive:
+                logging.info("Streaming mode builds a single assumption; using the staged pipeline.")
+            else:
+                return self._build_assumption_streaming()
+
+        keys = self._stage_keys()
+        results = {}
+
+        def stage(step):
+            if step not in results:
+                results[step] = self._cached(
+                    keys.get(step), PIPELINE_STAGES[step - 1],
+                    lambda: self._run_step(step, stage(step - 1) if step > 1 else None)
+                )
+            return results[step]
+
+        if self.artefacts in (ARTEFACTS_JSON, ARTEFACTS_FULL):
+            for step, name in enumerate(PIPELINE_STAGES, start=1):
+                self._emit_stage(stage(step), step, name, render=step != 4)
 
         logging.info("[Step 6] Removing error states and unreachable parts...")
-        A_sigma_w = self._error_removal(M_completed)
-        validate_lts_structure(A_sigma_w, f"{self.lts_name}_final_assumption")
-        visualise_lts(A_sigma_w['transitions'], os.path.join(self.output_dir, f"6_{self.lts_name}_final_assumption.png"))
-        with open(os.path.join(output_dir, f"6_{self.lts_name}_final_assumption.json"), 'w') as f:
-            json.dump(A_sigma_w, f, indent=4)
+        completed = lambda: stage(len(PIPELINE_STAGES))
+        completed_key = keys.get(len(PIPELINE_STAGES))
+        if self.properties is None:
+            A_sigma_w = self._final_assumption(completed, completed_key, "final_assumption")
+            return AssumptionResult(A_sigma_w.to_json(), self._handle)
+        if conjunctive:
+            A_sigma_w = self._final_assumption(
+                completed, completed_key, "final_assumption", self.property_mask
+            )
+            return AssumptionResult(A_sigma_w.to_json(), self._handle)
+        assumptions = {}
+        for k, name in enumerate(self.properties):
+            A_sigma_w = self._final_assumption(
+                completed, completed_key, f"final_assumption_{name}", 1 << k
+            )
+            assumptions[name] = A_sigma_w.to_json()
+        return AssumptionResult(assumptions, self._handle)
+
+    def _run_step(self, step, previous):
+        """Compute pipeline step 1-5 from the result of the step before."""
+        with measure(self.metrics, PIPELINE_STAGES[step - 1], previous if step > 1 else self.M) as record:
+            lts = self._compute_step(step, previous)
+            record.set_output(lts)
+        # Step 3 updates its input in place, so only step 4's pass-through
+        # of an already validated LTS is skipped
+        if step != 4 or lts is not previous:
+            self._validate(lts, PIPELINE_STAGES[step - 1])
+        return lts
 
+    def _compute_step(self, step, previous):
+        if step == 1:
+            logging.info("[Step 1] Composing model with error automaton...")
+            Perr = self._build_error_automaton(self.P)
+            return self._compose(self.M, Perr)
+        elif step == 2:
+            logging.info("[Step 2] Projecting composed model to interface alphabet Σ...")
+            return self._project_to_alphabet(previous, self.sigma_ids)
+        elif step == 3:
+            logging.info("[Step 3] Performing backward error propagation...")
+            return self._backward_error_propagation(previous)
+        elif step == 4:
+            # A full validation of step 3 has already measured determinism
+            report = self.reports.get(PIPELINE_STAGES[2])
+            deterministic = report.deterministic if report is not None else None
+            if deterministic is None:
+                deterministic = is_deterministic(previous)
+            if deterministic:
+                logging.info("Projected LTS is deterministic. Skipping determinization.")
+                return previous
+            logging.warning("Projected LTS is non-deterministic. Determinization will be applied.")
+            return self._determinize(previous)
+        else:
+            logging.info("[Step 5] Completing with sink state...")
+            return self._complete_with_sink(previous)
+
+    def _validate(self, lts, stage, kind=None):
+        """Validate one stage at the configured level; kind selects its STAGE_EXPECTATIONS."""
+        report = validate(
+            lts, self.validation, f"{self.lts_name}_{stage}", STAGE_EXPECTATIONS[kind or stage]
+        )
+        self.reports[stage] = report
+        return report
+
+    def _final_assumption(self, completed, completed_key, stage, mask=None):
+        """
+        Step 6 on the completed LTS (a callable, so that it is only built or
+        loaded on a cache miss), restricted to the properties in mask.
+        """
+        def compute():
+            M_completed = completed()
+            with measure(self.metrics, stage, M_completed) as record:
+                if mask is not None:
+                    M_completed = select_properties(M_completed, mask)
+                A_sigma_w = self._error_removal(M_completed)
+                record.set_output(A_sigma_w)
+            if self.minimise:
+                logging.info("[Step 6] Minimising assumption...")
+                with measure(self.metrics, f"{stage}_minimised", A_sigma_w) as record:
+                    A_sigma_w = hopcroft_minimise(A_sigma_w)
+                    record.set_output(A_sigma_w)
+            self._validate(A_sigma_w, stage, "final_assumption")
+            return A_sigma_w
+
+        key = None
+        if completed_key is not None:
+            key = stage_key(completed_key, stage, self.minimise, mask)
+        A_sigma_w = self._cached(key, stage, compute)
+        self._emit_stage(A_sigma_w, 6, stage, final=True)
         return A_sigma_w
 
+    def _build_assumption_streaming(self):
+        def compute():
+            logging.info("[Streaming] Building assumption in a single fused exploration...")
+            with measure(self.metrics, "fused", self.M) as record:
+                Perr = self._build_error_automaton(self.P)
+                A_sigma_w = fused_assumption(
+                    self.M, Perr, self.sigma_ids, self.max_macro_states, progress=self.progress
+                )
+                record.set_output(A_sigma_w)
+            if self.minimise:
+                with measure(self.metrics, "final_assumption_minimised", A_sigma_w) as record:
+                    A_sigma_w = hopcroft_minimise(A_sigma_w)
+                    record.set_output(A_sigma_w)
+            self._validate(A_sigma_w, "final_assumption")
+            return A_sigma_w
+
+        key = None
+        if self.cache is not None:
+            key = stage_key(self._input_key(), "fused", self.minimise)
+        A_sigma_w = self._cached(key, "final_assumption", compute)
+        self._emit_stage(A_sigma_w, 6, "final_assumption", final=True)
+        return AssumptionResult(A_sigma_w.to_json(), self._handle)
+
+    def _input_key(self):
+        """Key of the pipeline inputs: M, Σ, the property and the algorithm version."""
+        return stage_key(
+            ALGORITHM_VERSION, lts_digest(self.M), sorted(self.Sigma), self.P,
+            self.guards is not None
+        )
+
+    def _stage_keys(self):
+        """Cache key of each of steps 1-5; each chains the key of the step before."""
+        if self.cache is None:
+            return {}
+        keys = {}
+        key = self._input_key()
+        for step, name in enumerate(PIPELINE_STAGES, start=1):
+            options = (self.propagate_on,) if step == 3 else ()
+            key = stage_key(key, name, *options)
+            keys[step] = key
+        return keys
+
+    def _cached(self, key, stage, compute):
+        """Load a stage from the cache, or compute and store it."""
+        if key is None:
+            return compute()
+        start = time.perf_counter()
+        lts = self.cache.get(key, self.M.actions)
+        if lts is not None:
+            logging.info("[Cache] Loaded %s from cache (%s)", stage, key[:12])
+            if self.metrics is not None:
+                self.metrics.record_cached(stage, lts, time.perf_counter() - start)
+            return lts
+        lts = compute()
+        self.cache.put(key, lts)
+        return lts
+
+    def build_incremental(self, extend_alphabet=True):
+        """
+        Build the assumption and keep every stage for incremental updates as
+        M grows (see lts_core/incremental.py): call add_transitions(delta) on
+        the returned IncrementalAssumption, then final() for the updated
+        assumption. With extend_alphabet, action labels first seen in an
+        update join Σ, as they would in a re-exported controller_lts.json.
+        """
+        if self.properties is not None:
+            raise ValueError("Incremental assumptions are built for a single property.")
+        logging.info("[Incremental] Building assumption with retained stages...")
+        return IncrementalAssumption(
+            self.M, self._build_error_automaton(self.P), self.sigma_ids,
+            propagate_on=self.propagate_on,
+            intern_action=self._intern_action,
+            extend_error_automaton=self._extend_error_automaton if extend_alphabet else None,
+            max_macro_states=self.max_macro_states,
+            minimise=self.minimise
+        )
+
+    def _intern_action(self, label):
+        """Action id of a concrete label, abstracted to its guard in symbolic mode."""
+        if self.guards is not None:
+            try:
+                label = self.guards.abstract(parse_action_label(label))
+            except ValueError:
+                logging.warning("[Parse] action label %r could not be parsed", label)
+        return self.M.actions.intern(label)
+
+    def _extend_error_automaton(self, Perr, a):
+        """Add Perr's transition for an action that joined Σ after Perr was built."""
+        violated = self._violates(self.P, a)
+        if violated is not None:
+            target = Perr.states.get("err") if violated else Perr.initial
+            Perr.add_transition(Perr.initial, target, a)
+
+    def _violates(self, P, a):
+        """_violations_over_sigma() for a single action."""
+        field = P["violation_condition"]["field"]
+        operator = P["violation_condition"]["operator"]
+        value = P["violation_condition"]["value"]
+        if self.guards is not None:
+            label = self.M.actions[a]
+            if label not in self.guards.guards:
+                return None
+            return bool(self.guards.may_violate(label, field, operator, value))
+        self.action_table.sync(self.M.actions.names)
+        if not self.action_table.parsed(a):
+            return None
+        return bool(self.action_table.violates(a, field, operator, value))
 
     def _build_error_automaton(self, P):
         """
@@ -121,233 +442,251 @@ class AssumptionGenerator:
         Accepts traces that violate the safety condition.
         For generality, we create transitions from 'ok' to 'err'
         for any action that violates the given violation_condition.
+        The automaton shares the action table of M.
+        For a list of properties, build the product of their error automata
+        instead (see lts_core/properties.py).
         """
-        err_automaton = {
-            "states": ["ok", "err"],
-            "initial_state": "ok",
-            "transitions": [],
-            "interface_alphabet": self.Sigma
-        }
+        if self.properties is not None:
+            violated_by = {a: 0 for a in self.sigma_ids}
+            for k, prop in enumerate(P):
+                for a, violated in self._violations_over_sigma(prop).items():
+                    if violated is None:
+                        violated_by[a] = None
+                    elif violated and violated_by[a] is not None:
+                        violated_by[a] |= 1 << k
+            return shared_error_automaton(self.M.actions, self.sigma_ids, violated_by)
+
+        err_automaton = CompactLTS(self.M.actions)
+        ok = err_automaton.add_state("ok")
+        err = err_automaton.add_state("err", ERROR)
+        err_automaton.set_initial(ok)
+        err_automaton.alphabet = self.sigma_ids
+
+        for a, violated in self._violations_over_sigma(P).items():
+            if violated is None:
+                continue
+            if violated:
+                err_automaton.add_transition(ok, err, a)
+            else:
+                err_automaton.add_transition(ok, ok, a)
 
+        return err_automaton
+
+    def _violations_over_sigma(self, P):
+        """
+        For each action of Σ, whether it violates P's violation condition,
+        or None if it could not be parsed (reported elsewhere).
+        """
         field = P["violation_condition"]["field"]
         operator = P["violation_condition"]["operator"]
         value = P["violation_condition"]["value"]
 
-        for action in self.Sigma:
-            try:
-                action_dict = self._parse_action(action)
-                if self._violates_property(action_dict, field, operator, value):
-                    err_automaton["transitions"].append({
-                        "from": "ok",
-                        "to": "err",
-                        "action": action
-                    })
-                else:
-                    err_automaton["transitions"].append({
-                        "from": "ok",
-                        "to": "ok",
-                        "action": action
-                    })
-            except Exception:
-                pass  # Skip unparseable actions
-
-        return err_automaton
+        if self.guards is None:
+            self.action_table.sync(self.M.actions.names)
+            violations = self.action_table.violations(field, operator, value)
 
-    def _parse_action(self, action_str):
-        """
-        Converts an action string like "a=1, b=2" to a dictionary {'a': 1, 'b': 2}
-        """
-        parts = [p.strip() for p in action_str.split(",")]
         result = {}
-        for part in parts:
-            if "=" in part:
-                key, val = part.split("=")
-                key = key.strip()
-                val = val.strip()
-                try:
-                    val = float(val)
-                except ValueError:
-                    pass
-                result[key] = val
+        for a in self.sigma_ids:
+            if self.guards is not None:
+                label = self.M.actions[a]
+                if label not in self.guards.guards:
+                    result[a] = None  # unparseable, reported when abstracting
+                    continue
+                result[a] = bool(self.guards.may_violate(label, field, operator, value))
+            elif not self.action_table.parsed(a):
+                result[a] = None  # unparseable, reported by the action table
+            else:
+                result[a] = bool(violations[a])
         return result
 
-    def _violates_property(self, action_dict, field, operator, value):
+    def _abstract_to_guards(self, M, alphabet):
         """
-        Evaluates whether a given action violates the property.
-        Currently supports ==, !=, <, >, <=, >=.
+        Relabel M's concrete actions with the guards of the decision regions
+        they fall into, merging transitions that become identical.
+        Returns the abstract LTS and the guard alphabet for Σ.
         """
-        if field not in action_dict:
-            return False
-        actual = action_dict[field]
-        if operator == "==":
-            return actual == value
-        elif operator == "!=":
-            return actual != value
-        elif operator == "<":
-            return actual < value
-        elif operator == ">":
-            return actual > value
-        elif operator == "<=" or operator == "<=":
-            return actual <= value
-        elif operator == ">=" or operator == ">=":
-            return actual >= value
-        return False
+        abstract = CompactLTS()
+        abstract.extra = dict(M.extra)
+        for s in range(M.num_states):
+            abstract.add_state(M.states[s], M.flags[s])
+        abstract.initial = M.initial
+
+        sigma_ids = [M.actions.intern(a) for a in alphabet]
+        self.action_table.sync(M.actions.names)
+        guard_ids = []
+        for a, label in enumerate(M.actions.names):
+            if self.action_table.parsed(a):
+                label = self.guards.abstract(self.action_table.row(a))
+            guard_ids.append(abstract.actions.intern(label))
+
+        seen = set()
+        for u, v, a in zip(M.src, M.dst, M.act):
+            key = (u, v, guard_ids[a])
+            if key not in seen:
+                seen.add(key)
+                abstract.add_transition(*key)
+
+        guard_sigma = list(dict.fromkeys(abstract.actions[guard_ids[a]] for a in sigma_ids))
+        abstract.set_alphabet(guard_sigma)
+        logging.info(
+            "[Symbolic] %d concrete actions abstracted to %d guards (%d -> %d transitions)",
+            len(M.actions), len(abstract.actions), M.num_transitions, abstract.num_transitions
+        )
+        return abstract, guard_sigma
+
+    def _complement_action(self, present):
+        """Action id of the guard complementing the given action ids."""
+        label = GuardAlphabet.complement_label([self.M.actions[a] for a in present])
+        return self.M.actions.intern(label)
+
+    def _explicit_transitions(self, lts):
+        """
+        Transitions of lts with implicit sink transitions written out. With a
+        symbolic alphabet each state gets one edge labelled with the
+        complement of its outgoing guards.
+        """
+        complement = self._complement_action if self.guards is not None else None
+        return lts.expand_defaults(complement).transition_dicts()
 
     def _compose(self, M, Perr):
         """
         Parallel composition: (M || Perr)
-        Synchronises over shared actions — i.e., identical action strings.
-        This performs a product construction where transitions match.
+        Synchronises over shared actions — i.e., identical action ids in
+        Perr's alphabet Σ. M's other actions interleave: M moves alone and
+        Perr stays where it is.
+
+        Both operands are indexed up front (M by source state, Perr by
+        (state, action)), so each product state only looks at its own
+        outgoing transitions. Product states are interned as integer pairs;
+        a product state is an error state if either component is. With
+        several properties it also inherits Perr's violation mask (an error
+        state of M violates every property).
         """
-        composed = {
-            "states": [],
-            "initial_state": (M["initial_state"], Perr["initial_state"]),
-            "transitions": [],
-            "interface_alphabet": self.Sigma
-        }
-
-        queue = [composed["initial_state"]]
-        visited = set(queue)
-
+        m_offsets, m_edges = M.out_index()
+
+        perr_out = defaultdict(list)
+        for u, v, a in zip(Perr.src, Perr.dst, Perr.act):
+            perr_out[(u, a)].append(v)
+        shared = Perr.alphabet_mask()
+        interleaved = {}
+
+        composed = CompactLTS(M.actions)
+        if Perr.violations is not None:
+            composed.violations = array('Q')
+            composed.extra["properties"] = list(self.properties)
+        product_states = []
+        state_ids = {}
+
+        def intern(s1, s2):
+            idx = state_ids.get((s1, s2))
+            if idx is None:
+                violations = 0
+                if Perr.violations is not None:
+                    violations = Perr.violations[s2]
+                    if M.flags[s1] & ERROR:
+                        violations = self.property_mask
+                idx = composed.add_state(
+                    f"{M.states[s1]}||{Perr.states[s2]}",
+                    (M.flags[s1] | Perr.flags[s2]) & ERROR, violations
+                )
+                state_ids[(s1, s2)] = idx
+                product_states.append((s1, s2))
+                queue.append(idx)
+            return idx
+
+        queue = deque()
+        composed.set_initial(intern(M.initial, Perr.initial))
         while queue:
-            (s1, s2) = queue.pop(0)
-            composed["states"].append((s1, s2))
-
-            for t1 in M["transitions"]:
-                if t1["from"] != s1:
-                    continue
-                for t2 in Perr["transitions"]:
-                    if t2["from"] != s2:
-                        continue
-                    if t1["action"] == t2["action"]:
-                        new_state = (t1["to"], t2["to"])
-                        if new_state not in visited:
-                            visited.add(new_state)
-                            queue.append(new_state)
-                        composed["transitions"].append({
-                            "from": (s1, s2),
-                            "to": new_state,
-                            "action": t1["action"]
-                        })
-
-        # Flatten state names to strings for JSON compatibility
-        composed["states"] = [f"{a}||{b}" for (a, b) in composed["states"]]
-        composed["initial_state"] = f"{composed['initial_state'][0]}||{composed['initial_state'][1]}"
-        for t in composed["transitions"]:
-            t["from"] = f"{t['from'][0]}||{t['from'][1]}"
-            t["to"] = f"{t['to'][0]}||{t['to'][1]}"
+            src = queue.popleft()
+            s1, s2 = product_states[src]
+            for e in m_edges[m_offsets[s1]:m_offsets[s1 + 1]]:
+                a = M.act[e]
+                if a < len(shared) and shared[a]:
+                    for to2 in perr_out.get((s2, a), ()):
+                        composed.add_transition(src, intern(M.dst[e], to2), a)
+                else:
+                    interleaved[a] = None
+                    composed.add_transition(src, intern(M.dst[e], s2), a)
 
+        composed.alphabet = list(self.sigma_ids) + list(interleaved)
         return composed
 
     def _project_to_alphabet(self, lts, alphabet):
         """
-        Project LTS to interface alphabet Σ: remove internal actions.
-        Keep only transitions with actions in Σ.
+        Project LTS to interface alphabet Σ: hide internal actions.
+        Transitions with actions outside Σ are relabelled τ.
         """
-        new_transitions = [
-            t for t in lts['transitions']
-            if t['action'] in alphabet
-        ]
-        states_involved = set()
-        for t in new_transitions:
-            states_involved.add(t['from'])
-            states_involved.add(t['to'])
-
-        lts_copy = copy.deepcopy(lts)
-        lts_copy['transitions'] = new_transitions
-        lts_copy['states'] = list(states_involved)
-        if lts_copy['initial_state'] not in lts_copy['states']:
-            lts_copy['states'].append(lts_copy['initial_state'])
-        return lts_copy
+        in_sigma = bytearray(len(lts.actions))
+        for a in alphabet:
+            in_sigma[a] = 1
+        projected = lts.subgraph(bytearray([1]) * lts.num_states)
+        projected.alphabet = list(alphabet)
+        if any(not in_sigma[a] for a in lts.act):
+            tau = lts.actions.intern(TAU)
+            projected.act = array('i', (a if in_sigma[a] else tau for a in lts.act))
+            projected.alphabet.append(tau)
+        return projected
 
     def _backward_error_propagation(self, lts):
         """
-        Identify all states that can lead to 'err' via any path.
-        Compute backward reachable set from all 'err'-containing states.
+        Identify all states from which 'err' is reachable via propagating
+        transitions (τ only by default) and treat them as error states.
         """
-        reverse_map = {}
-        for t in lts['transitions']:
-            to_state = t['to']
-            from_state = t['from']
-            reverse_map.setdefault(to_state, set()).add(from_state)
-
-        unsafe = set([s for s in lts['states'] if 'err' in s])
-        queue = list(unsafe)
-
-        while queue:
-            s = queue.pop(0)
-            for pred in reverse_map.get(s, []):
-                if pred not in unsafe:
-                    unsafe.add(pred)
-                    queue.append(pred)
-
-        lts_copy = copy.deepcopy(lts)
-        lts_copy['unsafe_states'] = list(unsafe)
-        return lts_copy
+        return backward_error_propagation(lts, self.propagate_on)
 
     def _determinize(self, lts):
         """
-        Determinize the LTS.
-        Placeholder: assume already deterministic.
+        Determinize the LTS by subset construction over reachable macro-states.
+        Macro-states containing 'err' become 'err' states.
         """
-        return lts
+        return subset_construction(lts, max_macro_states=self.max_macro_states, progress=self.progress)
 
     def _complete_with_sink(self, lts):
         """
         Add sink state to complete the automaton.
-        For every state, add missing actions leading to 'sink'.
+        Every state gets 'sink' as its implicit default target, so each
+        missing (state, action) pair leads to 'sink' without storing an edge
+        for it; expand_defaults() writes those edges out when needed.
         """
-        sink_state = 'sink'
-        states = set(lts['states'])
-        states.add(sink_state)
-        new_transitions = list(lts['transitions'])
-
-        for state in lts['states']:
-            existing_actions = set(
-                t['action'] for t in new_transitions if t['from'] == state
-            )
-            missing = set(self.Sigma) - existing_actions
-            for action in missing:
-                new_transitions.append({
-                    'from': state,
-                    'to': sink_state,
-                    'action': action
-                })
-
-        lts_copy = copy.deepcopy(lts)
-        lts_copy['states'] = list(states)
-        lts_copy['transitions'] = new_transitions
-        return lts_copy
+        completed = lts.subgraph(bytearray([1]) * lts.num_states)
+        sink = completed.add_state(SINK_STATE, SINK)
+        for state in range(lts.num_states):
+            completed.set_default(state, sink)
+        return completed
 
     def _error_removal(self, lts):
         """
         Remove error states and unreachable parts.
-        Remove 'err' state and transitions to/from it.
+        Remove 'err' state and transitions to/from it. Transitions into an
+        error state are recorded as blocked, so they do not fall back to the
+        sink default once removed.
         """
-        states = [s for s in lts['states'] if 'err' not in s]
-        transitions = [
-            t for t in lts['transitions']
-            if 'err' not in t['from'] and 'err' not in t['to']
-        ]
-        lts_copy = copy.deepcopy(lts)
-        lts_copy['states'] = states
-        lts_copy['transitions'] = transitions
-        return lts_copy
+        keep = bytearray(not f & ERROR for f in lts.flags)
+        return lts.subgraph(keep, block_removed=True)
 
 # --- main script part ---
 if __name__ == "__main__":
-    with open('controller_lts.json') as f:
-        lts = json.load(f)
+    # Prefer the binary export when it is at least as recent as the JSON one
+    if os.path.exists('controller_lts.ltsb') and (
+            not os.path.exists('controller_lts.json')
+            or os.path.getmtime('controller_lts.ltsb') >= os.path.getmtime('controller_lts.json')):
+        lts = load_binary('controller_lts.ltsb')
+        lts_name = lts.extra.get("name", "controller")
+        interface_alphabet = [lts.actions[a] for a in lts.alphabet]
+        property_dict = lts.extra['property']
+    else:
+        with open('controller_lts.json') as f:
+            lts = json.load(f)
 
-    lts_name = lts.get("name", "controller")
-    interface_alphabet = lts['interface_alphabet']
-    property_dict = lts['property']
+        lts_name = lts.get("name", "controller")
+        interface_alphabet = lts['interface_alphabet']
+        property_dict = lts['property']
 
-    gen = AssumptionGenerator(lts, property_dict, interface_alphabet)
+    gen = AssumptionGenerator(lts, property_dict, interface_alphabet, cache_dir=DEFAULT_CACHE_DIR)
     assumption = gen.build_assumption()
 
     output_file = os.path.join(f"{lts_name}_assumption_output", f"{lts_name}_assumption.json")
-    with open(output_file, 'w') as f:
-        json.dump(assumption, f, indent=4)
+    write_json(assumption, output_file)
+    assumption.artefacts.wait()
 
     logging.info("\nAssumption generated and saved to %s", output_file)